@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+批量代币评分（NumPy 向量化）
+
+功能：
+1. 输入列式数组（金额、时间戳、发送者、代币），一次性为成千上万个代币缓冲区打分
+2. 各维度评分、综合置信度、风险等级、告警触发原因与 AdvancedTokenAnalyzer 一致
+3. 全部统计通过分组聚合完成，没有按代币的 Python 循环，适合回测和历史数据补算
+
+说明：
+- 金额按 float64 参与计算，超过 2^53 的原始数量只在第 16 位有效数字之后
+  不同的情况下，"不同金额数"可能与逐笔分析略有出入
+- 时间戳为 0 表示缺失（与逐笔分析中 timestamp 为空一致）
+"""
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from multichain_listener import AdvancedTokenAnalyzer
+
+
+class BatchTokenScorer:
+    """
+    向量化批量评分器
+    """
+
+    def __init__(self, analyzer: Optional[AdvancedTokenAnalyzer] = None):
+        """
+        初始化批量评分器
+
+        参数:
+            analyzer: 提供阈值与权重的分析器（默认新建 AdvancedTokenAnalyzer）
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("批量评分需要 numpy，请先执行: pip install numpy")
+        self.analyzer = analyzer or AdvancedTokenAnalyzer()
+
+    @staticmethod
+    def to_columns(token_transfers: Dict[Any, Iterable[Dict]]) -> Tuple:
+        """
+        把 {代币: [转账, ...]} 转成列式数组
+
+        返回:
+            (values, timestamps, sender_ids, token_ids)，缺失的发送者记为空字符串
+        """
+        values, timestamps, senders, tokens = [], [], [], []
+        for token, transfers in token_transfers.items():
+            for tx in transfers:
+                values.append(tx.get('value', 0))
+                timestamps.append(tx.get('timestamp') or 0)
+                sender = tx.get('from')
+                senders.append(str(sender) if sender else '')
+                tokens.append(token)
+        return (
+            np.array(values, dtype=np.float64),
+            np.array(timestamps, dtype=np.int64),
+            np.array(senders),
+            np.array(tokens),
+        )
+
+    def score(self, values, timestamps, sender_ids, token_ids, decimals=18) -> Dict[str, Any]:
+        """
+        批量评分
+
+        参数:
+            values: 原始转账数量（链上最小单位）
+            timestamps: 转账时间戳（秒，0 表示缺失）
+            sender_ids: 发送者标识（任意可排序类型，空字符串表示缺失，不计入独立发送者）
+            token_ids: 代币标识（任意可排序类型）
+            decimals: 代币精度，标量或与 values 等长的数组
+
+        返回:
+            {
+                'token_ids': 各代币标识,
+                'confidence': 综合置信度,
+                'risk_level': low/medium/high,
+                'alert_level': HIGH/MEDIUM/None,
+                'trigger_reason': multi_transfer/large_single/medium_confidence/None,
+                'scores': {维度: 评分},
+                'transfer_count', 'sender_count', 'is_large_transfer': 对应特征
+            }
+            以上均为按 token_ids 对齐的数组
+        """
+        values = np.asarray(values, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        tokens, group = np.unique(np.asarray(token_ids), return_inverse=True)
+        group = group.ravel()
+        group_count = len(tokens)
+
+        features = self._extract_features(values, timestamps, np.asarray(sender_ids), group, group_count,
+                                          np.asarray(decimals))
+
+        scores = {
+            'basic_stats': self._score_basic_stats(features),
+            'time_pattern': self._score_time_patterns(features),
+            'amount_distribution': self._score_amount_distribution(features),
+            'sybil_detection': self._score_sybil(features),
+        }
+
+        # 与 _calculate_overall_confidence 相同的累加顺序，保证浮点结果一致
+        weighted_sum = np.zeros(group_count)
+        weight_total = 0
+        for key, weight in self.analyzer.score_weights.items():
+            weighted_sum = weighted_sum + scores[key] * weight
+            weight_total += weight
+        confidence = weighted_sum / weight_total
+
+        # 关键警告只来自女巫检测（"⚠️ 女巫攻击风险" / "轻微女巫攻击迹象"）
+        critical = features['sybil_indicators'] >= 1
+        risk_level = np.where(
+            (confidence >= 0.7) & ~critical, 'low',
+            np.where(confidence >= 0.4, 'medium', 'high')
+        ).astype(object)
+
+        alert_level, trigger_reason = self._classify_alerts(confidence, features)
+
+        return {
+            'token_ids': tokens,
+            'confidence': confidence,
+            'risk_level': risk_level,
+            'alert_level': alert_level,
+            'trigger_reason': trigger_reason,
+            'scores': scores,
+            'transfer_count': features['transfer_count'],
+            'sender_count': features['sender_count'],
+            'is_large_transfer': features['is_large_transfer'],
+        }
+
+    def _extract_features(self, values, timestamps, sender_ids, group, group_count, decimals) -> Dict[str, Any]:
+        """分组聚合出与 TransferFeatures 对应的列式特征"""
+        analyzer = self.analyzer
+        tolerance = analyzer.sybil_thresholds['same_timestamp_tolerance']
+
+        transfer_count = np.bincount(group, minlength=group_count)
+        total_value = np.bincount(group, weights=values, minlength=group_count)
+        max_single_value = np.full(group_count, -np.inf)
+        np.maximum.at(max_single_value, group, values)
+
+        # 发送者：按 (代币, 发送者) 计数
+        # 与逐个分析一致：缺失的发送者不计入独立发送者，但仍参与集中度统计
+        sender_values, sender_index = np.unique(sender_ids, return_inverse=True)
+        sender_index = sender_index.ravel().astype(np.int64)
+        stride = sender_index.max(initial=0) + 1
+        sender_pairs, pair_counts = np.unique(group.astype(np.int64) * stride + sender_index, return_counts=True)
+        pair_group = sender_pairs // stride
+        if sender_values.dtype.kind in 'USO':
+            known_pair = sender_values[sender_pairs % stride] != ''
+        else:
+            known_pair = np.ones(len(sender_pairs), dtype=bool)
+        sender_count = np.bincount(pair_group[known_pair], minlength=group_count)
+        max_sender_count = np.zeros(group_count, dtype=np.int64)
+        np.maximum.at(max_sender_count, pair_group, pair_counts)
+
+        # 时间：组内排序后计算相邻间隔
+        has_time = timestamps != 0
+        time_group = group[has_time]
+        time_values = timestamps[has_time]
+        order = np.lexsort((time_values, time_group))
+        time_group = time_group[order]
+        time_values = time_values[order]
+        timestamp_count = np.bincount(time_group, minlength=group_count)
+        same_group = time_group[1:] == time_group[:-1]
+        close = same_group & (np.diff(time_values) < tolerance)
+        close_intervals = np.bincount(time_group[1:][close], minlength=group_count)
+        time_first = np.zeros(group_count, dtype=np.int64)
+        time_last = np.zeros(group_count, dtype=np.int64)
+        if len(time_group):
+            starts = np.flatnonzero(np.r_[True, ~same_group])
+            ends = np.r_[starts[1:] - 1, len(time_group) - 1]
+            time_first[time_group[starts]] = time_values[starts]
+            time_last[time_group[ends]] = time_values[ends]
+        time_span = time_last - time_first
+
+        # 金额：换算精度后的统计（两遍法方差）
+        amounts = values / np.power(10.0, decimals)
+        total_amount = np.bincount(group, weights=amounts, minlength=group_count)
+        mean_amount = total_amount / np.maximum(transfer_count, 1)
+        deviation = amounts - mean_amount[group]
+        squared = np.bincount(group, weights=deviation * deviation, minlength=group_count)
+        amount_stdev = np.sqrt(squared / np.maximum(transfer_count - 1, 1))
+
+        unique_values = self._count_unique_per_group(group, values, group_count)
+        unique_amounts = self._count_unique_per_group(group, amounts, group_count)
+
+        large_thresholds = analyzer.large_transfer_thresholds
+        is_large_transfer = (
+            (total_value >= large_thresholds['min_total_value']) |
+            (max_single_value >= large_thresholds['min_single_value'])
+        )
+
+        features = {
+            'transfer_count': transfer_count,
+            'sender_count': sender_count,
+            'total_value': total_value,
+            'max_single_value': max_single_value,
+            'is_large_transfer': is_large_transfer,
+            'max_sender_count': max_sender_count,
+            'timestamp_count': timestamp_count,
+            'interval_count': np.maximum(timestamp_count - 1, 0),
+            'close_intervals': close_intervals,
+            'time_span': time_span,
+            'unique_values': unique_values,
+            'unique_amounts': unique_amounts,
+            'mean_amount': mean_amount,
+            'amount_stdev': amount_stdev,
+            'avg_value': total_value / np.maximum(transfer_count, 1),
+        }
+        features['sybil_indicators'] = self._count_sybil_indicators(features)
+        return features
+
+    @staticmethod
+    def _count_unique_per_group(group, column, group_count):
+        _, column_index = np.unique(column, return_inverse=True)
+        column_index = column_index.ravel().astype(np.int64)
+        width = column_index.max(initial=0) + 1
+        pairs = np.unique(group.astype(np.int64) * width + column_index)
+        return np.bincount(pairs // width, minlength=group_count)
+
+    def _score_basic_stats(self, f):
+        """对应 AdvancedTokenAnalyzer._analyze_basic_stats"""
+        thresholds = self.analyzer.sybil_thresholds
+        count = f['transfer_count']
+        large = f['is_large_transfer']
+
+        score = np.full(len(count), 1.0)
+        score = score - np.select(
+            [(count < 2) & large, count < 2, (count < 3) & large, count < 3],
+            [0.1, 0.3, 0.05, 0.1], 0.0
+        )
+        too_few_senders = f['sender_count'] < thresholds['min_unique_senders']
+        score = score - np.where(too_few_senders & ~(large & (f['sender_count'] >= 1)), 0.3, 0.0)
+        concentration = f['max_sender_count'] / np.maximum(count, 1)
+        score = score - np.where(
+            (count > 0) & (concentration > thresholds['max_sender_concentration']) & ~large, 0.2, 0.0
+        )
+        score = score + np.where(large, self.analyzer.large_transfer_thresholds['bonus_score'], 0.0)
+        return np.minimum(1.0, np.maximum(0.0, score))
+
+    def _score_time_patterns(self, f):
+        """对应 AdvancedTokenAnalyzer._analyze_time_patterns"""
+        active = (f['transfer_count'] >= 2) & (f['timestamp_count'] >= 2)
+        score = np.full(len(active), 1.0)
+        score = score - np.where(active & (f['close_intervals'] > f['interval_count'] * 0.5), 0.3, 0.0)
+        score = score + np.where(active & (f['time_span'] / 3600 >= 24), 0.1, 0.0)
+        return np.minimum(1.0, score)
+
+    def _score_amount_distribution(self, f):
+        """对应 AdvancedTokenAnalyzer._analyze_amount_distribution"""
+        count = f['transfer_count']
+        active = count >= 2
+        score = np.full(len(count), 1.0)
+        score = score - np.where(active & (f['unique_amounts'] < count * 0.3), 0.3, 0.0)
+        mean = f['mean_amount']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cv = np.where(mean > 0, f['amount_stdev'] / mean, 0.0)
+        score = score - np.where(active & (cv < 0.1), 0.2, 0.0)
+        return np.maximum(0.0, score)
+
+    def _count_sybil_indicators(self, f):
+        """女巫指标个数（大额转账豁免，计为 0）"""
+        thresholds = self.analyzer.sybil_thresholds
+        count = f['transfer_count']
+        indicators = (f['sender_count'] < thresholds['min_unique_senders']).astype(np.int64)
+        indicators += (
+            (count >= 2) & (f['timestamp_count'] >= 2) &
+            (f['close_intervals'] > f['interval_count'] * 0.5)
+        )
+        indicators += (
+            (f['unique_values'] < count * 0.3) &
+            (f['avg_value'] < thresholds['max_repeat_avg_value'])
+        )
+        return np.where(f['is_large_transfer'], 0, indicators)
+
+    def _score_sybil(self, f):
+        """对应 AdvancedTokenAnalyzer._detect_sybil_attack"""
+        indicators = f['sybil_indicators']
+        score = np.full(len(indicators), 1.0)
+        score = score - np.select([indicators >= 2, indicators == 1], [0.4, 0.2], 0.0)
+        return np.maximum(0.0, score)
+
+    def _classify_alerts(self, confidence, f):
+        """对应 AdvancedTokenAnalyzer.classify_alert"""
+        thresholds = self.analyzer.alert_thresholds
+        high = confidence >= thresholds['high_confidence']
+        conditions = [
+            high & (f['transfer_count'] >= thresholds['high_min_transfers']) &
+            (f['sender_count'] >= thresholds['high_min_senders']),
+            high & f['is_large_transfer'],
+            (confidence >= thresholds['medium_confidence']) &
+            (f['transfer_count'] >= thresholds['medium_min_transfers']),
+        ]
+        alert_level = np.select(conditions, ['HIGH', 'HIGH', 'MEDIUM'], '').astype(object)
+        trigger_reason = np.select(
+            conditions, ['multi_transfer', 'large_single', 'medium_confidence'], ''
+        ).astype(object)
+        alert_level[alert_level == ''] = None
+        trigger_reason[trigger_reason == ''] = None
+        return alert_level, trigger_reason
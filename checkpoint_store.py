@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+监听进度持久化（断点续传）
+
+功能：
+1. 按链保存监听进度（EVM: 下一个待处理区块；Solana: 各钱包签名游标）
+2. 写入先进内存，按最小间隔在后台线程落盘，不阻塞事件循环
+3. 启动时读取进度，监听器从断点批量追赶，而不是从链头开始
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class CheckpointStore:
+    """
+    监听进度存储（SQLite）
+    """
+
+    def __init__(self, db_file='listener_checkpoints.db', min_interval=5.0):
+        """
+        初始化进度存储
+
+        参数:
+            db_file: SQLite 文件路径
+            min_interval: 两次落盘之间的最小间隔（秒）
+        """
+        self.db_file = Path(db_file)
+        self.min_interval = min_interval
+
+        self._conn: Optional[sqlite3.Connection] = None
+        # _lock 只保护内存状态；_io_lock 串行化数据库读写，落盘期间 update 不被阻塞
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._pending: Dict[str, Dict] = {}
+        self._last_flush = 0.0
+        self._flush_scheduled = False
+        self._flush_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """懒加载数据库连接"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    chain TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def load(self, chain: str) -> Optional[Dict]:
+        """读取某条链的进度（未落盘的最新进度优先）"""
+        with self._lock:
+            if chain in self._pending:
+                return self._pending[chain]
+        # 正在落盘的进度已不在内存中，等写入完成后再读
+        with self._io_lock:
+            row = self._connect().execute(
+                "SELECT state FROM checkpoints WHERE chain = ?", (chain,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, chain: str, state: Dict):
+        """
+        记录最新进度
+
+        在事件循环中调用时只更新内存，并按 min_interval 安排一次后台落盘；
+        不在事件循环中时直接同步落盘（同样受 min_interval 限制）。
+        安排落盘的事件循环已关闭（定时回调不会再执行）时重新安排。
+        """
+        with self._lock:
+            self._pending[chain] = state
+            if self._flush_scheduled and not (self._flush_loop and self._flush_loop.is_closed()):
+                return
+            self._flush_scheduled = False
+            delay = self._last_flush + self.min_interval - time.monotonic()
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if delay <= 0:
+                self.flush()
+            return
+
+        with self._lock:
+            self._flush_scheduled = True
+            self._flush_loop = loop
+        loop.call_later(max(0.0, delay), self._flush_in_background, loop)
+
+    def _flush_in_background(self, loop):
+        """定时回调：在线程池中落盘；事件循环或线程池正在关闭时同步落盘"""
+        try:
+            loop.run_in_executor(None, self.flush)
+        except RuntimeError:
+            self.flush()
+
+    def flush(self):
+        """
+        把内存中的最新进度写入数据库
+
+        在锁内取出待写进度，数据库写入在锁外进行；多次落盘按取出顺序串行写入。
+        """
+        with self._io_lock:
+            with self._lock:
+                # 取出之后到达的进度由之后的 update 重新安排落盘
+                pending, self._pending = self._pending, {}
+                self._flush_scheduled = False
+                self._last_flush = time.monotonic()
+            if not pending:
+                return
+
+            try:
+                conn = self._connect()
+                now = time.time()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO checkpoints (chain, state, updated_at) VALUES (?, ?, ?)",
+                    [(chain, json.dumps(state), now) for chain, state in pending.items()]
+                )
+                conn.commit()
+            except Exception as e:
+                # 写入失败时保留进度（期间的新进度优先），等待下一次落盘
+                with self._lock:
+                    for chain, state in pending.items():
+                        self._pending.setdefault(chain, state)
+                print(f"❌ 保存监听进度失败: {e}")
+
+    def close(self):
+        """同步落盘并关闭数据库连接"""
+        self.flush()
+        with self._io_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -27,6 +27,18 @@ ETH_CONFIG = {
 
     # HTTP 轮询间隔
     'poll_interval': 12,  # 12秒（ETH 出块时间）
+
+    # 确认数：0 = 最快告警（重组时自动撤回），调大则更安全但告警更晚
+    'confirmations': 0,
+
+    # 重组检测：保留最近 N 个区块的哈希，发现重组时撤回受影响的转账（0 = 关闭检测）
+    'reorg_window': 64,
+
+    # HTTP 模式下使用服务端日志过滤器（eth_newFilter）增量轮询，节点不支持时自动回退区间查询
+    'use_log_filter': False,
+
+    # 混合模式：WebSocket 推送的同时每 N 秒做一次安全轮询（None = 仅推送）
+    'safety_poll_interval': None,
 }
 
 # ============================================================================
@@ -41,6 +53,18 @@ BSC_CONFIG = {
 
     # HTTP 轮询间隔
     'poll_interval': 3,  # 3秒（BSC 出块时间）
+
+    # 确认数：0 = 最快告警（重组时自动撤回），调大则更安全但告警更晚
+    'confirmations': 0,
+
+    # 重组检测：保留最近 N 个区块的哈希，发现重组时撤回受影响的转账（0 = 关闭检测）
+    'reorg_window': 64,
+
+    # HTTP 模式下使用服务端日志过滤器（eth_newFilter）增量轮询，节点不支持时自动回退区间查询
+    'use_log_filter': False,
+
+    # 混合模式：WebSocket 推送的同时每 N 秒做一次安全轮询（None = 仅推送）
+    'safety_poll_interval': None,
 }
 
 # ============================================================================
@@ -48,6 +72,8 @@ BSC_CONFIG = {
 # ============================================================================
 SOLANA_CONFIG = {
     'rpc_url': 'https://api.mainnet-beta.solana.com',
+    # logsSubscribe 推送（None = 仅轮询），断线时自动回退轮询
+    'ws_url': None,
     'poll_interval': 2,
 }
 
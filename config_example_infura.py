@@ -30,6 +30,12 @@ ETH_CONFIG = {
 
     # 轮询间隔（秒）- WebSocket 模式下不使用
     'poll_interval': 12,
+
+    # 混合模式：WebSocket 推送的同时每 N 秒做一次安全轮询（默认不启用，仅推送）
+    # 'safety_poll_interval': 60,
+
+    # 重组检测：保留最近 N 个区块的哈希（默认 64，0 = 关闭检测）
+    # 'reorg_window': 64,
 }
 
 # ============================================================================
@@ -51,6 +57,12 @@ BSC_CONFIG = {
 
     # 轮询间隔（秒）- BSC 出块时间 3 秒
     'poll_interval': 3,
+
+    # 混合模式：WebSocket 推送的同时每 N 秒做一次安全轮询（默认不启用，仅推送）
+    # 'safety_poll_interval': 15,
+
+    # 重组检测：保留最近 N 个区块的哈希（默认 64，0 = 关闭检测）
+    # 'reorg_window': 64,
 }
 
 # ============================================================================
@@ -27,6 +27,12 @@ ETH_CONFIG = {
 
     # HTTP 轮询间隔
     'poll_interval': 12,  # 12秒（ETH 出块时间）
+
+    # 混合模式：WebSocket 推送的同时每 N 秒做一次安全轮询（默认不启用，仅推送）
+    # 'safety_poll_interval': 60,
+
+    # 重组检测：保留最近 N 个区块的哈希（默认 64，0 = 关闭检测）
+    # 'reorg_window': 64,
 }
 
 # ============================================================================
@@ -41,6 +47,12 @@ BSC_CONFIG = {
 
     # HTTP 轮询间隔
     'poll_interval': 3,  # 3秒（BSC 出块时间）
+
+    # 混合模式：WebSocket 推送的同时每 N 秒做一次安全轮询（默认不启用，仅推送）
+    # 'safety_poll_interval': 15,
+
+    # 重组检测：保留最近 N 个区块的哈希（默认 64，0 = 关闭检测）
+    # 'reorg_window': 64,
 }
 
 # ============================================================================
@@ -19,6 +19,12 @@ ETH_CONFIG = {
 
     # 轮询间隔（秒）
     'poll_interval': 12,
+
+    # 混合模式：WebSocket 推送的同时每 N 秒做一次安全轮询（默认不启用，仅推送）
+    # 'safety_poll_interval': 60,
+
+    # 重组检测：保留最近 N 个区块的哈希（默认 64，0 = 关闭检测）
+    # 'reorg_window': 64,
 }
 
 # BSC RPC 配置
@@ -32,6 +38,12 @@ BSC_CONFIG = {
 
     # 轮询间隔（秒）
     'poll_interval': 3,
+
+    # 混合模式：WebSocket 推送的同时每 N 秒做一次安全轮询（默认不启用，仅推送）
+    # 'safety_poll_interval': 15,
+
+    # 重组检测：保留最近 N 个区块的哈希（默认 64，0 = 关闭检测）
+    # 'reorg_window': 64,
 }
 
 # Solana RPC 配置
@@ -40,6 +52,9 @@ SOLANA_CONFIG = {
     # 免费 RPC: https://api.mainnet-beta.solana.com
     'rpc_url': 'https://api.mainnet-beta.solana.com',
 
+    # logsSubscribe 推送 WebSocket URL (可选，None = 仅轮询，断线时自动回退轮询)
+    # 'ws_url': 'wss://api.mainnet-beta.solana.com',
+
     # 轮询间隔（秒）
     'poll_interval': 2,
 }
@@ -109,6 +109,15 @@ class FeishuNotifier:
         }
         trigger_hint = trigger_hints.get(trigger_reason, '🔍 触发告警')
 
+        # 转账统计优先取分析时的特征记录，与告警判断保持一致
+        features = analysis.get('features')
+        if features is not None:
+            transfer_count = features.transfer_count
+            sender_count = features.sender_count
+        else:
+            transfer_count = len(buffer['transfers'])
+            sender_count = len(buffer['senders'])
+
         # 构造卡片
         card = {
             "config": {
@@ -173,14 +182,14 @@ class FeishuNotifier:
                             "is_short": True,
                             "text": {
                                 "tag": "lark_md",
-                                "content": f"**转账笔数**\n{len(buffer['transfers'])} 笔"
+                                "content": f"**转账笔数**\n{transfer_count} 笔"
                             }
                         },
                         {
                             "is_short": True,
                             "text": {
                                 "tag": "lark_md",
-                                "content": f"**发送者数**\n{len(buffer['senders'])} 个"
+                                "content": f"**发送者数**\n{sender_count} 个"
                             }
                         },
                         {
@@ -12,7 +12,7 @@
 - ✅ 智能告警策略
 """
 
-from web3 import Web3, AsyncWeb3
+from web3 import Web3, AsyncWeb3, AsyncHTTPProvider
 from web3.exceptions import ProviderConnectionError
 
 # 兼容不同版本的 Web3.py
@@ -28,17 +28,23 @@ except ImportError:
             # Web3.py v5 或更早版本 (旧的 WebsocketProvider)
             from web3.providers.websocket import WebsocketProvider as WebSocketProvider
         except ImportError:
-            # 如果都失败，使用 AsyncHTTPProvider 作为备选
-            from web3.providers import AsyncHTTPProvider
+            # 如果都失败，WebSocket 功能不可用（仍可使用 AsyncHTTPProvider 轮询）
             WebSocketProvider = None
             print("⚠️ WebSocketProvider 不可用，WebSocket 功能将被禁用")
+import asyncio
+import bisect
+import heapq
 import json
+import math
+import random
 import time
 import pickle
 from datetime import datetime, timedelta
+from fractions import Fraction
 from pathlib import Path
 import statistics
-from typing import Any, Callable, Dict, List, Optional, Set
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
 from abc import ABC, abstractmethod
 
 # 导入币安代币过滤器
@@ -49,6 +55,22 @@ except ImportError:
     FILTER_AVAILABLE = False
     print("⚠️  binance_token_filter.py 未找到，将不过滤已上架代币")
 
+# 导入代币元数据持久化缓存
+try:
+    from token_metadata_store import TokenMetadataStore
+    TOKEN_STORE_AVAILABLE = True
+except ImportError:
+    TOKEN_STORE_AVAILABLE = False
+    print("⚠️  token_metadata_store.py 未找到，代币元数据将不做持久化缓存")
+
+# 导入监听进度存储（断点续传）
+try:
+    from checkpoint_store import CheckpointStore
+    CHECKPOINT_STORE_AVAILABLE = True
+except ImportError:
+    CHECKPOINT_STORE_AVAILABLE = False
+    print("⚠️  checkpoint_store.py 未找到，重启后将从链头开始监听")
+
 # 导入飞书通知器
 try:
     from feishu_notifier import FeishuNotifier
@@ -69,6 +91,217 @@ TOKEN_ABI = json.loads('''[
     {"constant": true, "inputs": [], "name": "totalSupply", "outputs": [{"name": "", "type": "uint256"}], "type": "function"}
 ]''')
 
+# Multicall3（ETH / BSC 等主流 EVM 链同一地址部署）
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+MULTICALL3_ABI = json.loads('''[
+    {"inputs": [{"components": [{"name": "target", "type": "address"}, {"name": "allowFailure", "type": "bool"}, {"name": "callData", "type": "bytes"}], "name": "calls", "type": "tuple[]"}],
+     "name": "aggregate3",
+     "outputs": [{"components": [{"name": "success", "type": "bool"}, {"name": "returnData", "type": "bytes"}], "name": "returnData", "type": "tuple[]"}],
+     "stateMutability": "payable", "type": "function"}
+]''')
+
+# 代币元数据查询的函数选择器（顺序即解码顺序）
+TOKEN_METADATA_SELECTORS = [
+    ('name', bytes.fromhex('06fdde03')),
+    ('symbol', bytes.fromhex('95d89b41')),
+    ('decimals', bytes.fromhex('313ce567')),
+    ('total_supply', bytes.fromhex('18160ddd')),
+]
+
+# Solana: SPL Token / Token-2022 程序与 Metaplex Token Metadata 程序
+SPL_TOKEN_PROGRAM_IDS = {
+    'TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA',
+    'TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb',
+}
+METAPLEX_METADATA_PROGRAM_ID = 'metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s'
+# getMultipleAccounts 单次最多 100 个账户（每个 mint 占 mint + metadata 两个）
+SOLANA_MULTIPLE_ACCOUNTS_LIMIT = 100
+
+
+class TransferFeatures(NamedTuple):
+    """
+    单次分析的特征记录（不可变）
+
+    由 AdvancedTokenAnalyzer 一次性提取，各维度评分、告警判断和飞书卡片共用同一份数据。
+    value 为链上原始数量，amount 为按 decimals 换算后的数量。
+    """
+    transfer_count: int
+    sender_count: int
+    total_value: int
+    max_single_value: int
+    is_large_transfer: bool
+    max_sender_count: int
+    timestamp_count: int
+    close_intervals: int                # 相邻时间间隔 < same_timestamp_tolerance 的个数
+    time_span: int                      # 秒
+    unique_values: int
+    unique_amounts: int
+    total_amount: float
+    mean_amount: float
+    amount_stdev: Optional[float]       # 少于 2 笔时为 None
+
+    @property
+    def interval_count(self) -> int:
+        return max(0, self.timestamp_count - 1)
+
+    @property
+    def avg_value(self) -> float:
+        return self.total_value / self.transfer_count if self.transfer_count else 0
+
+
+class TransferAccumulator:
+    """
+    单个代币的流式特征累加器
+
+    每笔转账 O(1)（时间戳有序插入为 O(log n) 查找）更新分析所需的全部特征，
+    分析时无需再遍历整个转账列表。撤回转账（链重组）时用 remove 反向扣减。
+    """
+
+    def __init__(self, decimals: int = 18, close_tolerance: float = 60):
+        self.decimals = decimals
+        self.close_tolerance = close_tolerance
+        self._divisor = 10 ** decimals
+
+        self.count = 0
+        self.value_sum = 0
+        self.value_max = 0
+        self.value_counts: Counter = Counter()       # 原始金额 -> 次数
+        self.amount_counts: Counter = Counter()      # 换算后金额 -> 次数
+        self.amount_sum = 0.0
+        # 金额精确和：均值与 statistics.mean 一样按精确值计算后再舍入，与批量分析结果一致
+        self._amount_exact_sum = Fraction(0)
+        # Welford 在线方差
+        self._amount_mean = 0.0
+        self._amount_m2 = 0.0
+
+        self.sender_counts: Counter = Counter()
+        self.max_sender_count = 0
+
+        self.timestamps: List[int] = []              # 有序
+        self.close_intervals = 0                     # 相邻间隔 < close_tolerance 的个数
+
+    def add(self, tx: Dict[str, Any]):
+        """累加一笔转账"""
+        value = tx.get('value', 0)
+        self.count += 1
+        self.value_sum += value
+        if self.count == 1 or value > self.value_max:
+            self.value_max = value
+        self.value_counts[value] += 1
+
+        amount = value / self._divisor
+        self.amount_counts[amount] += 1
+        self.amount_sum += amount
+        self._amount_exact_sum += Fraction(amount)
+        delta = amount - self._amount_mean
+        self._amount_mean += delta / self.count
+        self._amount_m2 += delta * (amount - self._amount_mean)
+
+        sender = tx.get('from')
+        self.sender_counts[sender] += 1
+        if self.sender_counts[sender] > self.max_sender_count:
+            self.max_sender_count = self.sender_counts[sender]
+
+        timestamp = tx.get('timestamp')
+        if timestamp:
+            self._insert_timestamp(timestamp)
+
+    def _insert_timestamp(self, timestamp: int):
+        """有序插入时间戳，并增量维护紧密间隔计数"""
+        timestamps = self.timestamps
+        index = bisect.bisect_right(timestamps, timestamp)
+        before = timestamps[index - 1] if index > 0 else None
+        after = timestamps[index] if index < len(timestamps) else None
+
+        if before is not None and after is not None and after - before < self.close_tolerance:
+            self.close_intervals -= 1
+        if before is not None and timestamp - before < self.close_tolerance:
+            self.close_intervals += 1
+        if after is not None and after - timestamp < self.close_tolerance:
+            self.close_intervals += 1
+
+        timestamps.insert(index, timestamp)
+
+    def remove(self, tx: Dict[str, Any]):
+        """
+        扣减一笔此前累加过的转账（链重组撤回）
+
+        最大值只在被移除的恰好是当前最大值时重新扫描（金额种类数 / 发送者数）；
+        均值与方差按剩余金额分布 amount_counts 重新计算（O(金额种类数)），
+        避免 Welford 反向扣减在大额离群值移除后留下的数值误差。
+        """
+        value = tx.get('value', 0)
+        self.count -= 1
+        self.value_sum -= value
+        self._decrement(self.value_counts, value)
+        if value == self.value_max and value not in self.value_counts:
+            self.value_max = max(self.value_counts, default=0)
+
+        amount = value / self._divisor
+        self._decrement(self.amount_counts, amount)
+        self.amount_sum -= amount
+        self._amount_exact_sum -= Fraction(amount)
+        if self.count == 0:
+            self.amount_sum = 0.0
+            self._amount_mean = 0.0
+            self._amount_m2 = 0.0
+        else:
+            mean = sum(other * count for other, count in self.amount_counts.items()) / self.count
+            self._amount_mean = mean
+            self._amount_m2 = sum(count * (other - mean) ** 2 for other, count in self.amount_counts.items())
+
+        sender = tx.get('from')
+        sender_count = self.sender_counts[sender]
+        self._decrement(self.sender_counts, sender)
+        if sender_count == self.max_sender_count:
+            self.max_sender_count = max(self.sender_counts.values(), default=0)
+
+        timestamp = tx.get('timestamp')
+        if timestamp:
+            self._remove_timestamp(timestamp)
+
+    @staticmethod
+    def _decrement(counter: Counter, key):
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
+
+    def _remove_timestamp(self, timestamp: int):
+        """移除一个时间戳，并增量维护紧密间隔计数（_insert_timestamp 的逆操作）"""
+        timestamps = self.timestamps
+        index = bisect.bisect_left(timestamps, timestamp)
+        if index >= len(timestamps) or timestamps[index] != timestamp:
+            return
+        before = timestamps[index - 1] if index > 0 else None
+        after = timestamps[index + 1] if index + 1 < len(timestamps) else None
+
+        if before is not None and timestamp - before < self.close_tolerance:
+            self.close_intervals -= 1
+        if after is not None and after - timestamp < self.close_tolerance:
+            self.close_intervals -= 1
+        if before is not None and after is not None and after - before < self.close_tolerance:
+            self.close_intervals += 1
+
+        del timestamps[index]
+
+    @property
+    def time_span(self) -> int:
+        return self.timestamps[-1] - self.timestamps[0] if self.timestamps else 0
+
+    @property
+    def amount_mean(self) -> float:
+        """金额均值（与 statistics.mean 一致：精确和除以笔数后舍入一次）"""
+        if self.count == 0:
+            return 0.0
+        return float(self._amount_exact_sum / self.count)
+
+    @property
+    def amount_stdev(self) -> float:
+        """样本标准差（与 statistics.stdev 一致）"""
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(max(0.0, self._amount_m2) / (self.count - 1))
+
 
 class AdvancedTokenAnalyzer:
     """
@@ -85,6 +318,7 @@ class AdvancedTokenAnalyzer:
             'same_value_tolerance': 0.01,        # 比例
             'min_unique_senders': 1,             # 个（降低为1，允许单发送者）
             'max_sender_concentration': 0.95,    # 最大单一发送者占比（提高到95%）
+            'max_repeat_avg_value': 1e22,        # 重复金额均值低于此值视为小额测试（1万代币，18 decimals）
         }
 
         # 大额转账阈值（项目方打新特征）
@@ -94,8 +328,24 @@ class AdvancedTokenAnalyzer:
             'bonus_score': 0.3,                  # 大额转账加分
         }
 
-        # 区块缓存（避免重复查询）
-        self.block_cache = {}
+        # 告警阈值（见 BaseChainListener._check_alert_conditions）
+        self.alert_thresholds = {
+            'high_confidence': 0.8,
+            'high_min_transfers': 3,
+            'high_min_senders': 2,
+            'medium_confidence': 0.6,
+            'medium_min_transfers': 5,
+        }
+
+        # 各维度评分权重（加权平均得出综合置信度）
+        self.score_weights = {
+            'basic_stats': 0.30,
+            'time_pattern': 0.20,
+            'amount_distribution': 0.20,
+            'sybil_detection': 0.30,
+        }
+
+        # 地址缓存（避免重复查询）
         self.address_cache = {}
 
     def analyze_transfers(self, transfers, senders, token_info):
@@ -109,32 +359,42 @@ class AdvancedTokenAnalyzer:
                 'patterns': [],            # 发现的模式
                 'warnings': [],            # 警告信息
                 'recommendation': str,     # 建议
-                'scores': {}               # 各维度评分
+                'scores': {},              # 各维度评分
+                'features': TransferFeatures  # 本次分析使用的特征
             }
         """
+        return self.analyze_features(self.extract_features(transfers, senders, token_info), token_info)
+
+    def analyze_accumulated(self, accumulator: 'TransferAccumulator', senders, token_info):
+        """基于流式累加器的综合分析（结果与 analyze_transfers 一致）"""
+        return self.analyze_features(self.accumulated_features(accumulator, senders), token_info)
+
+    def analyze_features(self, features: 'TransferFeatures', token_info):
+        """由特征记录计算各维度评分"""
         analysis = {
             'confidence': 1.0,
             'risk_level': 'low',
             'patterns': [],
             'warnings': [],
             'recommendation': '',
-            'scores': {}
+            'scores': {},
+            'features': features,
         }
 
         # 1. 基础统计分析
-        stats_score = self._analyze_basic_stats(transfers, senders, analysis)
+        stats_score = self._analyze_basic_stats(features, analysis)
         analysis['scores']['basic_stats'] = stats_score
 
         # 2. 时间模式分析
-        time_score = self._analyze_time_patterns(transfers, analysis)
+        time_score = self._analyze_time_patterns(features, analysis)
         analysis['scores']['time_pattern'] = time_score
 
         # 3. 金额分布分析
-        amount_score = self._analyze_amount_distribution(transfers, token_info, analysis)
+        amount_score = self._analyze_amount_distribution(features, token_info, analysis)
         analysis['scores']['amount_distribution'] = amount_score
 
         # 4. 女巫攻击检测
-        sybil_score = self._detect_sybil_attack(transfers, senders, analysis)
+        sybil_score = self._detect_sybil_attack(features, analysis)
         analysis['scores']['sybil_detection'] = sybil_score
 
         # 5. 计算综合置信度
@@ -148,22 +408,135 @@ class AdvancedTokenAnalyzer:
 
         return analysis
 
-    def _analyze_basic_stats(self, transfers, senders, analysis):
-        """基础统计分析"""
-        score = 1.0
+    def extract_features(self, transfers, senders, token_info) -> 'TransferFeatures':
+        """单次遍历转账列表，提取全部分析特征"""
+        divisor = 10 ** token_info.get('decimals', 18)
+        tolerance = self.sybil_thresholds['same_timestamp_tolerance']
+
+        total_value = 0
+        max_single_value = 0
+        sender_counts: Dict[Any, int] = {}
+        timestamps = []
+        amounts = []
+        for tx in transfers:
+            value = tx.get('value', 0)
+            total_value += value
+            if not amounts or value > max_single_value:
+                max_single_value = value
+            amounts.append(value / divisor)
+            sender = tx.get('from')
+            sender_counts[sender] = sender_counts.get(sender, 0) + 1
+            if tx.get('timestamp'):
+                timestamps.append(tx['timestamp'])
 
-        transfer_count = len(transfers)
-        sender_count = len(senders)
+        timestamps.sort()
+        close_intervals = sum(
+            1 for i in range(1, len(timestamps)) if timestamps[i] - timestamps[i-1] < tolerance
+        )
 
-        # 🆕 检查是否为大额转账（项目方打新特征）
-        total_value = sum(tx.get('value', 0) for tx in transfers)
-        max_single_value = max((tx.get('value', 0) for tx in transfers), default=0)
+        transfer_count = len(amounts)
+        amount_stdev = None
+        mean_amount = 0.0
+        if transfer_count >= 2:
+            mean_amount = statistics.mean(amounts)
+            try:
+                amount_stdev = statistics.stdev(amounts)
+            except statistics.StatisticsError:
+                pass
+
+        return TransferFeatures(
+            transfer_count=transfer_count,
+            sender_count=len(senders),
+            total_value=total_value,
+            max_single_value=max_single_value,
+            is_large_transfer=self.is_large_transfer(total_value, max_single_value),
+            max_sender_count=max(sender_counts.values(), default=0),
+            timestamp_count=len(timestamps),
+            close_intervals=close_intervals,
+            time_span=timestamps[-1] - timestamps[0] if timestamps else 0,
+            unique_values=len({tx.get('value', 0) for tx in transfers}),
+            unique_amounts=len(set(amounts)),
+            total_amount=sum(amounts),
+            mean_amount=mean_amount,
+            amount_stdev=amount_stdev,
+        )
+
+    def accumulated_features(self, accumulator: 'TransferAccumulator', senders) -> 'TransferFeatures':
+        """从流式累加器读取分析特征（O(1)）"""
+        transfer_count = accumulator.count
+        return TransferFeatures(
+            transfer_count=transfer_count,
+            sender_count=len(senders),
+            total_value=accumulator.value_sum,
+            max_single_value=accumulator.value_max,
+            is_large_transfer=self.is_large_transfer(accumulator.value_sum, accumulator.value_max),
+            max_sender_count=accumulator.max_sender_count,
+            timestamp_count=len(accumulator.timestamps),
+            close_intervals=accumulator.close_intervals,
+            time_span=accumulator.time_span,
+            unique_values=len(accumulator.value_counts),
+            unique_amounts=len(accumulator.amount_counts),
+            total_amount=accumulator.amount_sum,
+            mean_amount=accumulator.amount_mean if transfer_count >= 2 else 0.0,
+            amount_stdev=accumulator.amount_stdev if transfer_count >= 2 else None,
+        )
+
+    def create_accumulator(self, token_info, transfers=()) -> 'TransferAccumulator':
+        """为代币创建流式特征累加器（可用已有转账初始化）"""
+        accumulator = TransferAccumulator(
+            decimals=token_info.get('decimals', 18),
+            close_tolerance=self.sybil_thresholds['same_timestamp_tolerance'],
+        )
+        for tx in transfers:
+            accumulator.add(tx)
+        return accumulator
+
+    def accumulator_matches(self, accumulator: Optional['TransferAccumulator'], transfer_count: int, token_info) -> bool:
+        """累加器是否与当前缓冲区和阈值一致（否则需要重建）"""
+        return (
+            accumulator is not None and
+            accumulator.count == transfer_count and
+            accumulator.decimals == token_info.get('decimals', 18) and
+            accumulator.close_tolerance == self.sybil_thresholds['same_timestamp_tolerance']
+        )
 
-        is_large_transfer = (
+    def classify_alert(self, confidence, features: 'TransferFeatures'):
+        """
+        判断告警级别与触发原因
+
+        返回:
+            (alert_level, trigger_reason)，不满足任何条件时为 (None, None)
+        """
+        thresholds = self.alert_thresholds
+
+        # HIGH 级别：原有逻辑 OR 大额单笔转账
+        if (confidence >= thresholds['high_confidence'] and
+                features.transfer_count >= thresholds['high_min_transfers'] and
+                features.sender_count >= thresholds['high_min_senders']):
+            return 'HIGH', 'multi_transfer'  # 多笔转账逻辑
+        if confidence >= thresholds['high_confidence'] and features.is_large_transfer:
+            return 'HIGH', 'large_single'  # 大额单笔逻辑
+        if confidence >= thresholds['medium_confidence'] and features.transfer_count >= thresholds['medium_min_transfers']:
+            return 'MEDIUM', 'medium_confidence'  # 中等置信度
+        return None, None
+
+    def is_large_transfer(self, total_value, max_single_value) -> bool:
+        """是否为大额转账（项目方打新特征）"""
+        return (
             total_value >= self.large_transfer_thresholds['min_total_value'] or
             max_single_value >= self.large_transfer_thresholds['min_single_value']
         )
 
+    def _analyze_basic_stats(self, features: 'TransferFeatures', analysis):
+        """基础统计分析"""
+        score = 1.0
+
+        transfer_count = features.transfer_count
+        sender_count = features.sender_count
+
+        # 🆕 检查是否为大额转账（项目方打新特征）
+        is_large_transfer = features.is_large_transfer
+
         # 检查转账数量
         if transfer_count < 2:
             if is_large_transfer:
@@ -195,12 +568,7 @@ class AdvancedTokenAnalyzer:
 
         # 检查发送者集中度
         if transfer_count > 0:
-            sender_concentration = {}
-            for tx in transfers:
-                sender = tx['from']
-                sender_concentration[sender] = sender_concentration.get(sender, 0) + 1
-
-            max_concentration = max(sender_concentration.values()) / transfer_count
+            max_concentration = features.max_sender_count / transfer_count
             if max_concentration > self.sybil_thresholds['max_sender_concentration']:
                 if not is_large_transfer:
                     # 只有非大额转账才警告集中度
@@ -215,123 +583,86 @@ class AdvancedTokenAnalyzer:
 
         return min(1.0, max(0.0, score))
 
-    def _analyze_time_patterns(self, transfers, analysis):
+    def _analyze_time_patterns(self, features: 'TransferFeatures', analysis):
         """时间模式分析"""
         score = 1.0
 
-        if len(transfers) < 2:
-            return score
-
-        # 获取时间戳
-        timestamps = [tx.get('timestamp', 0) for tx in transfers if tx.get('timestamp')]
-        if len(timestamps) < 2:
+        if features.transfer_count < 2 or features.timestamp_count < 2:
             return score
 
-        timestamps.sort()
-
-        # 计算时间间隔
-        intervals = [timestamps[i] - timestamps[i-1] for i in range(1, len(timestamps))]
-
         # 检查是否有异常紧密的时间聚类
-        close_intervals = [i for i in intervals if i < self.sybil_thresholds['same_timestamp_tolerance']]
-        if len(close_intervals) > len(intervals) * 0.5:
-            analysis['warnings'].append(f"发现 {len(close_intervals)} 笔交易时间过于接近（< {self.sybil_thresholds['same_timestamp_tolerance']}秒）")
+        close_count = features.close_intervals
+        if close_count > features.interval_count * 0.5:
+            analysis['warnings'].append(f"发现 {close_count} 笔交易时间过于接近（< {self.sybil_thresholds['same_timestamp_tolerance']}秒）")
             score -= 0.3
             analysis['patterns'].append("疑似批量操作")
 
         # 计算时间跨度
-        if len(timestamps) >= 2:
-            time_span = timestamps[-1] - timestamps[0]
-            time_span_hours = time_span / 3600
-
-            if time_span_hours < 1:
-                analysis['patterns'].append(f"所有转账在 {time_span / 60:.0f} 分钟内完成")
-            elif time_span_hours < 24:
-                analysis['patterns'].append(f"所有转账在 {time_span_hours:.1f} 小时内完成")
-            else:
-                analysis['patterns'].append(f"转账跨度 {time_span_hours / 24:.1f} 天")
-                score += 0.1  # 时间跨度长通常是好信号
+        time_span = features.time_span
+        time_span_hours = time_span / 3600
+
+        if time_span_hours < 1:
+            analysis['patterns'].append(f"所有转账在 {time_span / 60:.0f} 分钟内完成")
+        elif time_span_hours < 24:
+            analysis['patterns'].append(f"所有转账在 {time_span_hours:.1f} 小时内完成")
+        else:
+            analysis['patterns'].append(f"转账跨度 {time_span_hours / 24:.1f} 天")
+            score += 0.1  # 时间跨度长通常是好信号
 
         return min(1.0, score)
 
-    def _analyze_amount_distribution(self, transfers, token_info, analysis):
+    def _analyze_amount_distribution(self, features: 'TransferFeatures', token_info, analysis):
         """金额分布分析"""
         score = 1.0
 
-        if len(transfers) < 2:
+        if features.transfer_count < 2:
             return score
 
-        decimals = token_info.get('decimals', 18)
-        amounts = [tx['value'] / (10 ** decimals) for tx in transfers]
-
         # 检查金额相似度
-        unique_amounts = len(set(amounts))
-        if unique_amounts < len(amounts) * 0.3:  # 70%的金额相同
+        unique_amounts = features.unique_amounts
+        if unique_amounts < features.transfer_count * 0.3:  # 70%的金额相同
             analysis['warnings'].append(f"金额过于相似（只有 {unique_amounts} 个不同值）")
             score -= 0.3
             analysis['patterns'].append("疑似批量测试")
 
         # 计算金额统计
-        if len(amounts) >= 2:
-            mean_amount = statistics.mean(amounts)
-            total_amount = sum(amounts)
-
-            try:
-                stdev = statistics.stdev(amounts)
-                cv = stdev / mean_amount if mean_amount > 0 else 0  # 变异系数
+        mean_amount = features.mean_amount
+        if features.amount_stdev is not None:
+            cv = features.amount_stdev / mean_amount if mean_amount > 0 else 0  # 变异系数
 
-                if cv < 0.1:  # 变异系数很小
-                    analysis['warnings'].append("金额变异度极低")
-                    score -= 0.2
-            except:
-                pass
+            if cv < 0.1:  # 变异系数很小
+                analysis['warnings'].append("金额变异度极低")
+                score -= 0.2
 
-            analysis['patterns'].append(f"总金额: {total_amount:,.0f} {token_info.get('symbol', 'tokens')}")
-            analysis['patterns'].append(f"平均金额: {mean_amount:,.0f} {token_info.get('symbol', 'tokens')}")
+        analysis['patterns'].append(f"总金额: {features.total_amount:,.0f} {token_info.get('symbol', 'tokens')}")
+        analysis['patterns'].append(f"平均金额: {mean_amount:,.0f} {token_info.get('symbol', 'tokens')}")
 
         return max(0.0, score)
 
-    def _detect_sybil_attack(self, transfers, senders, analysis):
+    def _detect_sybil_attack(self, features: 'TransferFeatures', analysis):
         """女巫攻击检测（智能区分项目方和女巫）"""
         score = 1.0
 
         sybil_indicators = 0
 
-        # 🆕 先检查是否为大额转账（豁免女巫检测）
-        total_value = sum(tx.get('value', 0) for tx in transfers)
-        max_single_value = max((tx.get('value', 0) for tx in transfers), default=0)
-
-        is_large_transfer = (
-            total_value >= self.large_transfer_thresholds['min_total_value'] or
-            max_single_value >= self.large_transfer_thresholds['min_single_value']
-        )
-
         # 大额转账豁免机制：项目方打新通常是大额单发送者
-        if is_large_transfer:
+        if features.is_large_transfer:
             analysis['patterns'].append("💰 大额转账豁免女巫检测")
             return 1.0  # 满分通过
 
         # 指标1: 发送者过少（已经放宽到1个）
-        if len(senders) < self.sybil_thresholds['min_unique_senders']:
+        if features.sender_count < self.sybil_thresholds['min_unique_senders']:
             sybil_indicators += 1
 
         # 指标2: 时间过于集中
-        if len(transfers) >= 2:
-            timestamps = [tx.get('timestamp', 0) for tx in transfers if tx.get('timestamp')]
-            if len(timestamps) >= 2:
-                timestamps.sort()
-                intervals = [timestamps[i] - timestamps[i-1] for i in range(1, len(timestamps))]
-                close_count = sum(1 for i in intervals if i < self.sybil_thresholds['same_timestamp_tolerance'])
-                if close_count > len(intervals) * 0.5:
-                    sybil_indicators += 1
+        if features.transfer_count >= 2 and features.timestamp_count >= 2:
+            if features.close_intervals > features.interval_count * 0.5:
+                sybil_indicators += 1
 
         # 指标3: 金额过于相似（小额转账才视为可疑）
-        amounts = [tx['value'] for tx in transfers]
-        unique_amounts = len(set(amounts))
-        if unique_amounts < len(amounts) * 0.3:
+        if features.unique_values < features.transfer_count * 0.3:
             # 检查是否为小额测试（真正的女巫特征）
-            avg_amount = sum(amounts) / len(amounts) if amounts else 0
-            if avg_amount < 1e22:  # 小于 10,000 tokens（18 decimals）
+            if features.avg_value < self.sybil_thresholds['max_repeat_avg_value']:
                 sybil_indicators += 1
                 analysis['patterns'].append("⚠️ 发现小额重复转账模式")
 
@@ -351,17 +682,10 @@ class AdvancedTokenAnalyzer:
             return 0.5
 
         # 加权平均
-        weights = {
-            'basic_stats': 0.30,
-            'time_pattern': 0.20,
-            'amount_distribution': 0.20,
-            'sybil_detection': 0.30,
-        }
-
         weighted_sum = 0
         weight_total = 0
 
-        for key, weight in weights.items():
+        for key, weight in self.score_weights.items():
             if key in scores:
                 weighted_sum += scores[key] * weight
                 weight_total += weight
@@ -400,54 +724,131 @@ class BaseChainListener(ABC):
     def __init__(self, chain_name: str, binance_wallets: List[str],
                  analyzer: AdvancedTokenAnalyzer,
                  binance_filter: Optional[BinanceTokenFilter] = None,
-                 feishu_notifier: Optional['FeishuNotifier'] = None):
+                 feishu_notifier: Optional['FeishuNotifier'] = None,
+                 token_store: Optional['TokenMetadataStore'] = None,
+                 checkpoint_store: Optional['CheckpointStore'] = None,
+                 analysis_window: float = 0.0):
         self.chain_name = chain_name
         self.binance_wallets = binance_wallets
         self.analyzer = analyzer
         self.binance_filter = binance_filter
         self.feishu_notifier = feishu_notifier
+        self.token_store = token_store
+        self.checkpoint_store = checkpoint_store
+
+        # 合并分析窗口（秒）：0 表示按区块合并，同一区块内的多笔转账只分析一次
+        self.analysis_window = analysis_window
+        self._pending_analyses: Dict[str, Dict[str, Any]] = {}   # 合约 -> token_info
+        self._pending_flush_handle = None
 
         # 数据存储
         self.known_tokens: Dict[str, Dict[str, Any]] = {}
         self.new_tokens_buffer: Dict[str, Dict[str, Any]] = {}
 
+        # 元数据负缓存: 合约地址 -> 过期时间（查询失败的合约在过期前不再重复查询）
+        self.negative_token_ttl = token_store.negative_ttl if token_store else 6 * 3600
+        self._negative_tokens: Dict[str, float] = {}
+        # 异步预取遇到网络错误的合约：与负缓存分开记录（并非"不是代币"），
+        # token_retry_delay 秒后随下一批预取重试；期间的转账暂存，元数据取到后再处理
+        self.token_retry_delay = 30.0
+        self._token_retry_at: Dict[str, float] = {}
+        self._held_transfers: Dict[str, List[Dict[str, Any]]] = {}
+
         # 统计
         self.stats = {
             'total_transfers': 0,
             'filtered_tokens': 0,
             'new_tokens': 0,
             'high_confidence_tokens': 0,
+            'metadata_lookups_avoided': 0,   # 地址级过滤提前拦截、省下的元数据查询次数
+            'reorgs': 0,                     # 检测到的链重组次数
+            'retracted_transfers': 0,        # 因链重组撤回的转账
+            'coalesced_analyses': 0,         # 被合并（省去）的分析次数
         }
+        # 已计入 metadata_lookups_avoided 的合约
+        self._lookup_avoided_contracts: Set[str] = set()
 
     @abstractmethod
     def get_token_info(self, contract_address: str) -> Optional[Dict]:
         """获取代币信息"""
         pass
 
+    def _load_checkpoint(self) -> Optional[Dict]:
+        """读取上次保存的监听进度"""
+        if not self.checkpoint_store:
+            return None
+        try:
+            return self.checkpoint_store.load(self.chain_name)
+        except Exception as e:
+            print(f"   ⚠️  [{self.chain_name}] 读取监听进度失败: {e}")
+            return None
+
+    def _save_checkpoint(self, state: Dict):
+        """记录监听进度（内存更新，按间隔异步落盘）"""
+        if self.checkpoint_store:
+            self.checkpoint_store.update(self.chain_name, state)
+
     @abstractmethod
     def listen(self, callback=None):
         """开始监听"""
         pass
 
+    async def listen_async(self, poll_interval: int = 12, callback=None):
+        """异步监听入口（默认在线程池中运行同步 listen，子类应提供原生实现）"""
+        await asyncio.to_thread(self.listen, poll_interval=poll_interval, callback=callback)
+
     def process_transfer(self, transfer_data):
-        """处理转账（通用逻辑）"""
-        contract = transfer_data.get('contract')
-        to_address = transfer_data.get('to')
+        """处理单笔转账（等同于只含一笔的 process_transfers，处理后立即执行到期的合并分析）"""
+        self.process_transfers([transfer_data])
+
+    def process_transfers(self, batch, flush: bool = True):
+        """
+        批量处理转账
+
+        按合约分组：过滤、元数据与上架状态每个合约只查一次，转账批量写入缓冲区，
+        每个代币在本批内最多立即分析一次，其余转账合并到批次结束时统一分析。
 
-        if not contract or not to_address or not self._is_monitored_wallet(to_address):
+        参数:
+            batch: 转账列表（按链上顺序）
+            flush: 处理完后是否立即执行合并分析（单笔调用时由调用方在批次边界执行）
+        """
+        by_contract: Dict[str, List[Dict[str, Any]]] = {}
+        for transfer_data in batch:
+            contract = transfer_data.get('contract')
+            to_address = transfer_data.get('to')
+
+            if not contract or not to_address or not self._is_monitored_wallet(to_address):
+                continue
+
+            self.stats['total_transfers'] += 1
+            by_contract.setdefault(contract, []).append(transfer_data)
+
+        # 元数据已重试成功（或确认不是代币）的合约，暂存的转账排在本批之前处理
+        for contract in [c for c in self._held_transfers if c not in self._token_retry_at]:
+            by_contract[contract] = self._held_transfers.pop(contract) + by_contract.get(contract, [])
+
+        for contract, transfers in by_contract.items():
+            self._process_contract_transfers(contract, transfers)
+
+        if flush:
+            self._flush_pending_analyses()
+
+    def _process_contract_transfers(self, contract: str, transfers: List[Dict[str, Any]]):
+        """处理同一合约的一组转账"""
+        # 先做只依赖合约地址的廉价过滤，命中则无需任何元数据 RPC
+        if self._reject_by_address(contract):
             return
 
-        self.stats['total_transfers'] += 1
+        # 元数据因网络错误暂未取到：暂存转账等待重试，不当作非代币丢弃
+        if contract in self._token_retry_at:
+            self._held_transfers.setdefault(contract, []).extend(transfers)
+            return
 
         # 获取代币信息
         token_info = self.get_token_info(contract)
         if not token_info:
             return
 
-        # 已上架代币直接过滤
-        if self._handle_listed_token(contract, token_info):
-            return
-
         buffer_existed = contract in self.new_tokens_buffer
         buffer = self._get_token_buffer(contract)
         is_first_time = not buffer_existed
@@ -455,15 +856,97 @@ class BaseChainListener(ABC):
         if is_first_time:
             self._mark_new_token_detected(buffer, contract, token_info)
 
-        # 更新缓冲区
-        self._record_transfer(buffer, transfer_data)
-        self._print_transfer_event(token_info, transfer_data, to_address)
+        # 逐笔记账直到需要分析：窗口内第一笔立即分析，满足条件的告警不被延迟
+        analyzed = False
+        for index, transfer_data in enumerate(transfers):
+            self._record_transfer(buffer, transfer_data)
+            self._print_transfer_event(token_info, transfer_data, transfer_data['to'])
 
-        if self._should_run_analysis(buffer):
-            self._run_full_analysis(contract, buffer, token_info)
-        else:
+            if not self._should_run_analysis(buffer):
+                continue
+
+            # 单笔即达到大额阈值的转账不被合并窗口延迟，立即分析（不重开窗口）
+            in_window = self._in_analysis_window(buffer, transfer_data)
+            if in_window and not self._is_large_single(transfer_data):
+                self._defer_analysis(contract, buffer, token_info)
+            else:
+                if not in_window:
+                    buffer['analysis_window'] = (transfer_data.get('block_number'), time.monotonic())
+                self._run_full_analysis(contract, buffer, token_info)
+                analyzed = True
+
+            # 本批其余转账批量写入，合并为一次分析（其中有单笔大额时立即执行）
+            remaining = transfers[index + 1:]
+            if remaining:
+                self._record_transfers(buffer, remaining)
+                for transfer_data in remaining:
+                    self._print_transfer_event(token_info, transfer_data, transfer_data['to'])
+                self.stats['coalesced_analyses'] += len(remaining) - 1
+                if any(self._is_large_single(transfer_data) for transfer_data in remaining):
+                    self._run_full_analysis(contract, buffer, token_info)
+                else:
+                    self._defer_analysis(contract, buffer, token_info)
+                    analyzed = False
+            break
+
+        if not analyzed:
             self._print_basic_stats(buffer)
 
+    def _lookup_cached_token(self, address: str):
+        """
+        查询代币元数据缓存（内存 -> 负缓存 -> 持久化缓存）
+
+        返回:
+            (hit, info): 负缓存命中时 info 为 None
+        """
+        if address in self.known_tokens:
+            return True, self.known_tokens[address]
+
+        expires_at = self._negative_tokens.get(address)
+        if expires_at is not None:
+            if time.time() < expires_at:
+                return True, None
+            del self._negative_tokens[address]
+
+        if self.token_store:
+            hit, info = self.token_store.get(self.chain_name, address)
+            if hit:
+                if info:
+                    self.known_tokens[address] = info
+                else:
+                    self._negative_tokens[address] = time.time() + self.negative_token_ttl
+                return True, info
+
+        return False, None
+
+    def _cache_token_info(self, address: str, info: Optional[Dict], persist: bool = True):
+        """写入代币元数据缓存，info 为 None 时记为负缓存"""
+        self._token_retry_at.pop(address, None)
+        if info:
+            self.known_tokens[address] = info
+            self._negative_tokens.pop(address, None)
+            if persist and self.token_store:
+                self.token_store.put(self.chain_name, address, info)
+        else:
+            self._negative_tokens[address] = time.time() + self.negative_token_ttl
+            if persist and self.token_store:
+                self.token_store.put_negative(self.chain_name, address)
+
+    def _defer_token_lookup(self, addresses):
+        """网络错误导致元数据未取到：不写负缓存，token_retry_delay 秒后再异步重试"""
+        retry_at = time.time() + self.token_retry_delay
+        for address in addresses:
+            self._token_retry_at[address] = retry_at
+
+    def _retry_pending(self, address: str) -> bool:
+        """合约是否仍在网络错误后的重试等待期内"""
+        return self._token_retry_at.get(address, 0) > time.time()
+
+    def _due_token_retries(self) -> List[str]:
+        """重试等待期已过、元数据仍未取到的合约"""
+        now = time.time()
+        return [address for address, retry_at in self._token_retry_at.items() if retry_at <= now]
+
     def _display_analysis(self, analysis, token_info):
         """显示分析结果"""
         print(f"\n   {'─'*60}")
@@ -499,37 +982,14 @@ class BaseChainListener(ABC):
         if buffer.get('alert_sent'):
             return  # 已发送过告警
 
-        confidence = analysis['confidence']
-        transfer_count = len(buffer['transfers'])
-        sender_count = len(buffer['senders'])
-
-        # 检查是否为大额转账
-        total_value = sum(tx.get('value', 0) for tx in buffer['transfers'])
-        max_single_value = max((tx.get('value', 0) for tx in buffer['transfers']), default=0)
-        is_large_transfer = (
-            total_value >= 1e24 or  # 100万代币总额
-            max_single_value >= 1e23  # 10万代币单笔
-        )
+        # 与评分使用同一份特征，阈值不会分叉
+        features = analysis.get('features')
+        if features is None:
+            features = self.analyzer.extract_features(buffer['transfers'], buffer['senders'], token_info)
 
         # 告警条件
-        should_alert = False
-        alert_level = None
-        trigger_reason = None  # 触发原因标识
-
-        # HIGH 级别：原有逻辑 OR 大额单笔转账
-        if confidence >= 0.8 and transfer_count >= 3 and sender_count >= 2:
-            should_alert = True
-            alert_level = 'HIGH'
-            trigger_reason = 'multi_transfer'  # 多笔转账逻辑
-        elif confidence >= 0.8 and is_large_transfer:
-            # 新增：大额单笔转账也触发 HIGH 告警
-            should_alert = True
-            alert_level = 'HIGH'
-            trigger_reason = 'large_single'  # 大额单笔逻辑
-        elif confidence >= 0.6 and transfer_count >= 5:
-            should_alert = True
-            alert_level = 'MEDIUM'
-            trigger_reason = 'medium_confidence'  # 中等置信度
+        alert_level, trigger_reason = self.analyzer.classify_alert(analysis['confidence'], features)
+        should_alert = alert_level is not None
 
         if should_alert:
             # 二次验证 - 避免误报
@@ -569,8 +1029,9 @@ class BaseChainListener(ABC):
         print(f"   触发原因: {trigger_hint}")
         print(f"   代币: {token_info['symbol']} ({token_info['name']})")
         print(f"   合约: {contract}")
-        print(f"   转账数: {len(buffer['transfers'])} 笔")
-        print(f"   发送者: {len(buffer['senders'])} 个")
+        features = analysis.get('features')
+        print(f"   转账数: {features.transfer_count if features else len(buffer['transfers'])} 笔")
+        print(f"   发送者: {features.sender_count if features else len(buffer['senders'])} 个")
         print(f"   置信度: {analysis['confidence']:.2%}")
         print(f"   {analysis['recommendation']}")
 
@@ -583,19 +1044,31 @@ class BaseChainListener(ABC):
         action = action_suggestions.get(trigger_reason, '建议：深入调查此代币')
         print(f"   💡 {action}\n")
 
-        # 发送飞书通知
+        # 发送飞书通知（在事件循环中运行时放入线程池，避免阻塞其他链/订阅）
         if self.feishu_notifier:
             try:
-                self.feishu_notifier.send_token_alert(
-                    level=level,
-                    chain=self.chain_name,
-                    contract=contract,
-                    token_info=token_info,
-                    buffer=buffer,
-                    analysis=analysis
-                )
-            except Exception as e:
-                print(f"   ⚠️  飞书通知发送失败: {e}")
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+
+            if loop:
+                loop.run_in_executor(None, self._notify_feishu, level, contract, buffer, analysis, token_info)
+            else:
+                self._notify_feishu(level, contract, buffer, analysis, token_info)
+
+    def _notify_feishu(self, level, contract, buffer, analysis, token_info):
+        """发送飞书告警卡片"""
+        try:
+            self.feishu_notifier.send_token_alert(
+                level=level,
+                chain=self.chain_name,
+                contract=contract,
+                token_info=token_info,
+                buffer=buffer,
+                analysis=analysis
+            )
+        except Exception as e:
+            print(f"   ⚠️  飞书通知发送失败: {e}")
 
     def _is_monitored_wallet(self, to_address: str) -> bool:
         """判断转入地址是否属于监控钱包"""
@@ -618,10 +1091,48 @@ class BaseChainListener(ABC):
             'alert_sent': False,
             'chain': self.chain_name,
             'binance_symbol': None,
+            'accumulator': None,        # 流式分析特征（首次分析时创建）
+            'analysis_window': None,    # (区块号, 开启时间)，窗口内的后续转账合并分析
+            'analysis_pending': False,
         }
 
-    def _handle_listed_token(self, contract: str, token_info: Dict[str, Any]) -> bool:
-        """检测并处理币安已上架代币"""
+    def _reject_by_address(self, contract: str) -> bool:
+        """
+        仅凭合约地址即可判定的过滤（在元数据查询之前执行）
+
+        1. 币安已上架代币
+        2. 元数据负缓存中的非标准合约
+        """
+        metadata_cached = contract in self.known_tokens
+
+        if self._handle_listed_token(contract):
+            if not metadata_cached:
+                self._count_lookup_avoided(contract)
+            return True
+
+        if not metadata_cached:
+            hit, info = self._lookup_cached_token(contract)
+            if hit and info is None:
+                self._count_lookup_avoided(contract)
+                return True
+
+        return False
+
+    def _count_lookup_avoided(self, contract: str):
+        """每个合约只计一次（此后即使不提前过滤，元数据也已在缓存中）"""
+        if contract not in self._lookup_avoided_contracts:
+            self._lookup_avoided_contracts.add(contract)
+            self.stats['metadata_lookups_avoided'] += 1
+
+    def _is_listed_contract(self, contract: str) -> bool:
+        """合约是否已在币安上架（纯查询，无副作用）"""
+        if not self.binance_filter:
+            return False
+        is_listed, _ = self.binance_filter.is_listed_on_binance(contract)
+        return is_listed
+
+    def _handle_listed_token(self, contract: str) -> bool:
+        """检测并处理币安已上架代币（只依赖合约地址，不查询元数据）"""
         if not self.binance_filter:
             return False
 
@@ -629,6 +1140,8 @@ class BaseChainListener(ABC):
         if not is_listed:
             return False
 
+        binance_info = binance_info or {}
+
         buffer_was_known = contract in self.new_tokens_buffer
         buffer = self._get_token_buffer(contract)
         buffer['is_new'] = False
@@ -636,7 +1149,9 @@ class BaseChainListener(ABC):
 
         if not buffer_was_known:
             self.stats['filtered_tokens'] += 1
-            print(f"\n⏭️  [{self.chain_name}] 已过滤 (已上架): {token_info['symbol']} ({token_info['name']})")
+            symbol = binance_info.get('symbol', 'N/A')
+            name = binance_info.get('name') or self._shorten(contract)
+            print(f"\n⏭️  [{self.chain_name}] 已过滤 (已上架): {symbol} ({name})")
 
         return True
 
@@ -651,12 +1166,60 @@ class BaseChainListener(ABC):
         print(f"   合约: {contract}")
         print("   ✅ 未在币安上架 - 可能是即将上线的新币!")
 
+    def _record_transfers(self, buffer: Dict[str, Any], transfers: List[Dict[str, Any]]):
+        """批量缓存转账数据"""
+        buffer['transfers'].extend(transfers)
+        buffer['senders'].update(tx['from'] for tx in transfers if tx.get('from'))
+        accumulator = buffer.get('accumulator')
+        if accumulator is not None:
+            for tx in transfers:
+                accumulator.add(tx)
+
     def _record_transfer(self, buffer: Dict[str, Any], transfer_data: Dict[str, Any]):
         """缓存转账数据"""
         buffer['transfers'].append(transfer_data)
         sender = transfer_data.get('from')
         if sender:
             buffer['senders'].add(sender)
+        accumulator = buffer.get('accumulator')
+        if accumulator is not None:
+            accumulator.add(transfer_data)
+
+    def _retract_transfer(self, transfer_data: Dict[str, Any]) -> bool:
+        """
+        从缓冲区撤回一笔转账（所在区块已被链重组替换）
+
+        只修改该代币自己的缓冲区；已发出的告警无法撤回，仅保留缓冲区。
+        """
+        contract = transfer_data.get('contract')
+        buffer = self.new_tokens_buffer.get(contract)
+        if not buffer:
+            return False
+
+        transfers = buffer['transfers']
+        for index, recorded in enumerate(transfers):
+            if recorded is transfer_data:
+                del transfers[index]
+                break
+        else:
+            return False
+
+        sender = transfer_data.get('from')
+        if sender and all(tx.get('from') != sender for tx in transfers):
+            buffer['senders'].discard(sender)
+        # 累加器与缓冲区一致时反向扣减，否则丢弃，下次分析时重建
+        accumulator = buffer.get('accumulator')
+        if accumulator is not None and accumulator.count == len(transfers) + 1:
+            accumulator.remove(transfer_data)
+        else:
+            buffer['accumulator'] = None
+
+        self.stats['retracted_transfers'] += 1
+        print(f"   ↩️  [{self.chain_name}] 撤回重组区块中的转账: {self._shorten(transfer_data.get('tx_hash', 'N/A'))}")
+
+        if not transfers and not buffer['alert_sent']:
+            del self.new_tokens_buffer[contract]
+        return True
 
     def _print_transfer_event(self, token_info: Dict[str, Any], transfer_data: Dict[str, Any], to_address: str):
         """格式化打印单笔充值事件"""
@@ -689,21 +1252,93 @@ class BaseChainListener(ABC):
             tx = buffer['transfers'][0]
             value = tx.get('value', 0)
 
-            # 检查是否为大额转账（与 AdvancedTokenAnalyzer 阈值一致）
-            # 单笔 >= 10万代币 或 总额 >= 100万代币
-            if value >= 1e23:  # 10万代币单笔 (假设18 decimals)
+            # 直接使用 AdvancedTokenAnalyzer 的大额阈值
+            if self.analyzer.is_large_transfer(value, value):
                 return True
 
         return False
 
+    def _is_large_single(self, transfer_data: Dict[str, Any]) -> bool:
+        """单笔转账是否已达到大额阈值（项目方打新场景，不应被合并分析延迟）"""
+        value = transfer_data.get('value', 0)
+        return self.analyzer.is_large_transfer(value, value)
+
+    def _in_analysis_window(self, buffer: Dict[str, Any], transfer_data: Dict[str, Any]) -> bool:
+        """转账是否落在该代币当前的合并分析窗口内"""
+        window = buffer.get('analysis_window')
+        if not window:
+            return False
+
+        block_number, opened_at = window
+        if self.analysis_window > 0:
+            return time.monotonic() - opened_at < self.analysis_window
+        return block_number is not None and transfer_data.get('block_number') == block_number
+
+    def _defer_analysis(self, contract: str, buffer: Dict[str, Any], token_info: Dict[str, Any]):
+        """标记待合并分析；按时间窗口合并时在事件循环中安排到期执行"""
+        if buffer.get('analysis_pending'):
+            self.stats['coalesced_analyses'] += 1
+        else:
+            buffer['analysis_pending'] = True
+            self._pending_analyses[contract] = token_info
+
+        if self.analysis_window > 0 and self._pending_flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            delay = max(0.0, buffer['analysis_window'][1] + self.analysis_window - time.monotonic())
+            self._pending_flush_handle = loop.call_later(delay, self._on_pending_flush_timer)
+
+    def _on_pending_flush_timer(self):
+        self._pending_flush_handle = None
+        self._flush_pending_analyses()
+
+    def _flush_pending_analyses(self, force: bool = False):
+        """
+        执行窗口已结束的合并分析（每批转账处理完后调用）
+
+        按区块合并时批次边界即窗口边界；按时间合并时只执行已到期的窗口，force=True 时全部执行。
+        """
+        if not self._pending_analyses:
+            return
+
+        now = time.monotonic()
+        next_due = None
+        for contract in list(self._pending_analyses):
+            buffer = self.new_tokens_buffer.get(contract)
+            if not buffer or not buffer.get('analysis_pending') or not buffer['transfers']:
+                del self._pending_analyses[contract]
+                continue
+
+            if not force and self.analysis_window > 0:
+                due = buffer['analysis_window'][1] + self.analysis_window
+                if now < due:
+                    next_due = due if next_due is None else min(next_due, due)
+                    continue
+
+            # 窗口到此结束，之后的第一笔转账重新立即分析
+            token_info = self._pending_analyses.pop(contract)
+            buffer['analysis_window'] = None
+            self._run_full_analysis(contract, buffer, token_info)
+
+        if next_due is not None and self._pending_flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self._pending_flush_handle = loop.call_later(max(0.0, next_due - now), self._on_pending_flush_timer)
+
     def _run_full_analysis(self, contract: str, buffer: Dict[str, Any], token_info: Dict[str, Any]):
         """执行策略分析并触发告警"""
+        buffer['analysis_pending'] = False
         print("\n   📊 执行完整策略分析...")
-        analysis = self.analyzer.analyze_transfers(
-            buffer['transfers'],
-            buffer['senders'],
-            token_info
-        )
+        accumulator = buffer.get('accumulator')
+        if not self.analyzer.accumulator_matches(accumulator, len(buffer['transfers']), token_info):
+            accumulator = self.analyzer.create_accumulator(token_info, buffer['transfers'])
+            buffer['accumulator'] = accumulator
+
+        analysis = self.analyzer.analyze_accumulated(accumulator, buffer['senders'], token_info)
         buffer['analysis'] = analysis
 
         self._display_analysis(analysis, token_info)
@@ -725,145 +1360,1082 @@ class BaseChainListener(ABC):
         return f"{value[:prefix]}...{value[-suffix:]}"
 
 
-class EVMChainListener(BaseChainListener):
-    """EVM兼容链监听器 (支持 Ethereum, BSC) - HTTP 轮询"""
+class BlockTimestampCache:
+    """
+    区块时间戳 LRU 缓存（每条链一个实例）
 
-    def __init__(self, chain_name: str, rpc_url: str, ws_url: Optional[str],
-                 binance_wallets: List[str], analyzer: AdvancedTokenAnalyzer,
-                 binance_filter: Optional[BinanceTokenFilter] = None,
-                 feishu_notifier: Optional['FeishuNotifier'] = None,
-                 proxy: Optional[str] = None):
-        super().__init__(chain_name, binance_wallets, analyzer, binance_filter, feishu_notifier)
+    有界缓存 block_number -> timestamp；查询失败时可根据已缓存区块按出块时间插值估算。
+    """
 
-        # Web3 连接
-        if proxy:
-            print(f"🔄 [{chain_name}] 使用代理: {proxy}")
-            request_kwargs = {'proxies': {'http': proxy, 'https': proxy}}
-            self.w3 = Web3(Web3.HTTPProvider(rpc_url, request_kwargs=request_kwargs))
+    def __init__(self, max_size: int = 4096, default_block_time: float = 12.0):
+        self.max_size = max_size
+        self.default_block_time = default_block_time
+        self._cache: "OrderedDict[int, int]" = OrderedDict()
+
+    def __contains__(self, block_number: int) -> bool:
+        return block_number in self._cache
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, block_number: int) -> Optional[int]:
+        """读取缓存（命中时刷新 LRU 顺序）"""
+        timestamp = self._cache.get(block_number)
+        if timestamp is not None:
+            self._cache.move_to_end(block_number)
+        return timestamp
+
+    def put(self, block_number: int, timestamp: int):
+        """写入缓存，超出容量时淘汰最久未使用的区块"""
+        self._cache[block_number] = int(timestamp)
+        self._cache.move_to_end(block_number)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def estimate(self, block_number: int) -> Optional[int]:
+        """根据最近的已知区块和出块时间插值估算时间戳，缓存为空时返回 None"""
+        if not self._cache:
+            return None
+
+        lowest, highest = min(self._cache), max(self._cache)
+        if highest > lowest:
+            block_time = (self._cache[highest] - self._cache[lowest]) / (highest - lowest)
         else:
-            self.w3 = Web3(Web3.HTTPProvider(rpc_url))
+            block_time = self.default_block_time
 
-        if not self.w3.is_connected():
-            raise Exception(f"❌ [{chain_name}] RPC 节点连接失败")
+        anchor = min(self._cache, key=lambda n: abs(n - block_number))
+        return int(self._cache[anchor] + (block_number - anchor) * block_time)
 
-        print(f"✅ [{chain_name}] RPC 已连接: {rpc_url}")
-        print(f"   当前区块: {self.w3.eth.block_number}")
 
-        self.binance_wallets = [Web3.to_checksum_address(addr) for addr in binance_wallets]
+class BlockHashWindow:
+    """
+    最近区块哈希的滚动窗口（链重组检测）
 
-    def get_token_info(self, contract_address: str) -> Optional[Dict]:
-        """获取ERC20/BEP20代币信息"""
-        if contract_address in self.known_tokens:
-            return self.known_tokens[contract_address]
+    只保留最高区块往前 size 个区块内的记录；同一高度出现不同哈希即说明发生了重组。
+    """
 
-        try:
-            contract_address = Web3.to_checksum_address(contract_address)
-            contract = self.w3.eth.contract(address=contract_address, abi=TOKEN_ABI)
-
-            info = {
-                'address': contract_address,
-                'name': contract.functions.name().call(),
-                'symbol': contract.functions.symbol().call(),
-                'decimals': contract.functions.decimals().call(),
-            }
+    def __init__(self, size: int = 64):
+        self.size = size
+        self._hashes: "OrderedDict[int, str]" = OrderedDict()
+        self._highest_block = -1
+
+    def record(self, block_number: int, block_hash: str) -> bool:
+        """记录区块哈希，返回是否与已记录的哈希一致（首次记录视为一致）"""
+        known = self._hashes.get(block_number)
+        if known is not None:
+            return known == block_hash
+
+        self._hashes[block_number] = block_hash
+        if block_number > self._highest_block:
+            self._highest_block = block_number
+            cutoff = block_number - self.size
+            for stale in [n for n in self._hashes if n < cutoff]:
+                del self._hashes[stale]
+        return True
 
-            # 尝试获取总供应量
-            try:
-                info['total_supply'] = contract.functions.totalSupply().call()
-            except:
-                info['total_supply'] = None
+    def get(self, block_number: int) -> Optional[str]:
+        return self._hashes.get(block_number)
 
-            self.known_tokens[contract_address] = info
-            return info
-        except Exception as e:
-            print(f"   ⚠️  [{self.chain_name}] 无法获取代币信息 {contract_address}: {e}")
-            return None
+    @property
+    def highest_block(self) -> int:
+        """已记录的最高区块（无记录时为 -1）"""
+        return self._highest_block
 
-    def decode_transfer_log(self, log):
-        """解析 Transfer 事件"""
-        try:
-            from_address = '0x' + log['topics'][1].hex()[-40:]
-            to_address = '0x' + log['topics'][2].hex()[-40:]
-            value = int(log['data'].hex(), 16)
+    def block_numbers(self) -> List[int]:
+        return sorted(self._hashes)
 
-            return {
-                'block_number': log['blockNumber'],
-                'tx_hash': log['transactionHash'].hex(),
-                'contract': log['address'],
-                'from': Web3.to_checksum_address(from_address),
-                'to': Web3.to_checksum_address(to_address),
-                'value': value,
-                'timestamp': None,
-            }
+    def discard_from(self, block_number: int) -> List[int]:
+        """移除 block_number 及之后的所有记录，返回被移除的区块号"""
+        removed = sorted(n for n in self._hashes if n >= block_number)
+        for n in removed:
+            del self._hashes[n]
+        self._highest_block = max(self._hashes, default=-1)
+        return removed
+
+
+class LogDeduplicator:
+    """
+    按区块索引的日志去重集合（有界）
+
+    键为 (tx_hash, log_index)，按区块分桶保存；只保留最近 window_blocks 个区块，
+    更早的分桶整体淘汰，内存占用与区块窗口成正比。
+    """
+
+    def __init__(self, window_blocks: int = 2000):
+        self.window_blocks = window_blocks
+        self._buckets: Dict[int, Set] = {}
+        self._block_heap: List[int] = []
+        self._highest_block = -1
+
+    def add(self, block_number: int, key, keep_stale: bool = False) -> bool:
+        """
+        记录日志，返回是否首次出现
+
+        已淘汰区块的日志默认视为重复；keep_stale=True 时照常记录（补齐历史缺口时使用，
+        此类分桶在最高区块下次前进时被淘汰）。
+        """
+        if not keep_stale and block_number < self._highest_block - self.window_blocks:
+            return False
+
+        bucket = self._buckets.get(block_number)
+        if bucket is None:
+            bucket = self._buckets[block_number] = set()
+            heapq.heappush(self._block_heap, block_number)
+        elif key in bucket:
+            return False
+
+        bucket.add(key)
+        if block_number > self._highest_block:
+            self._highest_block = block_number
+            self._prune()
+        return True
+
+    def discard(self, block_number: int, key):
+        """移除单条记录（日志被标记为 removed 后允许重新投递）"""
+        bucket = self._buckets.get(block_number)
+        if bucket:
+            bucket.discard(key)
+
+    def discard_block(self, block_number: int):
+        """移除某个区块的全部记录"""
+        self._buckets.pop(block_number, None)
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    def _prune(self):
+        cutoff = self._highest_block - self.window_blocks
+        while self._block_heap and self._block_heap[0] < cutoff:
+            self._buckets.pop(heapq.heappop(self._block_heap), None)
+
+
+class AdaptiveBlockRange:
+    """
+    自适应区块窗口
+
+    - 查询失败（超时 / too many results）: 窗口减半，并以减半后的窗口作为上限
+    - 返回日志过多: 下一次窗口减半
+    - 查询成功且结果适中: 窗口翻倍（不超过上限）；连续成功若干次后解除上限
+    """
+
+    def __init__(self, initial_size: int = 100, min_size: int = 1, max_size: int = 2000,
+                 max_logs_per_query: int = 5000, ceiling_reset_after: int = 20):
+        self.min_size = min_size
+        self.max_size = max(min_size, max_size)
+        self.max_logs_per_query = max_logs_per_query
+        self.ceiling_reset_after = ceiling_reset_after
+        self.size = min(max(initial_size, self.min_size), self.max_size)
+        self._ceiling = self.max_size
+        self._success_streak = 0
+        # 使用该窗口的查询路径是否处于追赶模式
+        self.catching_up = False
+
+    def on_success(self, log_count: int):
+        """查询成功后调整窗口"""
+        self._success_streak += 1
+        if self._success_streak >= self.ceiling_reset_after:
+            self._ceiling = self.max_size
+            self._success_streak = 0
+
+        if log_count >= self.max_logs_per_query:
+            self.size = max(self.min_size, self.size // 2)
+        else:
+            self.size = min(self._ceiling, self.size * 2)
+
+    def on_error(self) -> bool:
+        """查询失败后缩小窗口，返回是否还能缩小（False 表示已是最小窗口）"""
+        self._success_streak = 0
+        if self.size <= self.min_size:
+            return False
+        self.size = max(self.min_size, self.size // 2)
+        self._ceiling = self.size
+        return True
+
+
+class AdaptivePollInterval:
+    """
+    按观测出块时间自适应的新区块探测间隔
+
+    - 看到新区块后，休眠到"预计下一个区块出现"的时刻
+    - 超过预计时间仍无新区块时，以较短间隔重试
+    - 出块时间用指数滑动平均学习，限制在 [min_interval, max_interval]
+    """
+
+    def __init__(self, initial_block_time: float, min_interval: float = 0.5,
+                 max_interval: float = 60.0, smoothing: float = 0.2):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        self.block_time = min(max(initial_block_time, min_interval), max_interval)
+        self._last_head: Optional[int] = None
+        self._last_head_at: Optional[float] = None
+
+    def on_head(self, head: int, now: Optional[float] = None):
+        """记录一次区块高度观测"""
+        now = time.monotonic() if now is None else now
+        if self._last_head is not None and head <= self._last_head:
+            return
+
+        if self._last_head is not None:
+            sample = (now - self._last_head_at) / (head - self._last_head)
+            sample = min(max(sample, self.min_interval), self.max_interval)
+            self.block_time += self.smoothing * (sample - self.block_time)
+
+        self._last_head = head
+        self._last_head_at = now
+
+    def next_delay(self, now: Optional[float] = None) -> float:
+        """距离下一次探测的等待时间（秒）"""
+        if self._last_head_at is None:
+            return self.min_interval
+
+        now = time.monotonic() if now is None else now
+        remaining = self._last_head_at + self.block_time - now
+        if remaining > self.min_interval:
+            return min(remaining, self.max_interval)
+        return max(self.min_interval, self.block_time / 4)
+
+
+class EVMChainListener(BaseChainListener):
+    """EVM兼容链监听器 (支持 Ethereum, BSC) - HTTP 轮询"""
+
+    # 各链默认出块时间（秒），用于区块时间戳插值
+    DEFAULT_BLOCK_TIMES = {
+        'Ethereum': 12.0,
+        'BSC': 3.0,
+    }
+
+    def __init__(self, chain_name: str, rpc_url: str, ws_url: Optional[str],
+                 binance_wallets: List[str], analyzer: AdvancedTokenAnalyzer,
+                 binance_filter: Optional[BinanceTokenFilter] = None,
+                 feishu_notifier: Optional['FeishuNotifier'] = None,
+                 proxy: Optional[str] = None,
+                 combine_wallet_logs: bool = True,
+                 max_block_range: int = 2000,
+                 multicall_address: Optional[str] = MULTICALL3_ADDRESS,
+                 token_store: Optional['TokenMetadataStore'] = None,
+                 confirmations: int = 0,
+                 reorg_window: int = 64,
+                 use_new_heads: bool = True,
+                 use_log_filter: bool = False,
+                 checkpoint_store: Optional['CheckpointStore'] = None,
+                 analysis_window: float = 0.0):
+        super().__init__(chain_name, binance_wallets, analyzer, binance_filter, feishu_notifier, token_store,
+                         checkpoint_store, analysis_window)
+
+        self.rpc_url = rpc_url
+        self.ws_url = ws_url
+        self.proxy = proxy
+        # 异步 HTTP Web3（listen_async 首次使用时创建）
+        self.async_http_w3: Optional[AsyncWeb3] = None
+
+        # Web3 连接
+        if proxy:
+            print(f"🔄 [{chain_name}] 使用代理: {proxy}")
+            request_kwargs = {'proxies': {'http': proxy, 'https': proxy}}
+            self.w3 = Web3(Web3.HTTPProvider(rpc_url, request_kwargs=request_kwargs))
+        else:
+            self.w3 = Web3(Web3.HTTPProvider(rpc_url))
+
+        if not self.w3.is_connected():
+            raise Exception(f"❌ [{chain_name}] RPC 节点连接失败")
+
+        print(f"✅ [{chain_name}] RPC 已连接: {rpc_url}")
+        print(f"   当前区块: {self.w3.eth.block_number}")
+
+        self.binance_wallets = [Web3.to_checksum_address(addr) for addr in binance_wallets]
+
+        # 合并查询模式：一次 eth_getLogs 覆盖所有监控钱包（topics[2] 传 OR 列表）
+        self.combine_wallet_logs = combine_wallet_logs
+        # 钱包索引：小写地址 -> checksum 地址，用于把合并查询的日志路由回钱包
+        self._wallet_index: Dict[str, str] = {addr.lower(): addr for addr in self.binance_wallets}
+
+        # 自适应区块窗口（失败/结果过多时缩小，成功时放大）
+        self.block_range = AdaptiveBlockRange(max_size=max_block_range)
+
+        # 代币元数据批量查询（multicall_address=None 时逐个 eth_call）
+        self.multicall_address = Web3.to_checksum_address(multicall_address) if multicall_address else None
+        self.multicall_batch_size = 100
+
+        # 区块时间戳缓存（每条链独立）
+        self.block_timestamps = BlockTimestampCache(
+            default_block_time=self.DEFAULT_BLOCK_TIMES.get(chain_name, 12.0)
+        )
+
+        # 日志去重（WebSocket / 补齐 / 轮询可能重复投递同一条日志）
+        self.seen_logs = LogDeduplicator(window_blocks=max(max_block_range, 2000))
+
+        # 链重组处理：
+        #   confirmations - 区间查询只处理 最新区块-confirmations 之前的区块（0 = 最低延迟）
+        #   reorg_window  - 保留最近多少个区块的哈希用于重组检测（0 = 关闭检测）
+        self.confirmations = confirmations
+        self.block_hashes = BlockHashWindow(size=reorg_window)
+        # 区块号 -> [(日志键, 转账)]，重组时按区块撤回
+        self._block_transfers: Dict[int, List] = {}
+
+        # 新区块探测：有 ws_url 时优先 newHeads 订阅，否则按学习到的出块时间轮询
+        self.use_new_heads = use_new_heads
+        self.head_interval = AdaptivePollInterval(
+            initial_block_time=self.DEFAULT_BLOCK_TIMES.get(chain_name, 12.0)
+        )
+
+        # 服务端日志过滤器模式：安装一次 eth_newFilter，之后只轮询增量 eth_getFilterChanges
+        # 过滤器覆盖之前的区块（启动 / 重装前的缺口）仍用区间查询补齐
+        self.use_log_filter = use_log_filter
+        self._log_filter_id = None
+        self._log_filter_start: Optional[int] = None
+        self._pending_filter_logs: List = []
+
+    @staticmethod
+    def _wallet_topic(wallet: str) -> str:
+        """将钱包地址编码为 32 字节 topic"""
+        return '0x' + wallet[2:].lower().zfill(64)
+
+    def _wallet_topics(self) -> List[str]:
+        """所有监控钱包的 topic 列表（用作 topics[2] 的 OR 条件）"""
+        return [self._wallet_topic(wallet) for wallet in self.binance_wallets]
+
+    def _transfer_log_topics(self) -> List:
+        """所有监控钱包转入 Transfer 事件的 topics 过滤条件"""
+        return [TRANSFER_EVENT_SIGNATURE, None, self._wallet_topics()]
+
+    def _route_log_to_wallet(self, log) -> Optional[str]:
+        """根据 topics[2] 将日志路由回对应的监控钱包"""
+        try:
+            topic_to = log['topics'][2]
+        except (KeyError, IndexError, TypeError):
+            return None
+        topic_hex = topic_to.hex() if isinstance(topic_to, (bytes, bytearray)) else str(topic_to)
+        return self._wallet_index.get('0x' + topic_hex[-40:].lower())
+
+    def get_token_info(self, contract_address: str) -> Optional[Dict]:
+        """获取ERC20/BEP20代币信息"""
+        if contract_address in self.known_tokens:
+            return self.known_tokens[contract_address]
+
+        return self.get_token_infos([contract_address]).get(Web3.to_checksum_address(contract_address))
+
+    def get_token_infos(self, contract_addresses: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        批量获取代币信息
+
+        先查内存/负缓存/持久化缓存，未命中的合约通过 Multicall3 aggregate3 一次性查询
+        name/symbol/decimals/totalSupply，Multicall 不可用时退回逐个 eth_call。
+        查询失败的合约写入负缓存，TTL 内不再重复查询。
+
+        返回:
+            {checksum 合约地址: 代币信息 或 None}
+        """
+        results, pending = self._split_cached_tokens(contract_addresses)
+
+        for chunk in self._chunk_addresses(pending):
+            try:
+                fetched = self._fetch_token_metadata(chunk)
+            except Exception as e:
+                # 网络类错误不写负缓存，下次仍会重试
+                print(f"   ⚠️  [{self.chain_name}] 查询 {len(chunk)} 个代币信息失败: {e}")
+                results.update({address: None for address in chunk})
+                continue
+
+            results.update(self._store_token_metadata(fetched))
+
+        return results
+
+    async def _prefetch_token_infos(self, contract_addresses):
+        """
+        异步预取代币元数据，结果只写入缓存
+
+        与 get_token_infos 相同：优先 Multicall3，不可用时并发逐个 eth_call，
+        合约查询失败写负缓存。网络错误的批次不写负缓存，等待期内不再查询，
+        之后的同步 get_token_info 只读缓存，不会在事件循环上发起 RPC。
+        重试等待期已过的合约随本批一起重新查询。
+        """
+        _, pending = self._split_cached_tokens([*contract_addresses, *self._due_token_retries()])
+        pending = [address for address in pending if not self._retry_pending(address)]
+        if not pending:
+            return
+
+        for chunk in self._chunk_addresses(pending):
+            try:
+                fetched = await self._fetch_token_metadata_async(chunk)
+            except Exception as e:
+                print(f"   ⚠️  [{self.chain_name}] 异步查询 {len(chunk)} 个代币信息失败，稍后重试: {e}")
+                self._defer_token_lookup(chunk)
+                continue
+            self._store_token_metadata(fetched)
+
+    async def _fetch_token_metadata_async(self, addresses: List[str]) -> Dict[str, List]:
+        """_fetch_token_metadata 的异步版本（AsyncWeb3）"""
+        w3 = self._get_async_http_w3()
+        if self.multicall_address:
+            try:
+                multicall = w3.eth.contract(address=self.multicall_address, abi=MULTICALL3_ABI)
+                returned = await multicall.functions.aggregate3(self._build_metadata_calls(addresses)).call()
+                return self._split_metadata_results(addresses, returned)
+            except Exception as e:
+                print(f"   ⚠️  [{self.chain_name}] 异步 Multicall 查询代币信息失败，改为逐个查询: {e}")
+
+        results = await asyncio.gather(*(
+            self._fetch_token_metadata_single_async(w3, address) for address in addresses
+        ))
+        return dict(zip(addresses, results))
+
+    async def _fetch_token_metadata_single_async(self, w3: AsyncWeb3, address: str) -> List:
+        """_fetch_token_metadata_single 的异步版本（合约 revert 记为失败，网络错误直接抛出）"""
+        call_results = []
+        for _, selector in TOKEN_METADATA_SELECTORS:
+            try:
+                call_results.append((True, bytes(await w3.eth.call({'to': address, 'data': selector}))))
+            except (ProviderConnectionError, OSError, asyncio.TimeoutError):
+                raise
+            except Exception:
+                call_results.append((False, b''))
+        return call_results
+
+    def _split_cached_tokens(self, contract_addresses):
+        """区分已缓存（含负缓存）与待查询的合约，返回 (results, pending)"""
+        results: Dict[str, Optional[Dict]] = {}
+        pending: List[str] = []
+        for address in contract_addresses:
+            address = Web3.to_checksum_address(address)
+            hit, info = self._lookup_cached_token(address)
+            if hit:
+                results[address] = info
+            elif address not in pending:
+                pending.append(address)
+        return results, pending
+
+    def _chunk_addresses(self, addresses: List[str]):
+        """按 multicall_batch_size 切分合约列表"""
+        for start in range(0, len(addresses), self.multicall_batch_size):
+            yield addresses[start:start + self.multicall_batch_size]
+
+    def _store_token_metadata(self, fetched: Dict[str, List]) -> Dict[str, Optional[Dict]]:
+        """解码元数据原始返回值并写入缓存（失败写负缓存）"""
+        results = {}
+        for address, call_results in fetched.items():
+            info = self._decode_token_metadata(address, call_results)
+            self._cache_token_info(address, info)
+            results[address] = info
+        return results
+
+    def _fetch_token_metadata(self, addresses: List[str]) -> Dict[str, List]:
+        """查询代币元数据原始返回值: {地址: [(success, returnData), ...]}"""
+        if self.multicall_address:
+            try:
+                return self._fetch_token_metadata_multicall(addresses)
+            except Exception as e:
+                print(f"   ⚠️  [{self.chain_name}] Multicall 查询代币信息失败，改为逐个查询: {e}")
+
+        return {address: self._fetch_token_metadata_single(address) for address in addresses}
+
+    def _fetch_token_metadata_multicall(self, addresses: List[str]) -> Dict[str, List]:
+        """通过一次 Multicall3 aggregate3 调用查询多个合约的元数据"""
+        multicall = self.w3.eth.contract(address=self.multicall_address, abi=MULTICALL3_ABI)
+        returned = multicall.functions.aggregate3(self._build_metadata_calls(addresses)).call()
+        return self._split_metadata_results(addresses, returned)
+
+    @staticmethod
+    def _build_metadata_calls(addresses: List[str]) -> List:
+        """构造 aggregate3 调用列表（每个合约 name/symbol/decimals/totalSupply 四个调用）"""
+        return [
+            (address, True, selector)
+            for address in addresses
+            for _, selector in TOKEN_METADATA_SELECTORS
+        ]
+
+    @staticmethod
+    def _split_metadata_results(addresses: List[str], returned) -> Dict[str, List]:
+        """把 aggregate3 的扁平返回值按合约切分"""
+        width = len(TOKEN_METADATA_SELECTORS)
+        return {
+            address: returned[i * width:(i + 1) * width]
+            for i, address in enumerate(addresses)
+        }
+
+    def _fetch_token_metadata_single(self, address: str) -> List:
+        """逐个 eth_call 查询单个合约的元数据（合约 revert 记为失败，网络错误直接抛出）"""
+        call_results = []
+        for _, selector in TOKEN_METADATA_SELECTORS:
+            try:
+                call_results.append((True, bytes(self.w3.eth.call({'to': address, 'data': selector}))))
+            except (ProviderConnectionError, OSError):
+                raise
+            except Exception:
+                call_results.append((False, b''))
+        return call_results
+
+    def _decode_token_metadata(self, address: str, call_results: List) -> Optional[Dict]:
+        """解码元数据返回值，name/symbol/decimals 任一失败则视为非标准代币"""
+        decoded = {}
+        try:
+            for (field, _), (success, data) in zip(TOKEN_METADATA_SELECTORS, call_results):
+                if not success or not data:
+                    decoded[field] = None
+                elif field in ('name', 'symbol'):
+                    decoded[field] = self._decode_string_result(data)
+                else:
+                    decoded[field] = self.w3.codec.decode(['uint256'], data)[0]
+        except Exception as e:
+            print(f"   ⚠️  [{self.chain_name}] 无法解析代币信息 {address}: {e}")
+            return None
+
+        if decoded.get('name') is None or decoded.get('symbol') is None or decoded.get('decimals') is None:
+            print(f"   ⚠️  [{self.chain_name}] 无法获取代币信息 {address}: 非标准 ERC20 合约")
+            return None
+
+        return {
+            'address': address,
+            'name': decoded['name'],
+            'symbol': decoded['symbol'],
+            'decimals': decoded['decimals'],
+            'total_supply': decoded.get('total_supply'),
+        }
+
+    def _decode_string_result(self, data: bytes) -> str:
+        """解码 string 返回值，兼容 bytes32 编码的 name/symbol（如 MKR）"""
+        if len(data) == 32:
+            return data.rstrip(b'\x00').decode('utf-8', errors='replace')
+        return self.w3.codec.decode(['string'], data)[0]
+
+    def decode_transfer_log(self, log):
+        """解析 Transfer 事件"""
+        try:
+            from_address = '0x' + log['topics'][1].hex()[-40:]
+            to_address = '0x' + log['topics'][2].hex()[-40:]
+            value = int(log['data'].hex(), 16)
+
+            return {
+                'block_number': log['blockNumber'],
+                'tx_hash': log['transactionHash'].hex(),
+                'contract': log['address'],
+                'from': Web3.to_checksum_address(from_address),
+                'to': Web3.to_checksum_address(to_address),
+                'value': value,
+                'timestamp': None,
+            }
         except Exception as e:
             print(f"   ⚠️  [{self.chain_name}] 日志解析失败: {e}")
             return None
 
-    def get_block_timestamp(self, block_number):
-        """获取区块时间戳"""
+    def get_block_timestamp(self, block_number, fetch: bool = True):
+        """
+        获取区块时间戳（优先读缓存，查询失败时按出块时间插值）
+
+        fetch=False 时不发起 RPC，未缓存直接插值（异步路径已批量预取过区块头）。
+        """
+        timestamp = self.block_timestamps.get(block_number)
+        if timestamp is not None:
+            return timestamp
+        if not fetch:
+            return self._estimate_block_timestamp(block_number, "批量预取未返回该区块")
+
         try:
             block = self.w3.eth.get_block(block_number)
+            self.block_timestamps.put(block_number, block['timestamp'])
             return block['timestamp']
-        except:
+        except Exception as e:
+            return self._estimate_block_timestamp(block_number, e)
+
+    def _estimate_block_timestamp(self, block_number: int, error: Exception) -> int:
+        """区块头获取失败时估算时间戳"""
+        estimated = self.block_timestamps.estimate(block_number)
+        if estimated is None:
+            print(f"   ⚠️  [{self.chain_name}] 获取区块 {block_number} 时间戳失败，使用当前时间: {error}")
             return int(time.time())
 
+        print(f"   ⚠️  [{self.chain_name}] 获取区块 {block_number} 时间戳失败，按出块时间插值: {error}")
+        return estimated
+
+    async def _prefetch_block_timestamps(self, logs):
+        """
+        预取一批日志涉及区块的时间戳
+
+        1. 节点在日志中返回 blockTimestamp 时直接使用
+        2. 其余未缓存区块通过一次 JSON-RPC 批量请求获取
+        """
+        missing = set()
+        for log in logs:
+            block_number = log.get('blockNumber')
+            if block_number is None or block_number in self.block_timestamps:
+                continue
+
+            log_timestamp = log.get('blockTimestamp')
+            if log_timestamp is not None:
+                if isinstance(log_timestamp, str):
+                    log_timestamp = int(log_timestamp, 16)
+                self.block_timestamps.put(block_number, log_timestamp)
+            else:
+                missing.add(block_number)
+
+        if not missing:
+            return
+
+        for block_number, timestamp in (await self._fetch_block_timestamps(sorted(missing))).items():
+            self.block_timestamps.put(block_number, timestamp)
+
+    async def _fetch_block_timestamps(self, block_numbers: List[int]) -> Dict[int, int]:
+        """批量获取区块时间戳（失败的区块留给 get_block_timestamp 插值）"""
+        headers = await self._fetch_block_headers(block_numbers)
+        return {block_number: block['timestamp'] for block_number, block in headers.items()}
+
+    async def _fetch_block_headers(self, block_numbers: List[int]) -> Dict[int, Any]:
+        """批量获取区块头，不支持批量请求时并发逐个获取；失败的区块不出现在结果中"""
+        w3 = self._get_async_http_w3()
+        if len(block_numbers) > 1 and hasattr(w3, 'batch_requests'):
+            try:
+                async with w3.batch_requests() as batch:
+                    for block_number in block_numbers:
+                        batch.add(w3.eth.get_block(block_number))
+                    blocks = await batch.async_execute()
+                return {block['number']: block for block in blocks if block}
+            except Exception as e:
+                print(f"   ⚠️  [{self.chain_name}] 批量获取区块头失败，改为逐个获取: {e}")
+
+        blocks = await asyncio.gather(
+            *(w3.eth.get_block(block_number) for block_number in block_numbers),
+            return_exceptions=True
+        )
+        return {
+            block_number: block
+            for block_number, block in zip(block_numbers, blocks)
+            if block and not isinstance(block, BaseException)
+        }
+
+    def _get_async_http_w3(self) -> AsyncWeb3:
+        """懒加载异步 HTTP Web3（aiohttp 连接池，keep-alive 复用连接）"""
+        if self.async_http_w3 is None:
+            request_kwargs = {'proxy': self.proxy} if self.proxy else {}
+            self.async_http_w3 = AsyncWeb3(AsyncHTTPProvider(self.rpc_url, request_kwargs=request_kwargs))
+        return self.async_http_w3
+
     def listen(self, from_block='latest', poll_interval=12, callback=None):
-        """HTTP 轮询监听"""
+        """HTTP 轮询监听（同步入口，内部运行异步轮询）"""
+        try:
+            asyncio.run(self.listen_async(from_block=from_block, poll_interval=poll_interval, callback=callback))
+        except KeyboardInterrupt:
+            print(f"\n⏹️  [{self.chain_name}] 监听已停止")
+
+    async def listen_async(self, from_block='latest', poll_interval=12, callback=None):
+        """
+        HTTP 轮询监听（自适应区块窗口 + 追赶模式），可与其他链共享同一事件循环
+
+        每出现一个新区块触发一次区间查询；poll_interval 为两次探测之间的最长等待。
+        """
         print(f"\n{'='*80}")
         print(f"🔄 [{self.chain_name}] 启动 HTTP 轮询监听")
         print(f"{'='*80}")
         print(f"监控钱包: {len(self.binance_wallets)} 个")
         print(f"轮询间隔: {poll_interval} 秒")
+        print(f"区块窗口: {self.block_range.size} (最大 {self.block_range.max_size})")
+        print(f"确认数: {self.confirmations}")
         print(f"{'='*80}\n")
 
-        current_block = self.w3.eth.block_number if from_block == 'latest' else int(from_block)
+        w3 = self._get_async_http_w3()
+        checkpoint = self._load_checkpoint() if from_block == 'latest' else None
+        if checkpoint and checkpoint.get('next_block') is not None:
+            current_block = int(checkpoint['next_block'])
+            print(f"⏮️  [{self.chain_name}] 从上次进度恢复，区块 {current_block} 起批量追赶")
+        elif from_block == 'latest':
+            current_block = max(0, await w3.eth.block_number - self.confirmations)
+        else:
+            current_block = int(from_block)
         print(f"⏰ [{self.chain_name}] 从区块 {current_block} 开始监听...\n")
 
+        self.head_interval.max_interval = max(poll_interval, self.head_interval.min_interval)
         try:
-            while True:
-                latest_block = self.w3.eth.block_number
+            async for head in self._iter_new_heads():
+                if self.use_log_filter:
+                    current_block = await self._poll_log_filter(current_block, head, callback)
+                else:
+                    current_block = await self._catch_up_to(current_block, head - self.confirmations, callback)
+                self._save_checkpoint({'next_block': current_block})
 
-                if latest_block > current_block:
-                    self._process_block_range(current_block, latest_block, callback)
-                    current_block = latest_block + 1
+        except asyncio.CancelledError:
+            print(f"\n⏹️  [{self.chain_name}] 监听已停止")
+            raise
+        finally:
+            await self._uninstall_log_filter()
 
-                time.sleep(poll_interval)
+    async def _poll_log_filter(self, current_block: int, head: int, callback=None) -> int:
+        """
+        过滤器模式下处理一个新区块，返回下一个需要区间查询补齐的区块
 
-        except KeyboardInterrupt:
-            print(f"\n⏹️  [{self.chain_name}] 监听已停止")
+        过滤器失效（节点重启 / 过期回收）时丢弃并在下一个区块重新安装，
+        期间的缺口由区间查询补齐，重复日志按 (tx_hash, log_index) 去重。
+        """
+        target = head - self.confirmations
+        w3 = self._get_async_http_w3()
 
-    def _process_block_range(self, start_block: int, end_block: int, callback=None):
-        """按区块范围处理所有监控钱包"""
-        print(f"🔍 [{self.chain_name}] 检查区块 {start_block} - {end_block}")
+        if self._log_filter_id is None:
+            try:
+                log_filter = await w3.eth.filter({'topics': self._transfer_log_topics()})
+                self._log_filter_id = log_filter.filter_id
+                self._log_filter_start = head + 1
+                print(f"✅ [{self.chain_name}] 已安装日志过滤器 {self._log_filter_id}（覆盖区块 {head + 1} 起）")
+            except Exception as e:
+                print(f"   ⚠️  [{self.chain_name}] 安装日志过滤器失败，本轮使用区间查询: {e}")
+                return await self._catch_up_to(current_block, target, callback)
 
-        for wallet in self.binance_wallets:
-            self._process_wallet_logs(wallet, start_block, end_block, callback)
+        # 过滤器覆盖之前的区块用区间查询补齐
+        if current_block < self._log_filter_start:
+            current_block = await self._catch_up_to(
+                current_block, min(target, self._log_filter_start - 1), callback
+            )
 
-    def _process_wallet_logs(self, wallet: str, start_block: int, end_block: int, callback=None):
-        """拉取并处理指定钱包在区块范围内的 Transfer 日志"""
         try:
-            logs = self.w3.eth.get_logs({
-                'fromBlock': start_block,
-                'toBlock': end_block,
-                'topics': [
-                    TRANSFER_EVENT_SIGNATURE,
-                    None,
-                    '0x' + wallet[2:].zfill(64)
-                ]
-            })
+            changes = await w3.eth.get_filter_changes(self._log_filter_id)
         except Exception as e:
-            print(f"   ⚠️  [{self.chain_name}] 查询 {wallet[:10]}... 失败: {e}")
+            print(f"   ⚠️  [{self.chain_name}] 日志过滤器已失效，将重新安装并补齐缺口: {e}")
+            self._log_filter_id = None
+            return current_block
+
+        self._pending_filter_logs.extend(log for log in changes if self._route_log_to_wallet(log))
+
+        # 未达到确认数的日志留到后续区块再处理
+        ready = [log for log in self._pending_filter_logs if self._to_int(log['blockNumber']) <= target]
+        if ready:
+            self._pending_filter_logs = [
+                log for log in self._pending_filter_logs if self._to_int(log['blockNumber']) > target
+            ]
+            await self._handle_transfer_logs(ready, callback)
+
+        if current_block >= self._log_filter_start:
+            current_block = max(current_block, target + 1)
+        return current_block
+
+    async def _uninstall_log_filter(self):
+        """停止监听时卸载日志过滤器"""
+        if self._log_filter_id is None:
             return
+        try:
+            await self._get_async_http_w3().eth.uninstall_filter(self._log_filter_id)
+        except Exception:
+            pass
+        self._log_filter_id = None
+
+    async def _iter_new_heads(self):
+        """产出新的区块高度：优先 newHeads 订阅，不可用或断开时改为自适应间隔轮询"""
+        if self.use_new_heads and self.ws_url and WebSocketProvider is not None:
+            try:
+                async for head in self._subscribe_new_heads():
+                    yield head
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"   ⚠️  [{self.chain_name}] newHeads 订阅不可用，改为按出块时间轮询: {e}")
+
+        async for head in self._poll_new_heads():
+            yield head
+
+    async def _subscribe_new_heads(self):
+        """newHeads 订阅：每个新区块头推送一次"""
+        # 连接失败快速回退到轮询，不走 provider 默认的多次重试
+        async with AsyncWeb3(WebSocketProvider(self.ws_url, max_connection_retries=1)) as ws_w3:
+            await ws_w3.eth.subscribe('newHeads')
+            print(f"✅ [{self.chain_name}] 已订阅 newHeads，按新区块触发查询")
+            async for response in ws_w3.socket.process_subscriptions():
+                header = response.get('result') or {}
+                if header.get('number') is not None:
+                    head = self._to_int(header['number'])
+                    self.head_interval.on_head(head)
+                    yield head
+
+    async def _poll_new_heads(self):
+        """按学习到的出块时间探测 eth_blockNumber，只在高度变化时产出"""
+        w3 = self._get_async_http_w3()
+        last_head = None
+        while True:
+            try:
+                head = await w3.eth.block_number
+            except Exception as e:
+                print(f"   ⚠️  [{self.chain_name}] 获取最新区块失败: {e}")
+                await asyncio.sleep(self.head_interval.max_interval)
+                continue
+
+            self.head_interval.on_head(head)
+            if last_head is None or head > last_head:
+                last_head = head
+                yield head
+            await asyncio.sleep(self.head_interval.next_delay())
+
+    @property
+    def is_catching_up(self) -> bool:
+        """主查询路径是否处于追赶模式"""
+        return self.block_range.catching_up
+
+    async def _catch_up_to(self, current_block: int, latest_block: int, callback=None,
+                           block_range: Optional[AdaptiveBlockRange] = None) -> int:
+        """
+        分块处理 current_block..latest_block，返回下一个待处理区块
+
+        落后超过一个窗口时进入追赶模式：连续拉取、不休眠，并打印进度。
+        查询失败时缩小窗口重试，窗口已到下限仍失败则留待下次轮询。
+        已处理区块被重组替换时，先撤回其转账并回退到分叉点重新处理。
+
+        block_range: 该查询路径自己的自适应窗口与追赶状态（默认主查询路径的 block_range）
+        """
+        block_range = block_range or self.block_range
+        current_block = await self._rewind_on_reorg(current_block)
+        backlog = latest_block - current_block + 1
+        if backlog <= 0:
+            return current_block
+
+        catching_up = backlog > block_range.size
+        if catching_up and not block_range.catching_up:
+            print(f"⏩ [{self.chain_name}] 落后 {backlog} 个区块，进入追赶模式")
+        block_range.catching_up = catching_up
+
+        while current_block <= latest_block:
+            end_block = min(current_block + block_range.size - 1, latest_block)
+            log_count = await self._process_block_range(current_block, end_block, callback)
+
+            if log_count is None:
+                if not block_range.on_error():
+                    break  # 窗口已是最小值，等待下一轮
+                continue
+
+            block_range.on_success(log_count)
+            current_block = end_block + 1
+
+            if block_range.catching_up:
+                remaining = latest_block - end_block
+                progress = 1 - remaining / backlog
+                print(f"⏩ [{self.chain_name}] 追赶进度: {progress:.1%} "
+                      f"(剩余 {remaining} 个区块, 窗口 {block_range.size})")
+
+        if block_range.catching_up and current_block > latest_block:
+            print(f"✅ [{self.chain_name}] 已追上链头 (区块 {latest_block})")
+            block_range.catching_up = False
+
+        return current_block
+
+    async def _process_block_range(self, start_block: int, end_block: int, callback=None) -> Optional[int]:
+        """按区块范围处理所有监控钱包，返回日志条数；查询失败返回 None"""
+        print(f"🔍 [{self.chain_name}] 检查区块 {start_block} - {end_block}")
+
+        try:
+            logs = await self._fetch_range_logs(start_block, end_block)
+        except Exception as e:
+            print(f"   ⚠️  [{self.chain_name}] 查询区块 {start_block} - {end_block} 失败: {e}")
+            return None
+
+        await self._handle_transfer_logs(logs, callback)
+        return len(logs)
+
+    async def _fetch_range_logs(self, start_block: int, end_block: int) -> List:
+        """拉取区块范围内所有监控钱包的 Transfer 日志（任一查询失败则整体抛出）"""
+        if self.combine_wallet_logs:
+            return await self._fetch_combined_logs(start_block, end_block)
+
+        # 分钱包查询时并发发出请求
+        per_wallet = await asyncio.gather(
+            *(self._fetch_wallet_logs(wallet, start_block, end_block) for wallet in self.binance_wallets)
+        )
+        return [log for logs in per_wallet for log in logs]
+
+    async def _fetch_combined_logs(self, start_block: int, end_block: int) -> List:
+        """单次 eth_getLogs 拉取所有监控钱包的 Transfer 日志，再按钱包索引路由"""
+        logs = await self._get_async_http_w3().eth.get_logs({
+            'fromBlock': start_block,
+            'toBlock': end_block,
+            'topics': self._transfer_log_topics()
+        })
+        return [log for log in logs if self._route_log_to_wallet(log)]
+
+    async def _fetch_wallet_logs(self, wallet: str, start_block: int, end_block: int) -> List:
+        """拉取指定钱包在区块范围内的 Transfer 日志"""
+        return await self._get_async_http_w3().eth.get_logs({
+            'fromBlock': start_block,
+            'toBlock': end_block,
+            'topics': [
+                TRANSFER_EVENT_SIGNATURE,
+                None,
+                '0x' + wallet[2:].zfill(64)
+            ]
+        })
+
+    @staticmethod
+    def _hex(value) -> str:
+        """HexBytes / 十六进制字符串统一为不带 0x 的小写字符串"""
+        value = value.hex() if isinstance(value, (bytes, bytearray)) else str(value)
+        return value.lower().removeprefix('0x')
+
+    @staticmethod
+    def _log_key(log):
+        """日志唯一键 (tx_hash, log_index)"""
+        return EVMChainListener._hex(log['transactionHash']), EVMChainListener._to_int(log['logIndex'])
+
+    async def _rewind_on_reorg(self, current_block: int) -> int:
+        """
+        校验上次处理到的区块哈希，发现重组则撤回并返回分叉点
+
+        平时只取上次处理到的区块与已记录的最高区块的区块头（一次批量请求，最多两个）；
+        哈希不一致时才批量取回窗口内全部已记录区块，定位分叉点。
+        """
+        if self.block_hashes.size <= 0:
+            return current_block
+
+        tip = current_block - 1
+        probes = [tip] if tip >= 0 else []
+        highest = self.block_hashes.highest_block
+        if highest >= 0 and highest != tip:
+            probes.append(highest)
+        if not probes:
+            return current_block
+
+        headers = await self._fetch_block_headers(probes)
+        if all(
+            self.block_hashes.record(block_number, self._hex(block['hash']))
+            for block_number, block in headers.items() if block.get('hash') is not None
+        ):
+            return current_block
+
+        block_numbers = self.block_hashes.block_numbers()
+        headers = await self._fetch_block_headers(block_numbers)
+        orphaned = [
+            block_number for block_number, block in sorted(headers.items())
+            if block.get('hash') is not None
+            and not self.block_hashes.record(block_number, self._hex(block['hash']))
+        ]
+        if not orphaned:
+            return current_block
+
+        fork_block = orphaned[0]
+        print(f"🔀 [{self.chain_name}] 检测到链重组，从区块 {fork_block} 起重新处理")
+        self._retract_from_block(fork_block)
+        return min(current_block, fork_block)
+
+    def _retract_from_block(self, fork_block: int):
+        """撤回 fork_block 及之后区块的全部转账，并清除这些区块的哈希与去重记录"""
+        self.stats['reorgs'] += 1
+        self.block_hashes.discard_from(fork_block)
+        for block_number in sorted(n for n in self._block_transfers if n >= fork_block):
+            for _, transfer_data in self._block_transfers.pop(block_number):
+                self._retract_transfer(transfer_data)
+            self.seen_logs.discard_block(block_number)
+
+    def _release_removed_logs(self, logs):
+        """清除节点标记为 removed 的日志的去重记录（同一日志重新出现时允许再次处理）"""
+        for log in logs:
+            try:
+                self.seen_logs.discard(self._to_int(log['blockNumber']), self._log_key(log))
+            except (KeyError, TypeError, ValueError):
+                continue
 
+    def _retract_removed_logs(self, logs):
+        """撤回节点标记为 removed 的日志对应的转账"""
         for log in logs:
-            transfer_data = self.decode_transfer_log(log)
-            if not transfer_data:
+            try:
+                block_number = self._to_int(log['blockNumber'])
+                key = self._log_key(log)
+            except (KeyError, TypeError, ValueError):
                 continue
 
+            recorded = self._block_transfers.get(block_number, [])
+            for index, (recorded_key, transfer_data) in enumerate(recorded):
+                if recorded_key == key:
+                    del recorded[index]
+                    self._retract_transfer(transfer_data)
+                    break
+
+    def _check_log_block_hashes(self, logs):
+        """用日志携带的 blockHash 更新哈希窗口；同一高度哈希变化说明旧区块已被替换"""
+        for log in logs:
+            block_hash = log.get('blockHash')
+            if block_hash is None or log.get('blockNumber') is None:
+                continue
+            block_number = self._to_int(log['blockNumber'])
+            block_hash = self._hex(block_hash)
+            if not self.block_hashes.record(block_number, block_hash):
+                print(f"🔀 [{self.chain_name}] 区块 {block_number} 哈希变化，撤回旧区块中的转账")
+                self._retract_from_block(block_number)
+                self.block_hashes.record(block_number, block_hash)
+
+    def _track_block_transfer(self, log, transfer_data):
+        """记录转账所在区块，供重组时撤回（只保留哈希窗口内的区块）"""
+        block_number = transfer_data['block_number']
+        self._block_transfers.setdefault(block_number, []).append((self._log_key(log), transfer_data))
+
+        cutoff = block_number - max(self.block_hashes.size, self.confirmations)
+        for stale in [n for n in self._block_transfers if n < cutoff]:
+            del self._block_transfers[stale]
+
+    @staticmethod
+    def _to_int(value) -> int:
+        """兼容原始 JSON-RPC 的十六进制字符串"""
+        return int(value, 16) if isinstance(value, str) else int(value)
+
+    def _dedupe_logs(self, logs, keep_stale_from: Optional[int] = None) -> List:
+        """
+        按 (tx_hash, log_index) 去重
+
+        keep_stale_from: 不低于该区块的日志即使早于去重窗口也照常接收（补齐缺口时使用）
+        """
+        unique = []
+        for log in logs:
+            try:
+                block_number = self._to_int(log['blockNumber'])
+                keep_stale = keep_stale_from is not None and block_number >= keep_stale_from
+                is_new = self.seen_logs.add(block_number, self._log_key(log), keep_stale)
+            except (KeyError, TypeError, ValueError):
+                is_new = True
+            if is_new:
+                unique.append(log)
+        return unique
+
+    async def _handle_transfer_logs(self, logs, callback=None, deduplicated: bool = False):
+        """
+        解析并处理一批 Transfer 日志（RPC 预取并发完成后，同步处理均命中缓存）
+
+        deduplicated=True 表示调用方已完成 (tx_hash, log_index) 去重。
+        """
+        prepared = await self._prepare_transfer_logs(logs, deduplicated)
+        self._commit_transfer_logs(prepared, callback)
+
+    async def _prepare_transfer_logs(self, logs, deduplicated: bool = False):
+        """
+        处理前的准备：去重、解析，并发预取区块时间戳与代币元数据
+
+        返回 (removed 日志, [(日志, 转账)])，交给 _commit_transfer_logs 按顺序落账。
+        """
+        removed_logs = [log for log in logs if log.get('removed')]
+        if removed_logs:
+            self._release_removed_logs(removed_logs)
+            logs = [log for log in logs if not log.get('removed')]
+
+        self._check_log_block_hashes(logs)
+        if not deduplicated:
+            logs = self._dedupe_logs(logs)
+        decoded = [(log, self.decode_transfer_log(log)) for log in logs]
+        decoded = [(log, transfer_data) for log, transfer_data in decoded if transfer_data]
+        transfers = [transfer_data for _, transfer_data in decoded]
+
+        # 区块时间戳（一次批量请求）与新合约元数据（一次 Multicall，已上架代币无需查询）并发预取
+        await asyncio.gather(
+            self._prefetch_block_timestamps(logs),
+            self._prefetch_token_infos({
+                transfer_data['contract'] for transfer_data in transfers
+                if not self._is_listed_contract(transfer_data['contract'])
+            }),
+        )
+        return removed_logs, decoded
+
+    def _commit_transfer_logs(self, prepared, callback=None):
+        """撤回 removed 日志并处理已准备好的转账（同步执行，不发起 RPC）"""
+        removed_logs, decoded = prepared
+        if removed_logs:
+            self._retract_removed_logs(removed_logs)
+
+        transfers = [transfer_data for _, transfer_data in decoded]
+        for transfer_data in transfers:
             transfer_data['timestamp'] = self.get_block_timestamp(
-                transfer_data['block_number']
+                transfer_data['block_number'], fetch=False
             )
-            self.process_transfer(transfer_data)
+        self.process_transfers(transfers)
+
+        for log, transfer_data in decoded:
+            self._track_block_transfer(log, transfer_data)
 
             if callback:
                 callback(transfer_data, self.new_tokens_buffer)
@@ -876,7 +2448,18 @@ class AsyncEVMWebSocketListener(EVMChainListener):
                  binance_wallets: List[str], analyzer: AdvancedTokenAnalyzer,
                  binance_filter: Optional[BinanceTokenFilter] = None,
                  feishu_notifier: Optional['FeishuNotifier'] = None,
-                 proxy: Optional[str] = None):
+                 proxy: Optional[str] = None,
+                 token_store: Optional['TokenMetadataStore'] = None,
+                 queue_maxsize: int = 10000,
+                 num_workers: int = 2,
+                 enqueue_timeout: float = 1.0,
+                 reconnect_base_delay: float = 1.0,
+                 reconnect_max_delay: float = 60.0,
+                 confirmations: int = 0,
+                 reorg_window: int = 64,
+                 safety_poll_interval: Optional[float] = None,
+                 checkpoint_store: Optional['CheckpointStore'] = None,
+                 analysis_window: float = 0.0):
         # 仍然初始化 HTTP Web3，用于代币信息、区块时间等查询
         super().__init__(
             chain_name=chain_name,
@@ -887,6 +2470,12 @@ class AsyncEVMWebSocketListener(EVMChainListener):
             binance_filter=binance_filter,
             feishu_notifier=feishu_notifier,
             proxy=proxy,
+            token_store=token_store,
+            confirmations=confirmations,
+            reorg_window=reorg_window,
+            use_new_heads=False,
+            checkpoint_store=checkpoint_store,
+            analysis_window=analysis_window,
         )
 
         if not ws_url:
@@ -903,8 +2492,7 @@ class AsyncEVMWebSocketListener(EVMChainListener):
         try:
             # 创建持久化 WebSocket 连接
             # Web3.py v7+ 的 WebSocketProvider 默认是持久化的
-            ws_provider = WebSocketProvider(ws_url)
-            self.async_w3 = AsyncWeb3(ws_provider)
+            self.async_w3 = self._new_ws_connection()
             print(f"✅ [{chain_name}] WebSocket Provider 已初始化")
             print(f"   URL: {ws_url}")
         except Exception as e:
@@ -913,33 +2501,324 @@ class AsyncEVMWebSocketListener(EVMChainListener):
         # WebSocket 模式下不需要轮询间隔，但为了兼容接口仍接受 poll_interval 参数
         self._ws_callback: Optional[Callable] = None
 
+        # 接收阶段只把原始日志放入有界队列，由 worker 协程完成解析、分析和告警
+        self.queue_maxsize = queue_maxsize
+        self.num_workers = max(1, num_workers)
+        self.enqueue_timeout = enqueue_timeout
+        self.worker_batch_size = 100
+        self.log_queue: Optional[asyncio.Queue] = None
+        # 有序交接：worker 并发预取，但按出队顺序逐批落账，缓冲区中的转账保持链上顺序
+        self._dequeued_batches = 0
+        self._commit_turns: Dict[int, asyncio.Event] = {}
+        self._finished_batches: Set[int] = set()
+        self._next_commit = 0
+        self.queue_stats = {
+            'enqueued': 0,            # 入队日志数
+            'processed': 0,           # 已处理日志数
+            'dropped': 0,             # 队列满且等待超时后丢弃的日志数
+            'backpressure_waits': 0,  # 队列满时接收端等待的次数
+            'max_queue_depth': 0,     # 队列深度峰值
+        }
+
+        # 断线重连：指数退避 + 抖动；重连后按最后收到的区块补齐缺口
+        self.reconnect_base_delay = reconnect_base_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self.last_ws_block: Optional[int] = None
+        self._ws_subscribed = False
+        # 监听进度只记录已处理完的高度：
+        #   _ws_processed_block - worker 已处理的最高区块
+        #   _ws_backfill_block  - 正在补齐的缺口起点（补齐完成前进度不越过该区块）
+        #   _ws_dropped_block   - 被丢弃 / 取消的未处理日志的最低区块（下次补齐时重新拉取）
+        self._ws_processed_block: Optional[int] = None
+        self._ws_backfill_block: Optional[int] = None
+        self._ws_dropped_block: Optional[int] = None
+        self._backfill_task: Optional[asyncio.Task] = None
+        self.queue_stats.update({
+            'reconnects': 0,
+            'duplicates': 0,          # 推送与 HTTP 重复投递、被去重丢弃的日志数
+            'http_recovered': 0,      # 由 HTTP（补齐 / 安全轮询）先于推送送达的日志数
+        })
+
+        # 混合模式：设置后与推送并行运行慢速安全轮询，两路日志按 (tx_hash, log_index) 合并
+        self.safety_poll_interval = safety_poll_interval
+        # HTTP 区间查询（缺口补齐 / 安全轮询）逐个执行，各自使用独立的自适应窗口与追赶状态
+        self._catch_up_lock: Optional[asyncio.Lock] = None
+        self.backfill_range = AdaptiveBlockRange(max_size=self.block_range.max_size)
+        self.safety_poll_range = AdaptiveBlockRange(max_size=self.block_range.max_size)
+
+    def _new_ws_connection(self) -> AsyncWeb3:
+        """创建新的 WebSocket 连接对象（每次重连使用全新的 provider）"""
+        return AsyncWeb3(WebSocketProvider(self.ws_url))
+
+    def _reconnect_delay(self, attempt: int) -> float:
+        """第 attempt 次重连的等待时间（指数退避 + ±50% 抖动）"""
+        delay = min(self.reconnect_max_delay, self.reconnect_base_delay * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.5, 1.5)
+
+    def get_queue_stats(self) -> Dict[str, int]:
+        """队列统计（含当前深度）"""
+        stats = dict(self.queue_stats)
+        stats['queue_depth'] = self.log_queue.qsize() if self.log_queue else 0
+        return stats
+
     async def _handle_log(self, handler_context):
-        """WebSocket 订阅回调，处理单条日志 (Web3.py v7 subscription_manager API)"""
-        log = handler_context.result
-        transfer_data = self.decode_transfer_log(log)
-        if not transfer_data:
+        """WebSocket 订阅回调，只负责把原始日志入队 (Web3.py v7 subscription_manager API)"""
+        await self._enqueue_log(handler_context.result)
+
+    async def _enqueue_log(self, log):
+        """原始日志入队；队列满时短暂等待（背压），超时则丢弃并计数"""
+        # 按钱包索引路由，非监控钱包的日志直接忽略
+        if not self._route_log_to_wallet(log):
             return
 
-        # 获取区块时间戳（使用已有 HTTP Web3）
-        transfer_data['timestamp'] = self.get_block_timestamp(
-            transfer_data['block_number']
-        )
+        try:
+            block_number = self._to_int(log['blockNumber'])
+        except (KeyError, TypeError, ValueError):
+            block_number = None
+        if block_number is not None and (self.last_ws_block is None or block_number > self.last_ws_block):
+            self.last_ws_block = block_number
+
+        # 入队前去重：先到先得，HTTP 已送达的日志不再占用队列
+        if not log.get('removed'):
+            self._check_log_block_hashes([log])
+            if not self._dedupe_logs([log]):
+                self.queue_stats['duplicates'] += 1
+                return
+
+        try:
+            self.log_queue.put_nowait(log)
+        except asyncio.QueueFull:
+            self.queue_stats['backpressure_waits'] += 1
+            try:
+                await asyncio.wait_for(self.log_queue.put(log), timeout=self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                # 丢弃的日志撤销去重标记，之后的补齐 / 安全轮询仍可重新送达
+                self._forget_logs([log])
+                self.queue_stats['dropped'] += 1
+                if self.queue_stats['dropped'] % 100 == 1:
+                    print(f"   ⚠️  [{self.chain_name}] 处理队列已满，已丢弃 {self.queue_stats['dropped']} 条日志")
+                return
+
+        self.queue_stats['enqueued'] += 1
+        self.queue_stats['max_queue_depth'] = max(self.queue_stats['max_queue_depth'], self.log_queue.qsize())
+
+    async def _log_worker(self):
+        """
+        处理协程：批量取出日志，预取时间戳/元数据后执行分析与告警
+
+        多个 worker 的预取可以重叠，落账（写缓冲区、分析、回调）按出队顺序逐批进行。
+        """
+        while True:
+            logs = [await self.log_queue.get()]
+            while len(logs) < self.worker_batch_size and not self.log_queue.empty():
+                logs.append(self.log_queue.get_nowait())
+            turn = self._take_commit_turn()
+
+            try:
+                prepared = await self._prepare_transfer_logs(logs, deduplicated=True)
+                await self._commit_turn(turn).wait()
+                self._commit_transfer_logs(prepared, self._ws_callback)
+            except asyncio.CancelledError:
+                # 取消只会发生在预取或排队等待阶段（落账之前），整批日志均未处理，撤销去重标记
+                self._forget_logs(logs)
+                raise
+            except Exception as e:
+                print(f"   ⚠️  [{self.chain_name}] 处理 WebSocket 日志失败: {e}")
+            else:
+                self._on_logs_processed(logs)
+            finally:
+                self._finish_commit_turn(turn)
+                self.queue_stats['processed'] += len(logs)
+                for _ in logs:
+                    self.log_queue.task_done()
+
+    def _take_commit_turn(self) -> int:
+        """按开始处理的先后领取落账序号（worker 与 HTTP 区间查询共用）"""
+        turn = self._dequeued_batches
+        self._dequeued_batches += 1
+        return turn
+
+    def _commit_turn(self, turn: int) -> asyncio.Event:
+        """第 turn 批的落账许可（前一批完成后置位）"""
+        event = self._commit_turns.get(turn)
+        if event is None:
+            event = self._commit_turns[turn] = asyncio.Event()
+            if turn == self._next_commit:
+                event.set()
+        return event
+
+    def _finish_commit_turn(self, turn: int):
+        """第 turn 批结束（成功、失败或取消），按顺序放行后续批次"""
+        self._finished_batches.add(turn)
+        while self._next_commit in self._finished_batches:
+            self._finished_batches.discard(self._next_commit)
+            self._commit_turns.pop(self._next_commit, None)
+            self._next_commit += 1
+        self._commit_turn(self._next_commit).set()
+
+    def _on_logs_processed(self, logs):
+        """一批推送日志处理完成后推进已处理高度并记录进度"""
+        for log in logs:
+            try:
+                block_number = self._to_int(log['blockNumber'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if self._ws_processed_block is None or block_number > self._ws_processed_block:
+                self._ws_processed_block = block_number
+        self._save_ws_checkpoint()
+
+    def _save_ws_checkpoint(self):
+        """
+        记录监听进度：取已处理高度、未完成补齐起点、被丢弃日志区块中的最小值
 
-        self.process_transfer(transfer_data)
+        已处理高度所在区块可能只处理了一部分日志，恢复时从该区块（含）重新拉取。
+        """
+        candidates = [
+            block for block in (self._ws_processed_block, self._ws_backfill_block, self._ws_dropped_block)
+            if block is not None
+        ]
+        if candidates:
+            self._save_checkpoint({'next_block': min(candidates)})
 
-        if self._ws_callback:
-            self._ws_callback(transfer_data, self.new_tokens_buffer)
+    def _forget_logs(self, logs):
+        """
+        放弃未处理的日志（丢弃或处理被取消时调用）
+
+        撤销去重标记并记录最低区块，监听进度不越过该区块，下次补齐从这里重新拉取。
+        """
+        for log in logs:
+            try:
+                block_number = self._to_int(log['blockNumber'])
+                key = self._log_key(log)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not log.get('removed'):
+                self.seen_logs.discard(block_number, key)
+            if self._ws_dropped_block is None or block_number < self._ws_dropped_block:
+                self._ws_dropped_block = block_number
+
+    async def _handle_transfer_logs(self, logs, callback=None, deduplicated: bool = False):
+        """HTTP 路径（补齐 / 安全轮询）送达的日志在此去重，并统计先于推送送达的条数"""
+        if not deduplicated:
+            live_logs = [log for log in logs if not log.get('removed')]
+            self._check_log_block_hashes(live_logs)
+            unique_logs = self._dedupe_logs(live_logs, keep_stale_from=self._ws_backfill_block)
+            self.queue_stats['duplicates'] += len(live_logs) - len(unique_logs)
+            self.queue_stats['http_recovered'] += len(unique_logs)
+            logs = [log for log in logs if log.get('removed')] + unique_logs
+
+        # 与 worker 批次共用落账顺序，HTTP 送达的转账不会与推送批次交错写入缓冲区
+        turn = self._take_commit_turn()
+        try:
+            prepared = await self._prepare_transfer_logs(logs, deduplicated=True)
+            await self._commit_turn(turn).wait()
+            self._commit_transfer_logs(prepared, callback)
+        except asyncio.CancelledError:
+            # 落账前被取消（补齐任务随连接关闭而取消），撤销去重标记，下次补齐重新拉取
+            self._forget_logs(logs)
+            raise
+        finally:
+            self._finish_commit_turn(turn)
 
     async def _run_ws(self, callback=None):
-        """内部协程：为每个监控钱包建立 logs 订阅 (Web3.py v7+ subscription_manager)"""
+        """内部协程：启动处理 worker 后建立 logs 订阅"""
         print(f"\n{'='*80}")
         print(f"🔄 [{self.chain_name}] 启动 WebSocket 监听")
         print(f"{'='*80}")
         print(f"监控钱包: {len(self.binance_wallets)} 个")
+        print(f"处理队列: 容量 {self.queue_maxsize}, worker {self.num_workers} 个")
         print(f"{'='*80}\n")
 
         self._ws_callback = callback
+        self._ws_subscribed = False
+        if self.log_queue is None:
+            self.log_queue = asyncio.Queue(maxsize=self.queue_maxsize)
+        # 落账序号不重置：被取消的批次在退出时已交还序号，HTTP 查询的批次可能仍在途
+        workers = [asyncio.create_task(self._log_worker()) for _ in range(self.num_workers)]
 
+        try:
+            await self._subscribe_and_receive()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            if self._backfill_task:
+                self._backfill_task.cancel()
+                self._backfill_task = None
+            try:
+                await self.async_w3.provider.disconnect()
+            except Exception:
+                pass
+
+    async def _on_subscribed(self):
+        """订阅建立后：记录起始区块，或在后台补齐断线期间的区块"""
+        self._ws_subscribed = True
+        if self.last_ws_block is None:
+            try:
+                self.last_ws_block = await self._get_async_http_w3().eth.block_number
+            except Exception as e:
+                print(f"   ⚠️  [{self.chain_name}] 获取起始区块失败: {e}")
+            return
+
+        # 在接收推送之前确定缺口起点，避免推送先推进 last_ws_block
+        self._backfill_task = asyncio.create_task(
+            self._backfill_gap(self._ws_callback, from_block=self.last_ws_block)
+        )
+
+    def _get_catch_up_lock(self) -> asyncio.Lock:
+        """缺口补齐与安全轮询共用的锁（同一时刻只有一路 HTTP 区间查询）"""
+        if self._catch_up_lock is None:
+            self._catch_up_lock = asyncio.Lock()
+        return self._catch_up_lock
+
+    async def _backfill_gap(self, callback=None, from_block: Optional[int] = None):
+        """
+        用 eth_getLogs 补齐 from_block（默认 last_ws_block）..最新区块
+
+        与 WebSocket 推送的重复日志会被去重；补齐期间推送会推高去重窗口，
+        缺口内的日志不受窗口淘汰限制。补齐完成前监听进度停在缺口起点。
+        """
+        async with self._get_catch_up_lock():
+            await self._backfill_gap_locked(callback, from_block)
+
+    async def _backfill_gap_locked(self, callback=None, from_block: Optional[int] = None):
+        """_backfill_gap 的实现（调用方已持有 _catch_up_lock）"""
+        if from_block is None:
+            from_block = self.last_ws_block
+        if from_block is None:
+            return
+        if self._ws_dropped_block is not None:
+            from_block = min(from_block, self._ws_dropped_block)
+        if self._ws_backfill_block is not None:
+            from_block = min(from_block, self._ws_backfill_block)
+
+        try:
+            head = await self._get_async_http_w3().eth.block_number - self.confirmations
+        except Exception as e:
+            print(f"   ⚠️  [{self.chain_name}] 补齐区块失败，无法获取最新区块: {e}")
+            return
+
+        if head < from_block:
+            return
+
+        print(f"🔁 [{self.chain_name}] 补齐断线期间区块 {from_block} - {head}")
+        self._ws_backfill_block = from_block
+        self._save_ws_checkpoint()
+        next_block = await self._catch_up_to(from_block, head, callback, block_range=self.backfill_range)
+
+        # 只推进到实际补齐的位置，未完成部分留给下一次补齐
+        if next_block > from_block:
+            self.last_ws_block = max(self.last_ws_block or 0, next_block - 1)
+        if self._ws_dropped_block is not None and from_block <= self._ws_dropped_block < next_block:
+            self._ws_dropped_block = None
+        if next_block <= head:
+            self._ws_backfill_block = next_block
+        else:
+            self._ws_backfill_block = None
+            self._ws_processed_block = max(self._ws_processed_block or 0, head)
+        self._save_ws_checkpoint()
+
+    async def _subscribe_and_receive(self):
+        """为每个监控钱包建立 logs 订阅并持续接收 (Web3.py v7+ subscription_manager)"""
         # 确保已经建立持久连接
         try:
             # 检查连接状态
@@ -963,68 +2842,114 @@ class AsyncEVMWebSocketListener(EVMChainListener):
             # Web3.py v7.7.0+ 使用 subscription_manager
             from web3.utils.subscriptions import LogsSubscription
 
-            subscriptions = []
-            for i, wallet in enumerate(self.binance_wallets):
-                topic_to = '0x' + wallet[2:].zfill(64)
-                sub = LogsSubscription(
-                    label=f"{self.chain_name}-wallet-{i}",
-                    topics=[
-                        TRANSFER_EVENT_SIGNATURE,
-                        None,
-                        topic_to,
-                    ],
-                    handler=self._handle_log,
-                )
-                subscriptions.append(sub)
-                print(f"✅ [{self.chain_name}] 已订阅钱包 {self._shorten(wallet)} 的 Transfer 事件")
-
-            await self.async_w3.subscription_manager.subscribe(subscriptions)
+            # 每条链只建立一个订阅：topics[2] 为所有监控钱包的 OR 列表
+            subscription = LogsSubscription(
+                label=f"{self.chain_name}-wallets",
+                topics=self._transfer_log_topics(),
+                handler=self._handle_log,
+            )
+
+            await self.async_w3.subscription_manager.subscribe([subscription])
+            print(f"✅ [{self.chain_name}] 已通过 1 个订阅监听 {len(self.binance_wallets)} 个钱包的 Transfer 事件")
             print(f"✅ [{self.chain_name}] WebSocket 连接成功，使用 Web3.py v7+ 新版 API")
+            await self._on_subscribed()
             await self.async_w3.subscription_manager.handle_subscriptions()
 
         except (ImportError, AttributeError) as e:
             # Web3.py v6 或更早版本，使用旧的 subscribe API
             # 这是正常的兼容性回退，不是错误
             print(f"ℹ️  [{self.chain_name}] WebSocket 使用 Web3.py v6 兼容模式")
-            for wallet in self.binance_wallets:
-                topic_to = '0x' + wallet[2:].zfill(64)
-                logs_filter = {
-                    'topics': [
-                        TRANSFER_EVENT_SIGNATURE,
-                        None,
-                        topic_to,
-                    ]
-                }
-                subscription_id = await self.async_w3.eth.subscribe('logs', logs_filter)
-                print(f"✅ [{self.chain_name}] 已订阅钱包 {self._shorten(wallet)} 的 Transfer 事件 (subscription_id: {subscription_id})")
-
-            # 监听订阅事件
+            subscription_id = await self.async_w3.eth.subscribe('logs', {'topics': self._transfer_log_topics()})
+            print(f"✅ [{self.chain_name}] 已通过 1 个订阅监听 {len(self.binance_wallets)} 个钱包的 Transfer 事件 (subscription_id: {subscription_id})")
+            await self._on_subscribed()
+
+            # 监听订阅事件（只入队，不在接收循环中做任何 RPC）
             async for response in self.async_w3.socket.process_subscriptions():
                 log = response.get('result')
                 if log:
-                    transfer_data = self.decode_transfer_log(log)
-                    if transfer_data:
-                        transfer_data['timestamp'] = self.get_block_timestamp(transfer_data['block_number'])
-                        self.process_transfer(transfer_data)
-                        if self._ws_callback:
-                            self._ws_callback(transfer_data, self.new_tokens_buffer)
+                    await self._enqueue_log(log)
 
     def listen(self, from_block: str = 'latest', poll_interval: int = 12, callback=None):
         """兼容 BaseChainListener 接口的同步入口，内部运行异步 WebSocket 监听"""
-        import asyncio
-
         try:
-            asyncio.run(self._run_ws(callback))
+            asyncio.run(self.listen_async(from_block=from_block, poll_interval=poll_interval, callback=callback))
         except KeyboardInterrupt:
             print(f"\n⏹️  [{self.chain_name}] WebSocket 监听已停止")
-        except ProviderConnectionError as e:
-            # WebSocket 连接失败时，自动回退到 HTTP 轮询模式，避免整个监听线程崩溃
-            print(f"\n⚠️  [{self.chain_name}] WebSocket 监听失败，回退到 HTTP 轮询模式: {e}")
-            super().listen(from_block=from_block, poll_interval=poll_interval, callback=callback)
-        except Exception as e:
-            # 其他异常也做降级处理，保证至少有 HTTP 轮询
-            print(f"\n⚠️  [{self.chain_name}] WebSocket 监听异常，回退到 HTTP 轮询模式: {e}")
-            super().listen(from_block=from_block, poll_interval=poll_interval, callback=callback)
+
+    async def listen_async(self, from_block: str = 'latest', poll_interval: int = 12, callback=None):
+        """
+        WebSocket 监听；设置 safety_poll_interval 时为混合模式（推送 + 安全轮询并行）
+        """
+        if from_block != 'latest':
+            self.last_ws_block = int(from_block)
+        else:
+            checkpoint = self._load_checkpoint()
+            if checkpoint and checkpoint.get('next_block') is not None:
+                # 订阅建立后自动从该区块补齐到链头
+                self.last_ws_block = int(checkpoint['next_block'])
+                print(f"⏮️  [{self.chain_name}] 从上次进度恢复，区块 {self.last_ws_block} 起补齐")
+
+        if not self.safety_poll_interval:
+            await self._ws_reconnect_loop(callback)
+            return
+
+        print(f"🔀 [{self.chain_name}] 混合模式：WebSocket 推送 + 每 {self.safety_poll_interval} 秒安全轮询")
+        await asyncio.gather(
+            self._ws_reconnect_loop(callback),
+            self._safety_poll(from_block, self.safety_poll_interval, callback),
+        )
+
+    async def _safety_poll(self, from_block, poll_interval: float, callback=None):
+        """慢速 eth_getLogs 轮询，补上推送漏掉的日志（与推送重复的日志被去重）"""
+        w3 = self._get_async_http_w3()
+        next_block = None if from_block == 'latest' else int(from_block)
+
+        while True:
+            try:
+                head = await w3.eth.block_number - self.confirmations
+            except Exception as e:
+                print(f"   ⚠️  [{self.chain_name}] 安全轮询获取最新区块失败: {e}")
+                await asyncio.sleep(poll_interval)
+                continue
+
+            if next_block is None:
+                next_block = head
+            recovered_before = self.queue_stats['http_recovered']
+            async with self._get_catch_up_lock():
+                next_block = await self._catch_up_to(next_block, head, callback, block_range=self.safety_poll_range)
+
+            recovered = self.queue_stats['http_recovered'] - recovered_before
+            if recovered:
+                print(f"🛟 [{self.chain_name}] 安全轮询补上 {recovered} 条推送遗漏的日志")
+            await asyncio.sleep(poll_interval)
+
+    async def _ws_reconnect_loop(self, callback=None):
+        """
+        WebSocket 监听（断线自动重连）
+
+        断线后按指数退避 + 抖动重连；等待期间先用 eth_getLogs 补齐缺口，
+        重连成功后再补齐一次并恢复推送模式，重复日志按 (tx_hash, log_index) 去重。
+        """
+        attempt = 0
+        while True:
+            try:
+                await self._run_ws(callback)
+                error = "连接已关闭"
+            except asyncio.CancelledError:
+                print(f"\n⏹️  [{self.chain_name}] WebSocket 监听已停止")
+                raise
+            except Exception as e:
+                error = e
+
+            attempt = 1 if self._ws_subscribed else attempt + 1
+            delay = self._reconnect_delay(attempt)
+            self.queue_stats['reconnects'] += 1
+            print(f"\n⚠️  [{self.chain_name}] WebSocket 断开: {error}")
+            print(f"🔄 [{self.chain_name}] {delay:.1f} 秒后第 {attempt} 次重连（期间使用 HTTP 补齐）")
+
+            await self._backfill_gap(callback)
+            await asyncio.sleep(delay)
+            self.async_w3 = self._new_ws_connection()
 
 
 class SolanaChainListener(BaseChainListener):
@@ -1033,8 +2958,50 @@ class SolanaChainListener(BaseChainListener):
     def __init__(self, rpc_url: str, binance_wallets: List[str],
                  analyzer: AdvancedTokenAnalyzer,
                  binance_filter: Optional[BinanceTokenFilter] = None,
-                 feishu_notifier: Optional['FeishuNotifier'] = None):
-        super().__init__("Solana", binance_wallets, analyzer, binance_filter, feishu_notifier)
+                 feishu_notifier: Optional['FeishuNotifier'] = None,
+                 token_store: Optional['TokenMetadataStore'] = None,
+                 signature_page_size: int = 100,
+                 poll_time_budget: float = 10.0,
+                 tx_fetch_concurrency: int = 8,
+                 ws_url: Optional[str] = None,
+                 reconnect_base_delay: float = 1.0,
+                 reconnect_max_delay: float = 60.0,
+                 checkpoint_store: Optional['CheckpointStore'] = None,
+                 analysis_window: float = 0.0):
+        super().__init__("Solana", binance_wallets, analyzer, binance_filter, feishu_notifier, token_store,
+                         checkpoint_store, analysis_window)
+
+        self.rpc_url = rpc_url
+        # 异步客户端（listen_async 首次使用时创建，httpx 连接池 keep-alive）
+        self.async_client = None
+
+        # 签名分页：每页条数（RPC 上限 1000）与单轮轮询的时间预算（秒）
+        self.signature_page_size = min(max(1, signature_page_size), 1000)
+        self.poll_time_budget = poll_time_budget
+        # 钱包 -> 最新已处理签名（游标）；钱包 -> 预算用尽时留下的缺口 [(before, until)]
+        self.signature_cursors: Dict[str, Optional[str]] = {wallet: None for wallet in binance_wallets}
+        self.signature_gaps: Dict[str, List] = {wallet: [] for wallet in binance_wallets}
+        # 钱包 -> {getTransaction 失败的签名: [slot, 已尝试次数]}，游标已越过，下一轮重试
+        self.signature_retries: Dict[str, Dict[str, List[int]]] = {wallet: {} for wallet in binance_wallets}
+        self.max_signature_retries = 5
+        # 没有游标（首次启动）时处理的最新签名条数；0 = 只定位最新签名，跳过启动前的历史
+        self.initial_signature_limit = 10
+        # 单轮轮询内并发 getTransaction 的上限
+        self.tx_fetch_concurrency = max(1, tx_fetch_concurrency)
+
+        # 推送模式：logsSubscribe(mentions) 通知到达即按游标拉取该钱包的新交易；
+        # 断线期间回退为轮询，重连后从同一游标继续
+        self.ws_url = ws_url
+        self.reconnect_base_delay = reconnect_base_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self._poll_lock: Optional[asyncio.Lock] = None
+        self._ws_subscribed = False
+        # 本轮拉取使用的 commitment（None = 客户端默认 finalized）；
+        # 推送通知为 confirmed，由通知触发的拉取须使用同一级别，否则新交易尚不可见
+        self.subscription_commitment = 'confirmed'
+        self._query_commitment: Optional[str] = None
+        # 订阅期间的慢速兜底轮询间隔（秒）：补上节点漏发的通知
+        self.subscribed_poll_interval = 60.0
 
         try:
             from solders.pubkey import Pubkey
@@ -1050,190 +3017,568 @@ class SolanaChainListener(BaseChainListener):
             raise Exception(f"❌ [Solana] RPC 连接失败: {e}")
 
     def get_token_info(self, mint_address: str) -> Optional[Dict]:
-        """获取SPL代币信息"""
-        if mint_address in self.known_tokens:
-            return self.known_tokens[mint_address]
+        """
+        获取SPL代币信息（只读缓存，不在事件循环上发起 RPC）
 
-        try:
-            from solders.pubkey import Pubkey
+        元数据由 _prefetch_token_infos 在解析前异步批量取得；未取到时返回默认信息（不缓存），
+        确认不是 SPL Token mint 的地址返回 None。
+        """
+        hit, info = self._lookup_cached_token(mint_address)
+        if hit:
+            return info
+
+        print(f"   ⚠️  [Solana] 无法获取代币信息 {mint_address}: 元数据尚未取到")
+        # 返回默认信息
+        return {
+            'address': mint_address,
+            'name': 'Unknown Token',
+            'symbol': 'UNKNOWN',
+            'decimals': 9,
+        }
+
+    async def _prefetch_token_infos(self, mint_addresses):
+        """批量预取未缓存 mint 的元数据：每 50 个 mint 一次 getMultipleAccounts"""
+        missing = [
+            mint for mint in dict.fromkeys([*mint_addresses, *self._due_token_retries()])
+            if not self._lookup_cached_token(mint)[0] and not self._retry_pending(mint)
+        ]
+        if not missing:
+            return
 
-            # 尝试获取代币账户信息
-            mint_pubkey = Pubkey.from_string(mint_address)
+        chunk_size = SOLANA_MULTIPLE_ACCOUNTS_LIMIT // 2
+        chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+        responses = await asyncio.gather(
+            *(self._get_async_client().get_multiple_accounts(self._token_account_keys(chunk)) for chunk in chunks),
+            return_exceptions=True
+        )
 
-            # 获取代币供应量和小数位
-            response = self.client.get_token_supply(mint_pubkey)
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, BaseException):
+                # 网络错误不写负缓存，等待期过后的轮询再异步重试（期间的转账暂存）
+                print(f"   ⚠️  [Solana] 批量获取代币信息失败 ({len(chunk)} 个)，稍后重试: {response}")
+                self._defer_token_lookup(chunk)
+                continue
+            self._store_token_infos(self._parse_token_accounts(chunk, response.value))
+
+    def _store_token_infos(self, infos: Dict[str, Optional[Dict]]):
+        """写入缓存（None 为负缓存：mint 账户不存在或不是 SPL Token mint）"""
+        for mint, info in infos.items():
+            self._cache_token_info(mint, info)
+
+    def _token_account_keys(self, mint_addresses: List[str]) -> List:
+        """按 [mint, metadata PDA] 交替排列的账户列表"""
+        metadata_program = self.Pubkey.from_string(METAPLEX_METADATA_PROGRAM_ID)
+        keys = []
+        for mint in mint_addresses:
+            mint_pubkey = self.Pubkey.from_string(mint)
+            metadata_pda, _ = self.Pubkey.find_program_address(
+                [b'metadata', bytes(metadata_program), bytes(mint_pubkey)], metadata_program
+            )
+            keys.extend([mint_pubkey, metadata_pda])
+        return keys
+
+    def _parse_token_accounts(self, mint_addresses: List[str], accounts: List) -> Dict[str, Optional[Dict]]:
+        """解析 getMultipleAccounts 返回的 [mint, metadata] 账户对"""
+        infos = {}
+        for index, mint in enumerate(mint_addresses):
+            mint_account = accounts[2 * index] if 2 * index < len(accounts) else None
+            metadata_account = accounts[2 * index + 1] if 2 * index + 1 < len(accounts) else None
+
+            if mint_account is None or str(mint_account.owner) not in SPL_TOKEN_PROGRAM_IDS:
+                infos[mint] = None
+                continue
 
-            decimals = 9  # 默认值
-            if response.value:
-                decimals = response.value.decimals
+            mint_data = bytes(mint_account.data)
+            if len(mint_data) < 45:
+                infos[mint] = None
+                continue
 
-            # TODO: 可以通过 Metaplex 获取代币元数据（名称、符号）
-            # 这里使用简化版本
-            info = {
-                'address': mint_address,
-                'name': f'Token-{mint_address[:8]}',
-                'symbol': f'TK-{mint_address[:4]}',
-                'decimals': decimals,
-            }
+            name, symbol = None, None
+            if metadata_account is not None and str(metadata_account.owner) == METAPLEX_METADATA_PROGRAM_ID:
+                name, symbol = self._decode_metaplex_name_symbol(bytes(metadata_account.data))
 
-            self.known_tokens[mint_address] = info
-            return info
-        except Exception as e:
-            print(f"   ⚠️  [Solana] 无法获取代币信息 {mint_address}: {e}")
-            # 返回默认信息
-            info = {
-                'address': mint_address,
-                'name': 'Unknown Token',
-                'symbol': 'UNKNOWN',
-                'decimals': 9,
+            infos[mint] = {
+                'address': mint,
+                'name': name or f'Token-{mint[:8]}',
+                'symbol': symbol or f'TK-{mint[:4]}',
+                'decimals': mint_data[44],
+                'total_supply': int.from_bytes(mint_data[36:44], 'little'),
             }
-            self.known_tokens[mint_address] = info
-            return info
+        return infos
+
+    @staticmethod
+    def _decode_metaplex_name_symbol(data: bytes):
+        """
+        解析 Metaplex Metadata 账户中的 name / symbol
+
+        布局: key(1) + update_authority(32) + mint(32) + name(borsh string) + symbol(borsh string) + ...
+        """
+        try:
+            offset = 1 + 32 + 32
+            fields = []
+            for _ in range(2):
+                length = int.from_bytes(data[offset:offset + 4], 'little')
+                offset += 4
+                fields.append(data[offset:offset + length].decode('utf-8', errors='ignore').rstrip('\x00').strip())
+                offset += length
+            return fields[0] or None, fields[1] or None
+        except Exception:
+            return None, None
+
+    def _get_async_client(self):
+        """懒加载 Solana 异步 RPC 客户端"""
+        if self.async_client is None:
+            from solana.rpc.async_api import AsyncClient
+            self.async_client = AsyncClient(self.rpc_url)
+        return self.async_client
 
     def listen(self, poll_interval: int = 2, callback: Optional[Callable] = None):
-        """Solana 监听（解析 SPL Token Transfer）"""
+        """Solana 监听（同步入口，内部运行异步轮询）"""
+        try:
+            asyncio.run(self.listen_async(poll_interval=poll_interval, callback=callback))
+        except KeyboardInterrupt:
+            print(f"\n⏹️  [Solana] 监听已停止")
+
+    async def listen_async(self, poll_interval: int = 2, callback: Optional[Callable] = None):
+        """Solana 监听（解析 SPL Token Transfer），可与其他链共享同一事件循环"""
         print(f"\n{'='*80}")
         print(f"🔄 [Solana] 启动监听")
         print(f"{'='*80}")
         print(f"监控钱包: {len(self.binance_wallets)} 个")
         print(f"轮询间隔: {poll_interval} 秒")
+        print(f"签名分页: 每页 {self.signature_page_size} 条, 单轮预算 {self.poll_time_budget} 秒")
+        print(f"推送模式: {'logsSubscribe ' + self.ws_url if self.ws_url else '关闭'}")
         print(f"{'='*80}\n")
 
-        last_signatures: Dict[str, Optional[str]] = {wallet: None for wallet in self.binance_wallets}
-
         print(f"✅ [Solana] 开始监听 SPL Token 转账...\n")
 
+        self._restore_signature_cursors()
+
+        # 推送与回退轮询共用同一组游标，串行执行避免重复处理
+        self._poll_lock = asyncio.Lock()
         try:
+            if self.ws_url:
+                await self._listen_with_subscriptions(poll_interval, callback)
             while True:
-                self._poll_wallets(last_signatures, callback)
-                time.sleep(poll_interval)
-        except KeyboardInterrupt:
+                await self._poll_wallets(callback)
+                await asyncio.sleep(poll_interval)
+        except asyncio.CancelledError:
             print(f"\n⏹️  [Solana] 监听已停止")
+            raise
 
-    def _poll_wallets(self, last_signatures: Dict[str, Optional[str]], callback: Optional[Callable]):
-        """轮询所有监控钱包"""
-        for wallet_address in self.binance_wallets:
-            self._process_wallet_transactions(wallet_address, last_signatures, callback)
+    async def _listen_with_subscriptions(self, poll_interval: int, callback: Optional[Callable]):
+        """推送监听（断线自动重连）；断线等待期间按游标轮询，不漏交易"""
+        attempt = 0
+        while True:
+            self._ws_subscribed = False
+            try:
+                await self._run_logs_subscription(callback)
+                error = "连接已关闭"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = e
 
-    def _process_wallet_transactions(self, wallet_address: str,
-                                     last_signatures: Dict[str, Optional[str]],
-                                     callback: Optional[Callable]):
-        """处理指定钱包的最新交易"""
-        try:
-            wallet_pubkey = self.Pubkey.from_string(wallet_address)
-            signatures = self._fetch_recent_signatures(wallet_pubkey)
-        except Exception as e:
-            print(f"   ⚠️  [Solana] 查询钱包 {wallet_address[:8]}... 失败: {e}")
+            attempt = 1 if self._ws_subscribed else attempt + 1
+            delay = min(self.reconnect_max_delay, self.reconnect_base_delay * (2 ** (attempt - 1)))
+            delay *= random.uniform(0.5, 1.5)
+            print(f"\n⚠️  [Solana] logsSubscribe 断开: {error}")
+            print(f"🔄 [Solana] {delay:.1f} 秒后第 {attempt} 次重连（期间按游标轮询）")
+
+            deadline = time.monotonic() + delay
+            while True:
+                await self._poll_wallets(callback)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(poll_interval, remaining))
+
+    async def _run_logs_subscription(self, callback: Optional[Callable]):
+        """
+        每个钱包一个 logsSubscribe(mentions) 订阅（同一连接）
+
+        通知只用作唤醒信号：由单个处理协程按游标拉取被提及钱包的全部新交易，
+        突发通知自然合并，漏掉的通知也会在下一次拉取中补上。
+        每 subscribed_poll_interval 秒还会兜底拉取一次全部钱包，节点漏发通知时不会一直等待。
+        直接使用 JSON-RPC 消息，不依赖 solana-py 各版本不同的 WebSocket 封装。
+        """
+        import websockets
+
+        dirty_wallets: Set[str] = set(self.binance_wallets)  # 订阅建立后先补齐一次
+        wake = asyncio.Event()
+
+        async def drain_worker():
+            loop = asyncio.get_running_loop()
+            next_fallback = loop.time() + self.subscribed_poll_interval
+            while True:
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout=max(0.0, next_fallback - loop.time()))
+                except asyncio.TimeoutError:
+                    dirty_wallets.update(self.binance_wallets)
+                    next_fallback = loop.time() + self.subscribed_poll_interval
+                wake.clear()
+                wallets = [w for w in self.binance_wallets if w in dirty_wallets]
+                dirty_wallets.clear()
+                if not wallets:
+                    continue
+                try:
+                    # shield: 断线取消时让进行中的拉取完成，避免游标已前移而交易未处理
+                    await asyncio.shield(self._poll_wallets(callback, wallets, self.subscription_commitment))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # 拉取失败不结束处理协程，这些钱包随下一次通知或兜底轮询重新拉取
+                    print(f"   ⚠️  [Solana] 拉取 {len(wallets)} 个钱包的新交易失败: {e}")
+                    dirty_wallets.update(wallets)
+
+        async with websockets.connect(self.ws_url, ping_interval=20) as ws:
+            for request_id, wallet_address in enumerate(self.binance_wallets, start=1):
+                await ws.send(json.dumps({
+                    'jsonrpc': '2.0',
+                    'id': request_id,
+                    'method': 'logsSubscribe',
+                    'params': [{'mentions': [wallet_address]}, {'commitment': self.subscription_commitment}],
+                }))
+
+            pending = {request_id: wallet for request_id, wallet in enumerate(self.binance_wallets, start=1)}
+            wallet_by_subscription: Dict[int, str] = {}
+            worker = asyncio.create_task(drain_worker())
+            try:
+                async for raw in ws:
+                    message = json.loads(raw)
+
+                    if message.get('id') in pending:
+                        wallet_address = pending.pop(message['id'])
+                        if 'error' in message:
+                            raise Exception(f"订阅 {wallet_address[:8]}... 失败: {message['error']}")
+                        wallet_by_subscription[message['result']] = wallet_address
+                        if not pending:
+                            self._ws_subscribed = True
+                            print(f"✅ [Solana] 已通过 logsSubscribe 订阅 {len(wallet_by_subscription)} 个钱包")
+                            wake.set()
+                        continue
+
+                    if message.get('method') != 'logsNotification':
+                        continue
+                    params = message.get('params') or {}
+                    wallet_address = wallet_by_subscription.get(params.get('subscription'))
+                    value = ((params.get('result') or {}).get('value') or {})
+                    if wallet_address and value.get('err') is None:
+                        dirty_wallets.add(wallet_address)
+                        wake.set()
+            finally:
+                worker.cancel()
+
+    async def _poll_wallets(self, callback: Optional[Callable], wallets: Optional[List[str]] = None,
+                            commitment: Optional[str] = None):
+        """
+        轮询监控钱包：并发收集新签名 -> 有界并发拉取交易 -> 按 slot 顺序解析
+
+        commitment: 本轮 getSignaturesForAddress / getTransaction 使用的确认级别（默认客户端设置）
+        """
+        wallets = self.binance_wallets if wallets is None else wallets
+        if self._poll_lock is None:
+            self._poll_lock = asyncio.Lock()
+
+        async with self._poll_lock:
+            self._query_commitment = commitment
+            try:
+                await self._poll_wallets_locked(callback, wallets)
+            finally:
+                self._query_commitment = None
+
+    def _restore_signature_cursors(self):
+        """从上次保存的进度恢复各钱包签名游标与未补完的缺口"""
+        checkpoint = self._load_checkpoint()
+        if not checkpoint:
             return
 
-        if not signatures:
+        restored = 0
+        for wallet_address in self.binance_wallets:
+            cursor = (checkpoint.get('cursors') or {}).get(wallet_address)
+            if cursor:
+                self.signature_cursors[wallet_address] = cursor
+                restored += 1
+            gaps = (checkpoint.get('gaps') or {}).get(wallet_address)
+            if gaps:
+                self.signature_gaps[wallet_address] = [tuple(gap) for gap in gaps]
+            retries = (checkpoint.get('retries') or {}).get(wallet_address)
+            if retries:
+                self.signature_retries[wallet_address] = {sig: list(entry) for sig, entry in retries.items()}
+        if restored:
+            print(f"⏮️  [Solana] 已恢复 {restored} 个钱包的签名游标，从断点分页追赶")
+
+    def _save_signature_cursors(self):
+        self._save_checkpoint({
+            'cursors': dict(self.signature_cursors),
+            'gaps': {wallet: list(gaps) for wallet, gaps in self.signature_gaps.items() if gaps},
+            'retries': {wallet: dict(retries) for wallet, retries in self.signature_retries.items() if retries},
+        })
+
+    async def _poll_wallets_locked(self, callback: Optional[Callable], wallets: List[str]):
+        per_wallet = await asyncio.gather(*(
+            self._collect_wallet_signatures(wallet_address)
+            for wallet_address in wallets
+        ))
+
+        # 同一笔交易可能涉及多个监控钱包，只拉取一次
+        wallets_by_signature: Dict[str, List[str]] = {}
+        slots: Dict[str, int] = {}
+        for wallet_address, signatures in zip(wallets, per_wallet):
+            # 上一轮拉取失败的签名（游标已越过）与新签名一起按 slot 顺序处理
+            for sig_str, (slot, _) in self.signature_retries[wallet_address].items():
+                wallets_by_signature.setdefault(sig_str, []).append(wallet_address)
+                slots[sig_str] = slot
+            for sig_info in signatures:
+                sig_str = str(sig_info.signature)
+                if wallet_address not in wallets_by_signature.get(sig_str, ()):
+                    wallets_by_signature.setdefault(sig_str, []).append(wallet_address)
+                slots[sig_str] = sig_info.slot
+
+        if not wallets_by_signature:
+            self._save_signature_cursors()
             return
 
-        signatures.reverse()  # 旧 -> 新
-        for sig_info in signatures:
-            sig_str = str(sig_info.signature)
+        ordered = sorted(wallets_by_signature, key=lambda sig_str: slots[sig_str])
+        transactions = await self._fetch_transactions(ordered)
+        for sig_str, transaction in zip(ordered, transactions):
+            for wallet_address in wallets_by_signature[sig_str]:
+                self._track_signature_retry(wallet_address, sig_str, slots[sig_str], transaction is not None)
+
+        # 解析前批量预取本批新 mint 的元数据（已上架代币无需查询）
+        await self._prefetch_token_infos(
+            mint for transaction in transactions if transaction is not None
+            for mint in self._received_mints(transaction)
+            if not self._is_listed_contract(mint)
+        )
+
+        batch = []
+        for sig_str, transaction in zip(ordered, transactions):
+            if transaction is None:
+                continue
+            for wallet_address in wallets_by_signature[sig_str]:
+                try:
+                    batch.extend(self._parse_solana_transaction(transaction, wallet_address, sig_str))
+                except Exception as e:
+                    print(f"   ⚠️  [Solana] 解析交易 {sig_str[:8]}... 失败: {e}")
+
+        self.process_transfers(batch)
+        if callback:
+            for transfer_data in batch:
+                callback(transfer_data, self.new_tokens_buffer)
 
-            if last_signatures.get(wallet_address) == sig_str:
-                break  # 后续都是已处理的
+        # 本轮交易全部处理后再记录游标，进程中途退出时会从旧游标重新拉取
+        self._save_signature_cursors()
 
-            self._handle_signature(sig_str, wallet_address, callback)
+    def _track_signature_retry(self, wallet_address: str, sig_str: str, slot: int, fetched: bool):
+        """记录 getTransaction 失败的签名供下一轮重试；成功或超过重试次数后移除"""
+        retries = self.signature_retries[wallet_address]
+        if fetched:
+            retries.pop(sig_str, None)
+            return
 
-        last_signatures[wallet_address] = str(signatures[-1].signature)
+        attempts = retries.get(sig_str, [slot, 0])[1] + 1
+        if attempts >= self.max_signature_retries:
+            retries.pop(sig_str, None)
+            print(f"   ⚠️  [Solana] 交易 {sig_str[:8]}... 连续 {attempts} 次获取失败，放弃")
+            return
+        retries[sig_str] = [slot, attempts]
 
-    def _fetch_recent_signatures(self, wallet_pubkey, limit: int = 10):
-        """获取钱包近期签名"""
-        response = self.client.get_signatures_for_address(wallet_pubkey, limit=limit)
-        return response.value or []
+    async def _fetch_transactions(self, signatures: List[str]) -> List:
+        """有界并发拉取交易（复用 AsyncClient 连接池），结果与输入顺序一致，失败为 None"""
+        semaphore = asyncio.Semaphore(self.tx_fetch_concurrency)
 
-    def _handle_signature(self, signature_str: str, wallet_address: str, callback: Optional[Callable]):
-        """获取交易并解析"""
+        async def fetch(sig_str: str):
+            async with semaphore:
+                return await self._fetch_transaction(sig_str)
+
+        return await asyncio.gather(*(fetch(sig_str) for sig_str in signatures))
+
+    async def _fetch_transaction(self, signature_str: str):
+        """获取单笔交易"""
         try:
-            tx_response = self.client.get_transaction(
+            tx_response = await self._get_async_client().get_transaction(
                 self.Signature.from_string(signature_str),
+                commitment=self._query_commitment,
                 max_supported_transaction_version=0
             )
         except Exception as e:
             print(f"   ⚠️  [Solana] 获取交易 {signature_str[:8]}... 失败: {e}")
-            return
+            return None
+        return tx_response.value
 
-        if not tx_response.value:
-            return
+    async def _collect_wallet_signatures(self, wallet_address: str) -> List:
+        """
+        收集指定钱包自上次游标以来的全部成功交易签名
 
+        先按 until=游标 向前翻页拉取新签名，再用剩余预算补历史缺口；
+        预算用尽时记录缺口 (before, until)，下一轮继续，不会丢签名。
+        """
+        deadline = time.monotonic() + self.poll_time_budget
         try:
-            self._parse_solana_transaction(
-                tx_response.value,
-                wallet_address,
-                signature_str,
-                callback
-            )
+            wallet_pubkey = self.Pubkey.from_string(wallet_address)
+            cursor = self.signature_cursors.get(wallet_address)
+
+            if cursor is None:
+                # 首次轮询处理最新一页签名（initial_signature_limit 条），并从最新签名开始监听
+                latest = await self._fetch_signature_page(wallet_pubkey, limit=max(1, self.initial_signature_limit))
+                if latest:
+                    self.signature_cursors[wallet_address] = str(latest[0].signature)
+                signatures = latest[:self.initial_signature_limit]
+            else:
+                signatures, complete = await self._drain_signatures(wallet_pubkey, None, cursor, deadline)
+                if signatures:
+                    if not complete:
+                        self.signature_gaps[wallet_address].append((str(signatures[-1].signature), cursor))
+                    self.signature_cursors[wallet_address] = str(signatures[0].signature)
+        except Exception as e:
+            print(f"   ⚠️  [Solana] 查询钱包 {wallet_address[:8]}... 失败: {e}")
+            return []
+
+        try:
+            await self._drain_signature_gaps(wallet_address, wallet_pubkey, deadline, signatures)
         except Exception as e:
-            print(f"   ⚠️  [Solana] 解析交易 {signature_str[:8]}... 失败: {e}")
+            print(f"   ⚠️  [Solana] 补拉钱包 {wallet_address[:8]}... 历史签名失败: {e}")
+
+        # 同一 slot 内保持链上顺序（旧 -> 新）；失败交易不会带来余额变化，直接跳过
+        signatures.reverse()
+        return [sig_info for sig_info in signatures if sig_info.err is None]
+
+    async def _drain_signature_gaps(self, wallet_address: str, wallet_pubkey, deadline: float,
+                                    collected: List):
+        """在剩余预算内补拉此前未拉完的签名缺口，结果追加到 collected"""
+        gaps = self.signature_gaps[wallet_address]
+        while gaps and time.monotonic() < deadline:
+            before, until = gaps[0]
+            signatures, complete = await self._drain_signatures(wallet_pubkey, before, until, deadline)
+            collected.extend(signatures)
+            if complete:
+                gaps.pop(0)
+            else:
+                gaps[0] = (str(signatures[-1].signature), until)
+
+        if gaps:
+            print(f"   ⏳ [Solana] 钱包 {wallet_address[:8]}... 仍有 {len(gaps)} 段签名待补拉")
+
+    async def _drain_signatures(self, wallet_pubkey, before: Optional[str], until: Optional[str],
+                                deadline: float):
+        """
+        从 before（不含）向旧翻页直到 until（不含），返回 (签名列表[新 -> 旧], 是否拉完)
+        """
+        collected = []
+        while True:
+            page = await self._fetch_signature_page(wallet_pubkey, before=before, until=until)
+            collected.extend(page)
+            if len(page) < self.signature_page_size:
+                return collected, True
+
+            before = str(page[-1].signature)
+            if time.monotonic() >= deadline:
+                return collected, False
+
+    async def _fetch_signature_page(self, wallet_pubkey, before: Optional[str] = None,
+                                    until: Optional[str] = None, limit: Optional[int] = None):
+        """获取一页签名（新 -> 旧）"""
+        response = await self._get_async_client().get_signatures_for_address(
+            wallet_pubkey,
+            before=self.Signature.from_string(before) if before else None,
+            until=self.Signature.from_string(until) if until else None,
+            limit=limit or self.signature_page_size,
+            commitment=self._query_commitment,
+        )
+        return response.value or []
+
+    def _received_mints(self, transaction) -> Set[str]:
+        """交易中监控钱包持有的代币 mint（用于元数据预取）"""
+        meta = transaction.transaction.meta if transaction.transaction else None
+        if not meta:
+            return set()
+        return {
+            str(balance.mint) for balance in meta.post_token_balances or []
+            if balance.owner and self._is_monitored_wallet(str(balance.owner))
+        }
 
-    def _parse_solana_transaction(self, transaction, wallet_address, signature, callback=None):
-        """解析 Solana 交易，提取 SPL Token Transfer"""
+    def _parse_solana_transaction(self, transaction, wallet_address, signature) -> List[Dict[str, Any]]:
+        """解析 Solana 交易，提取转入监控钱包的 SPL Token Transfer"""
         meta = transaction.transaction.meta if transaction and transaction.transaction else None
         if not meta:
-            return
+            return []
 
         balance_changes = self._extract_balance_changes(meta, wallet_address)
         if not balance_changes:
-            return
+            return []
 
         timestamp = getattr(transaction, 'block_time', None) or int(time.time())
 
-        for mint, change in balance_changes.items():
-            transfer_data = self._build_transfer_payload(
+        return [
+            self._build_transfer_payload(
                 slot=transaction.slot,
                 signature=signature,
                 mint=mint,
                 wallet_address=wallet_address,
                 change=change,
-                timestamp=timestamp
+                timestamp=timestamp,
+                sender=sender
             )
+            for mint, (change, sender) in balance_changes.items()
+        ]
 
-            self.process_transfer(transfer_data)
-
-            if callback:
-                callback(transfer_data, self.new_tokens_buffer)
+    def _extract_balance_changes(self, meta, wallet_address: str) -> Dict[str, Tuple[int, str]]:
+        """
+        提取指定钱包的 SPL Token 余额新增及发送方
 
-    def _extract_balance_changes(self, meta, wallet_address: str) -> Dict[str, int]:
-        """提取指定钱包的 SPL Token 余额新增"""
-        post_token_balances = meta.post_token_balances or []
-        pre_token_balances = meta.pre_token_balances or []
+        单次遍历：按 account_index 对齐前后余额，汇总每个 (mint, owner) 的变化；
+        同一 mint 中余额减少最多的 owner 记为发送方（无则为 Unknown）。
 
-        balance_changes: Dict[str, int] = {}
-        for post_balance in post_token_balances:
-            owner = str(post_balance.owner) if post_balance.owner else None
-            if owner != wallet_address:
-                continue
+        返回:
+            {mint: (新增数量, 发送方)}
+        """
+        balances: Dict[int, List] = {}  # account_index -> [mint, owner, 前余额, 后余额]
+        for pre_balance in meta.pre_token_balances or []:
+            balances[pre_balance.account_index] = [
+                str(pre_balance.mint), str(pre_balance.owner) if pre_balance.owner else None,
+                int(pre_balance.ui_token_amount.amount), 0
+            ]
+        for post_balance in meta.post_token_balances or []:
+            entry = balances.get(post_balance.account_index)
+            if entry is None:
+                entry = balances[post_balance.account_index] = [
+                    str(post_balance.mint), str(post_balance.owner) if post_balance.owner else None, 0, 0
+                ]
+            elif entry[1] is None and post_balance.owner:
+                entry[1] = str(post_balance.owner)
+            entry[3] = int(post_balance.ui_token_amount.amount)
 
-            amount_after = int(post_balance.ui_token_amount.amount)
-            amount_before = self._find_previous_amount(pre_token_balances, post_balance.account_index)
-            change = amount_after - amount_before
+        deltas: Dict[Tuple[str, str], int] = {}
+        for mint, owner, amount_before, amount_after in balances.values():
+            if owner and amount_after != amount_before:
+                deltas[(mint, owner)] = deltas.get((mint, owner), 0) + amount_after - amount_before
 
-            if change > 0:
-                mint = str(post_balance.mint)
-                balance_changes[mint] = change
+        received = {mint: delta for (mint, owner), delta in deltas.items() if owner == wallet_address and delta > 0}
+        if not received:
+            return {}
 
-        return balance_changes
+        senders: Dict[str, Tuple[int, str]] = {}  # mint -> (最大流出, owner)
+        for (mint, owner), delta in deltas.items():
+            if mint in received and delta < 0 and owner != wallet_address:
+                if mint not in senders or delta < senders[mint][0]:
+                    senders[mint] = (delta, owner)
 
-    @staticmethod
-    def _find_previous_amount(pre_balances, account_index: int) -> int:
-        """匹配前置余额"""
-        for pre_balance in pre_balances or []:
-            if pre_balance.account_index == account_index:
-                return int(pre_balance.ui_token_amount.amount)
-        return 0
+        return {
+            mint: (change, senders[mint][1] if mint in senders else 'Unknown')
+            for mint, change in received.items()
+        }
 
     @staticmethod
     def _build_transfer_payload(slot: int, signature: str, mint: str,
-                                wallet_address: str, change: int, timestamp: int) -> Dict[str, Any]:
+                                wallet_address: str, change: int, timestamp: int,
+                                sender: str = 'Unknown') -> Dict[str, Any]:
         """构造标准化转账结构"""
         return {
             'block_number': slot,
             'tx_hash': signature,
             'contract': mint,  # Solana mint address
-            'from': 'Unknown',
+            'from': sender,
             'to': wallet_address,
             'value': change,
             'timestamp': timestamp,
@@ -1244,7 +3589,10 @@ class MultiChainListener:
     """多链统一监听器"""
 
     def __init__(self, enable_filter=True, proxy=None, persistence_file='multichain_state.pkl',
-                 feishu_webhook_url: Optional[str] = None):
+                 feishu_webhook_url: Optional[str] = None,
+                 token_cache_file: Optional[str] = 'token_metadata_cache.db',
+                 checkpoint_file: Optional[str] = 'listener_checkpoints.db',
+                 analysis_window: float = 0.0):
         """
         初始化多链监听器
 
@@ -1253,6 +3601,9 @@ class MultiChainListener:
             proxy: 代理服务器 (例如: "http://127.0.0.1:7897")
             persistence_file: 持久化文件路径
             feishu_webhook_url: 飞书机器人 Webhook URL (可选)
+            token_cache_file: 代币元数据缓存文件 (None 表示不做持久化缓存)
+            checkpoint_file: 监听进度文件，重启后从断点继续 (None 表示每次从链头开始)
+            analysis_window: 同一代币的合并分析窗口（秒），0 表示按区块合并
         """
         print(f"\n{'='*80}")
         print("🚀 多链区块链监听器初始化")
@@ -1263,6 +3614,7 @@ class MultiChainListener:
             proxy = f'http://{proxy}'
 
         self.proxy = proxy
+        self.analysis_window = analysis_window
 
         # 初始化过滤器
         self.filter_enabled = enable_filter and FILTER_AVAILABLE
@@ -1297,6 +3649,16 @@ class MultiChainListener:
         elif feishu_webhook_url and not FEISHU_AVAILABLE:
             print("⚠️  feishu_notifier.py 未找到，无法启用飞书通知\n")
 
+        # 初始化代币元数据缓存（各链共享，懒加载）
+        self.token_store = None
+        if token_cache_file and TOKEN_STORE_AVAILABLE:
+            self.token_store = TokenMetadataStore(db_file=token_cache_file)
+
+        # 初始化监听进度存储（各链共享）
+        self.checkpoint_store = None
+        if checkpoint_file and CHECKPOINT_STORE_AVAILABLE:
+            self.checkpoint_store = CheckpointStore(db_file=checkpoint_file)
+
         # 初始化分析器
         self.analyzer = AdvancedTokenAnalyzer()
 
@@ -1307,7 +3669,9 @@ class MultiChainListener:
         self.persistence_file = Path(persistence_file)
 
     def add_eth_listener(self, rpc_url: str, ws_url: Optional[str] = None,
-                         proxy: Optional[str] = None, use_websocket: bool = False):
+                         proxy: Optional[str] = None, use_websocket: bool = False,
+                         confirmations: int = 0, safety_poll_interval: Optional[float] = None,
+                         use_log_filter: bool = False, reorg_window: int = 64):
         """添加以太坊监听器
 
         参数:
@@ -1315,6 +3679,10 @@ class MultiChainListener:
             ws_url: WebSocket URL（当 use_websocket=True 时必需）
             proxy: 可选代理
             use_websocket: 是否使用 WebSocket 订阅模式
+            confirmations: 确认数（0 = 最低告警延迟，越大越能避开链重组）
+            safety_poll_interval: WebSocket 模式下安全轮询间隔（秒），设置后启用混合模式
+            use_log_filter: HTTP 模式下使用 eth_newFilter / eth_getFilterChanges 增量轮询
+            reorg_window: 保留最近多少个区块的哈希用于重组检测（0 = 关闭检测）
         """
         binance_wallets = [
             '0x28C6c06298d514Db089934071355E5743bf21d60',  # Binance 14
@@ -1336,7 +3704,13 @@ class MultiChainListener:
                 analyzer=self.analyzer,
                 binance_filter=self.binance_filter,
                 feishu_notifier=self.feishu_notifier,
-                proxy=proxy or self.proxy
+                proxy=proxy or self.proxy,
+                token_store=self.token_store,
+                checkpoint_store=self.checkpoint_store,
+                analysis_window=self.analysis_window,
+                confirmations=confirmations,
+                safety_poll_interval=safety_poll_interval,
+                reorg_window=reorg_window
             )
         else:
             listener = EVMChainListener(
@@ -1347,13 +3721,21 @@ class MultiChainListener:
                 analyzer=self.analyzer,
                 binance_filter=self.binance_filter,
                 feishu_notifier=self.feishu_notifier,
-                proxy=proxy or self.proxy
+                proxy=proxy or self.proxy,
+                token_store=self.token_store,
+                checkpoint_store=self.checkpoint_store,
+                analysis_window=self.analysis_window,
+                confirmations=confirmations,
+                use_log_filter=use_log_filter,
+                reorg_window=reorg_window
             )
         self.listeners['ETH'] = listener
         return listener
 
     def add_bsc_listener(self, rpc_url: str, ws_url: Optional[str] = None,
-                         proxy: Optional[str] = None, use_websocket: bool = False):
+                         proxy: Optional[str] = None, use_websocket: bool = False,
+                         confirmations: int = 0, safety_poll_interval: Optional[float] = None,
+                         use_log_filter: bool = False, reorg_window: int = 64):
         """添加BSC监听器
 
         参数:
@@ -1361,6 +3743,10 @@ class MultiChainListener:
             ws_url: WebSocket URL（当 use_websocket=True 时必需）
             proxy: 可选代理
             use_websocket: 是否使用 WebSocket 订阅模式
+            confirmations: 确认数（0 = 最低告警延迟，越大越能避开链重组）
+            safety_poll_interval: WebSocket 模式下安全轮询间隔（秒），设置后启用混合模式
+            use_log_filter: HTTP 模式下使用 eth_newFilter / eth_getFilterChanges 增量轮询
+            reorg_window: 保留最近多少个区块的哈希用于重组检测（0 = 关闭检测）
         """
         binance_wallets = [
             '0x8894E0a0c962CB723c1976a4421c95949bE2D4E3',  # Binance BSC Hot Wallet
@@ -1378,7 +3764,13 @@ class MultiChainListener:
                 analyzer=self.analyzer,
                 binance_filter=self.binance_filter,
                 feishu_notifier=self.feishu_notifier,
-                proxy=proxy or self.proxy
+                proxy=proxy or self.proxy,
+                token_store=self.token_store,
+                checkpoint_store=self.checkpoint_store,
+                analysis_window=self.analysis_window,
+                confirmations=confirmations,
+                safety_poll_interval=safety_poll_interval,
+                reorg_window=reorg_window
             )
         else:
             listener = EVMChainListener(
@@ -1389,13 +3781,29 @@ class MultiChainListener:
                 analyzer=self.analyzer,
                 binance_filter=self.binance_filter,
                 feishu_notifier=self.feishu_notifier,
-                proxy=proxy or self.proxy
+                proxy=proxy or self.proxy,
+                token_store=self.token_store,
+                checkpoint_store=self.checkpoint_store,
+                analysis_window=self.analysis_window,
+                confirmations=confirmations,
+                use_log_filter=use_log_filter,
+                reorg_window=reorg_window
             )
         self.listeners['BSC'] = listener
         return listener
 
-    def add_solana_listener(self, rpc_url: str):
-        """添加Solana监听器"""
+    def add_solana_listener(self, rpc_url: str, signature_page_size: int = 100,
+                            poll_time_budget: float = 10.0, tx_fetch_concurrency: int = 8,
+                            ws_url: Optional[str] = None):
+        """添加Solana监听器
+
+        参数:
+            rpc_url: HTTP RPC URL
+            signature_page_size: 签名分页大小（最大 1000）
+            poll_time_budget: 单轮轮询拉取签名的时间预算（秒），超出部分下一轮继续
+            tx_fetch_concurrency: 并发 getTransaction 上限
+            ws_url: WebSocket URL，设置后使用 logsSubscribe 推送（断线回退轮询）
+        """
         binance_wallets = [
             'FWWqD7mGFWzGbUB14TXLxESJ5GSKboMvCHvmh6xEjHfQ',  # Binance Solana Hot Wallet
             '5tzFkiKscXHK5ZXCGbXZxdw7gTjjD1mBwuoFbhUvuAi9',  # Binance Solana Hot Wallet 2
@@ -1406,7 +3814,14 @@ class MultiChainListener:
             binance_wallets=binance_wallets,
             analyzer=self.analyzer,
             binance_filter=self.binance_filter,
-            feishu_notifier=self.feishu_notifier
+            feishu_notifier=self.feishu_notifier,
+            token_store=self.token_store,
+            checkpoint_store=self.checkpoint_store,
+            analysis_window=self.analysis_window,
+            signature_page_size=signature_page_size,
+            poll_time_budget=poll_time_budget,
+            tx_fetch_concurrency=tx_fetch_concurrency,
+            ws_url=ws_url
         )
         self.listeners['SOL'] = listener
         return listener
@@ -1444,6 +3859,52 @@ class MultiChainListener:
                 thread.join()
         except KeyboardInterrupt:
             print("\n⏹️  所有监听器已停止")
+        finally:
+            if self.checkpoint_store:
+                self.checkpoint_store.close()
+
+    def start_all_async(self, poll_intervals: Optional[Dict[str, int]] = None):
+        """启动所有链监听（单事件循环，各链轮询以协程并发运行）"""
+        try:
+            asyncio.run(self.run_all_async(poll_intervals))
+        except KeyboardInterrupt:
+            print("\n⏹️  所有监听器已停止")
+
+    async def run_all_async(self, poll_intervals: Optional[Dict[str, int]] = None):
+        """在当前事件循环中并发运行所有链监听"""
+        if poll_intervals is None:
+            poll_intervals = {
+                'ETH': 12,   # 以太坊 12秒出块
+                'BSC': 3,    # BSC 3秒出块
+                'SOL': 2,    # Solana 亚秒级出块，但轮询间隔2秒
+            }
+
+        chains = list(self.listeners.keys())
+        tasks = []
+        for chain, listener in self.listeners.items():
+            interval = poll_intervals.get(chain, 12)
+            task = asyncio.create_task(
+                listener.listen_async(poll_interval=interval),
+                name=f"{chain}-Listener"
+            )
+            tasks.append(task)
+            print(f"✅ {chain} 监听协程已启动")
+
+        print(f"\n{'='*80}")
+        print(f"🎉 所有链监听器已启动 (单事件循环)!")
+        print(f"{'='*80}\n")
+
+        try:
+            # 单条链异常退出不影响其他链（与多线程模式行为一致）
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for chain, result in zip(chains, results):
+                if isinstance(result, Exception):
+                    print(f"❌ {chain} 监听协程异常退出: {result}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            if self.checkpoint_store:
+                self.checkpoint_store.close()
 
     def get_summary_report(self):
         """获取所有链的汇总报告"""
@@ -1458,6 +3919,17 @@ class MultiChainListener:
             report.append(f"   已过滤代币: {listener.stats['filtered_tokens']}")
             report.append(f"   新发现代币: {listener.stats['new_tokens']} ⭐")
             report.append(f"   高置信度代币: {listener.stats['high_confidence_tokens']} 🔥")
+            report.append(f"   节省元数据查询: {listener.stats['metadata_lookups_avoided']} 次")
+            if listener.stats['coalesced_analyses']:
+                report.append(f"   合并分析: 省去 {listener.stats['coalesced_analyses']} 次")
+            if listener.stats['reorgs']:
+                report.append(f"   链重组: {listener.stats['reorgs']} 次, 撤回转账 {listener.stats['retracted_transfers']} 笔")
+            if hasattr(listener, 'get_queue_stats'):
+                queue_stats = listener.get_queue_stats()
+                report.append(f"   处理队列: 深度 {queue_stats['queue_depth']} (峰值 {queue_stats['max_queue_depth']}), "
+                              f"丢弃 {queue_stats['dropped']}, 背压 {queue_stats['backpressure_waits']} 次")
+                report.append(f"   重连: {queue_stats['reconnects']} 次, HTTP 补上 {queue_stats['http_recovered']} 条, "
+                              f"重复丢弃 {queue_stats['duplicates']} 条")
 
             # 列出新代币
             new_tokens = [(c, b) for c, b in listener.new_tokens_buffer.items() if b.get('is_new', True)]
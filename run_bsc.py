@@ -88,6 +88,7 @@ def main():
             print(f"已过滤代币: {stats['filtered_tokens']} (币安已上架)")
             print(f"新发现代币: {stats['new_tokens']} ⭐")
             print(f"高置信度代币: {stats['high_confidence_tokens']} 🔥")
+            print(f"节省元数据查询: {stats['metadata_lookups_avoided']} 次")
 
             # 显示新代币列表
             new_tokens = [(c, b) for c, b in bsc_listener.new_tokens_buffer.items()
@@ -48,6 +48,15 @@ def main():
         BSC_RPC_URL = BSC_CONFIG['rpc_url']
         BSC_WS_URL = BSC_CONFIG.get('ws_url')
         SOL_RPC_URL = SOLANA_CONFIG['rpc_url']
+        SOL_WS_URL = SOLANA_CONFIG.get('ws_url')
+        ETH_CONFIRMATIONS = ETH_CONFIG.get('confirmations', 0)
+        BSC_CONFIRMATIONS = BSC_CONFIG.get('confirmations', 0)
+        ETH_SAFETY_POLL = ETH_CONFIG.get('safety_poll_interval')
+        BSC_SAFETY_POLL = BSC_CONFIG.get('safety_poll_interval')
+        ETH_REORG_WINDOW = ETH_CONFIG.get('reorg_window', 64)
+        BSC_REORG_WINDOW = BSC_CONFIG.get('reorg_window', 64)
+        ETH_LOG_FILTER = ETH_CONFIG.get('use_log_filter', False)
+        BSC_LOG_FILTER = BSC_CONFIG.get('use_log_filter', False)
         PROXY = CONFIG_PROXY
         enable_filter = ENABLE_FILTER
 
@@ -61,6 +70,15 @@ def main():
         BSC_RPC_URL = os.getenv('BSC_RPC_URL', 'https://bsc-dataseed.binance.org/')
         BSC_WS_URL = os.getenv('BSC_WS_URL')
         SOL_RPC_URL = os.getenv('SOL_RPC_URL', 'https://api.mainnet-beta.solana.com')
+        SOL_WS_URL = os.getenv('SOL_WS_URL')
+        ETH_CONFIRMATIONS = int(os.getenv('ETH_CONFIRMATIONS', '0'))
+        BSC_CONFIRMATIONS = int(os.getenv('BSC_CONFIRMATIONS', '0'))
+        ETH_SAFETY_POLL = float(os.getenv('ETH_SAFETY_POLL', '0')) or None
+        BSC_SAFETY_POLL = float(os.getenv('BSC_SAFETY_POLL', '0')) or None
+        ETH_REORG_WINDOW = int(os.getenv('ETH_REORG_WINDOW', '64'))
+        BSC_REORG_WINDOW = int(os.getenv('BSC_REORG_WINDOW', '64'))
+        ETH_LOG_FILTER = os.getenv('ETH_LOG_FILTER') == '1'
+        BSC_LOG_FILTER = os.getenv('BSC_LOG_FILTER') == '1'
         PROXY = os.getenv('PROXY', None)  # 例如 "127.0.0.1:7897"
         enable_filter = True
         feishu_webhook_url = os.getenv('FEISHU_WEBHOOK_URL')
@@ -77,26 +95,35 @@ def main():
         ws_url=ETH_WS_URL,
         proxy=PROXY,
         use_websocket=bool(ETH_WS_URL),
+        confirmations=ETH_CONFIRMATIONS,
+        safety_poll_interval=ETH_SAFETY_POLL,
+        use_log_filter=ETH_LOG_FILTER,
+        reorg_window=ETH_REORG_WINDOW,
     )
     listener.add_bsc_listener(
         rpc_url=BSC_RPC_URL,
         ws_url=BSC_WS_URL,
         proxy=PROXY,
         use_websocket=bool(BSC_WS_URL),
+        confirmations=BSC_CONFIRMATIONS,
+        safety_poll_interval=BSC_SAFETY_POLL,
+        use_log_filter=BSC_LOG_FILTER,
+        reorg_window=BSC_REORG_WINDOW,
     )
 
     # 询问是否启用 Solana
     use_solana = 'n'
     if use_solana == 'y':
         listener.add_solana_listener(
-            rpc_url=SOL_RPC_URL
+            rpc_url=SOL_RPC_URL,
+            ws_url=SOL_WS_URL,
         )
         print("✅ 已启用 Solana 监听")
     else:
         print("ℹ️ 已跳过 Solana，只监听 ETH + BSC")
 
-    # 启动所有链监听（多线程）
-    listener.start_all()
+    # 启动所有链监听（单事件循环，异步轮询）
+    listener.start_all_async()
 
 
 if __name__ == '__main__':
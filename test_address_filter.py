@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+测试地址级过滤 - 已上架 / 负缓存合约在元数据查询前被拦截，节省次数按合约计一次
+"""
+
+from multichain_listener import AdvancedTokenAnalyzer, BaseChainListener
+
+print("="*80)
+print("测试地址级过滤")
+print("="*80)
+
+
+class RecordingListener(BaseChainListener):
+    """记录每次元数据查询的监听器，未知合约一律返回 TEST 代币"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.token_info_lookups = []
+
+    def get_token_info(self, contract_address):
+        self.token_info_lookups.append(contract_address)
+        return {'symbol': 'TEST', 'name': 'TEST', 'decimals': 18}
+
+    def listen(self, callback=None):
+        pass
+
+
+class ListedOnlyFilter:
+    """只认识一个已上架合约的币安过滤器"""
+
+    def is_listed_on_binance(self, contract):
+        if contract == 'listed':
+            return True, {'symbol': 'LST', 'name': 'Listed'}
+        return False, None
+
+
+listener = RecordingListener('TEST', ['wallet'], AdvancedTokenAnalyzer())
+listener.binance_filter = ListedOnlyFilter()
+listener._cache_token_info('broken', None, persist=False)
+
+for index in range(5):
+    listener.process_transfers([
+        {'contract': contract, 'to': 'wallet', 'from': f'sender{index}', 'value': 10**18,
+         'timestamp': 1700000000 + index, 'block_number': index}
+        for contract in ('listed', 'broken', 'fresh')
+    ])
+
+print("\n【已上架与负缓存合约】")
+assert 'listed' not in listener.token_info_lookups, "已上架合约不应查询元数据"
+assert 'broken' not in listener.token_info_lookups, "负缓存合约不应查询元数据"
+assert listener.token_info_lookups == ['fresh'] * 5
+assert listener.stats['filtered_tokens'] == 1, "已上架合约只提示一次"
+assert listener.stats['metadata_lookups_avoided'] == 2, "同一合约的后续转账不重复计入节省次数"
+assert listener.stats['total_transfers'] == 15
+print("✅ 15 笔转账只查询 fresh 的元数据")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
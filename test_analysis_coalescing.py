@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+测试合并分析 - 突发转账合并为少量分析，单笔大额转账不被合并窗口延迟
+"""
+
+import asyncio
+
+from multichain_listener import AdvancedTokenAnalyzer, BaseChainListener
+
+print("="*80)
+print("测试合并分析")
+print("="*80)
+
+SMALL = 1_000 * 10**18
+LARGE = 200_000 * 10**18
+
+
+class StubListener(BaseChainListener):
+    """元数据固定、不连接节点的监听器"""
+
+    def get_token_info(self, contract_address):
+        return {'symbol': 'TEST', 'name': 'TEST', 'decimals': 18}
+
+    def listen(self, callback=None):
+        pass
+
+
+def new_listener(analysis_window):
+    listener = StubListener('TEST', ['wallet'], AdvancedTokenAnalyzer(), analysis_window=analysis_window)
+    listener.analysis_runs = []
+    run_full_analysis = listener._run_full_analysis
+
+    def counting_analysis(contract, buffer, token_info):
+        listener.analysis_runs.append(len(buffer['transfers']))
+        run_full_analysis(contract, buffer, token_info)
+
+    listener._run_full_analysis = counting_analysis
+    return listener
+
+
+def make_transfer(index, value=SMALL, block_number=1):
+    return {
+        'contract': 'token',
+        'to': 'wallet',
+        'from': f'sender{index % 3}',
+        'value': value,
+        'timestamp': 1700000000 + index * 10,
+        'block_number': block_number,
+    }
+
+
+# 场景1: 按区块合并，同一区块内的突发转账
+print("\n【场景1: 按区块合并】")
+listener = new_listener(0)
+listener.process_transfers([make_transfer(i) for i in range(300)])
+assert listener.analysis_runs == [2, 300], listener.analysis_runs
+listener.process_transfer(make_transfer(300, block_number=2))
+assert listener.analysis_runs[-1] == 301, "新区块的第一笔应立即分析"
+print("✅ 300 笔转账只分析 2 次，新区块立即分析")
+
+
+async def time_window():
+    listener = new_listener(0.2)
+    for i in range(10):
+        listener.process_transfer(make_transfer(i, block_number=i))
+    deferred = list(listener.analysis_runs)
+
+    # 窗口内到达的单笔大额转账立即分析
+    listener.process_transfer(make_transfer(10, value=LARGE, block_number=10))
+    immediate = list(listener.analysis_runs)
+
+    # 窗口到期后合并执行剩余分析
+    listener.process_transfer(make_transfer(11, block_number=11))
+    await asyncio.sleep(0.3)
+    return listener, deferred, immediate
+
+
+# 场景2: 按时间窗口合并
+print("\n【场景2: 按时间窗口合并】")
+listener, deferred, immediate = asyncio.run(time_window())
+assert deferred == [2], f"窗口内的小额转账应被合并: {deferred}"
+assert immediate == [2, 11], f"窗口内的单笔大额转账应立即分析: {immediate}"
+assert listener.analysis_runs == [2, 11, 12], listener.analysis_runs
+assert not listener._pending_analyses
+print(f"✅ 小额转账延后合并，大额转账立即分析: {listener.analysis_runs}")
+
+
+async def large_in_batch():
+    listener = new_listener(0.2)
+    batch = [make_transfer(i) for i in range(20)]
+    batch[15]['value'] = LARGE
+    listener.process_transfers(batch)
+    return listener
+
+
+# 场景3: 批内其余转账中有单笔大额
+print("\n【场景3: 批内单笔大额】")
+listener = asyncio.run(large_in_batch())
+assert listener.analysis_runs == [2, 20], listener.analysis_runs
+print(f"✅ 批内含大额转账时合并分析立即执行: {listener.analysis_runs}")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
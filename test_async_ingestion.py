@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+测试异步采集路径 - 元数据与区块时间戳的回退不在事件循环上发起同步 RPC
+"""
+
+import asyncio
+from unittest import mock
+
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+from web3.eth import Eth
+
+from multichain_listener import MULTICALL3_ADDRESS, AdvancedTokenAnalyzer, EVMChainListener
+
+WALLET = '0x' + 'ab' * 20
+CONTRACT = Web3.to_checksum_address('0x' + 'cd' * 20)
+
+print("="*80)
+print("测试异步采集路径")
+print("="*80)
+
+
+def no_sync_rpc(*args, **kwargs):
+    raise AssertionError("异步路径不应发起同步 RPC")
+
+
+for multicall_address in (MULTICALL3_ADDRESS, None):
+    mode = "Multicall" if multicall_address else "逐个 eth_call"
+    print(f"\n【场景: {mode} 网络错误】")
+    with mock.patch.object(Web3, 'is_connected', return_value=True), \
+            mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+        listener = EVMChainListener('BSC', 'http://127.0.0.1:1', None, [WALLET], AdvancedTokenAnalyzer(),
+                                    multicall_address=multicall_address, use_new_heads=False)
+    listener.w3.eth.call = no_sync_rpc
+    listener.w3.eth.get_block = no_sync_rpc
+    # 节点不可达（关闭重试，立即失败）
+    listener.async_http_w3 = AsyncWeb3(AsyncHTTPProvider(listener.rpc_url, exception_retry_configuration=None))
+
+    async def prefetch():
+        try:
+            await listener._prefetch_token_infos({CONTRACT})
+        finally:
+            await listener.async_http_w3.provider.disconnect()
+
+    asyncio.run(prefetch())
+
+    # 网络错误的合约等待重试，不写负缓存，也没有回退到同步 RPC
+    assert CONTRACT in listener._token_retry_at
+    assert CONTRACT not in listener._negative_tokens
+    assert listener._lookup_cached_token(CONTRACT) == (False, None)
+    print("✅ 查询失败的合约已延后重试，未回退到同步 RPC")
+
+print("\n【场景: 等待重试期间的转账暂存】")
+transfers = [
+    {'contract': CONTRACT, 'to': Web3.to_checksum_address(WALLET), 'from': f'0xSender{index}',
+     'value': 1000 * 10**18, 'timestamp': 1700000000 + index, 'block_number': 100 + index}
+    for index in range(2)
+]
+listener.process_transfers(transfers[:1])
+assert listener._held_transfers[CONTRACT] == transfers[:1], "转账暂存，不当作非代币丢弃"
+assert CONTRACT not in listener.new_tokens_buffer
+assert listener.stats['metadata_lookups_avoided'] == 0, "暂存不计入省下的元数据查询"
+
+# 等待期结束：即使下一批没有该合约的日志，预取也会重新查询它
+listener._token_retry_at[CONTRACT] = 0
+assert listener._due_token_retries() == [CONTRACT]
+queried = []
+
+
+async def fetch_metadata(addresses):
+    queried.extend(addresses)
+    return {address: [] for address in addresses}
+
+
+listener._fetch_token_metadata_async = fetch_metadata
+listener._decode_token_metadata = lambda address, call_results: {
+    'name': 'Retried', 'symbol': 'RTY', 'decimals': 18, 'total_supply': 10**27}
+asyncio.run(listener._prefetch_token_infos(set()))
+assert queried == [CONTRACT] and CONTRACT not in listener._token_retry_at
+
+listener.process_transfers(transfers[1:])
+assert CONTRACT not in listener._held_transfers
+assert [t['from'] for t in listener.new_tokens_buffer[CONTRACT]['transfers']] == ['0xSender0', '0xSender1'], \
+    "暂存的转账排在新转账之前处理"
+print("✅ 元数据取到后暂存的转账按原顺序补处理")
+
+print("\n【场景: 区块时间戳只读缓存】")
+listener.block_timestamps.put(100, 1700000000)
+listener.block_timestamps.put(110, 1700000030)
+assert listener.get_block_timestamp(110, fetch=False) == 1700000030
+assert listener.get_block_timestamp(105, fetch=False) == 1700000015, "未缓存的区块应按出块时间插值"
+print("✅ 未预取到的区块按出块时间插值")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
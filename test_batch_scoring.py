@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+测试批量评分 - 验证向量化结果与逐个代币分析一致
+"""
+
+import random
+
+from multichain_listener import AdvancedTokenAnalyzer
+
+# numpy 为可选依赖：未安装时整段跳过，不导入任何需要 numpy 的代码
+try:
+    import numpy  # noqa: F401
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+print("="*80)
+print("测试批量评分 - 与 AdvancedTokenAnalyzer 逐个对比")
+print("="*80)
+
+
+def make_transfers(rng, count):
+    """随机生成一个代币的转账（覆盖大额、小额重复、密集时间、缺失时间戳等情况）"""
+    senders = [f'0xSender{i}...' for i in range(rng.randint(1, 6))]
+    repeated_value = rng.choice([100, 5_000, 200_000]) * 10**18
+    transfers = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            value = repeated_value
+        elif kind < 0.9:
+            value = rng.randint(1, 50_000) * 10**16
+        else:
+            value = rng.randint(1, 2_000_000) * 10**18
+        timestamp = 1700000000 + rng.choice([0, 10, 30, 59, 60, 600, 7200, 90000]) * rng.randint(0, 5)
+        transfers.append({
+            'from': rng.choice(senders),
+            'value': value,
+            'timestamp': timestamp if rng.random() > 0.1 else None,
+        })
+    return transfers
+
+
+if not NUMPY_AVAILABLE:
+    print("\n⚠️  未安装 numpy，跳过批量评分测试")
+else:
+    from batch_scoring import BatchTokenScorer
+
+    analyzer = AdvancedTokenAnalyzer()
+    scorer = BatchTokenScorer(analyzer)
+    rng = random.Random(20240615)
+    token_info = {'symbol': 'TEST', 'decimals': 18}
+
+    token_transfers = {f'token{i:04d}': make_transfers(rng, rng.randint(1, 40)) for i in range(2000)}
+    result = scorer.score(*BatchTokenScorer.to_columns(token_transfers))
+
+    mismatches = 0
+    for index, token in enumerate(result['token_ids']):
+        transfers = token_transfers[token]
+        senders = {tx['from'] for tx in transfers}
+        expected = analyzer.analyze_transfers(transfers, senders, token_info)
+        level, reason = analyzer.classify_alert(expected['confidence'], expected['features'])
+
+        if (result['confidence'][index] != expected['confidence'] or
+                result['risk_level'][index] != expected['risk_level'] or
+                result['alert_level'][index] != level or
+                result['trigger_reason'][index] != reason):
+            mismatches += 1
+            print(f"❌ {token}: 批量 {result['confidence'][index]:.4f}/{result['risk_level'][index]}"
+                  f"/{result['trigger_reason'][index]}，逐个 {expected['confidence']:.4f}"
+                  f"/{expected['risk_level']}/{reason}")
+
+    assert mismatches == 0, f"{mismatches} 个代币结果不一致"
+    print(f"\n✅ {len(result['token_ids'])} 个代币的置信度、风险等级和触发原因全部一致")
+
+    # 缺失发送者：逐个分析的发送者集合会跳过 None / 空字符串，批量结果应与之一致
+    print("\n【缺失发送者】")
+    token_transfers = {}
+    for i in range(500):
+        transfers = make_transfers(rng, rng.randint(1, 20))
+        missing = rng.choice([None, ''])
+        for tx in transfers:
+            if rng.random() < 0.3:
+                tx['from'] = missing
+        token_transfers[f'token{i:04d}'] = transfers
+    result = scorer.score(*BatchTokenScorer.to_columns(token_transfers))
+
+    for index, token in enumerate(result['token_ids']):
+        transfers = token_transfers[token]
+        senders = {tx['from'] for tx in transfers if tx['from']}
+        expected = analyzer.analyze_transfers(transfers, senders, token_info)
+        level, reason = analyzer.classify_alert(expected['confidence'], expected['features'])
+        assert result['sender_count'][index] == len(senders), f"{token}: 缺失的发送者不应计数"
+        assert result['confidence'][index] == expected['confidence'], token
+        assert result['risk_level'][index] == expected['risk_level'], token
+        assert (result['alert_level'][index], result['trigger_reason'][index]) == (level, reason), token
+    print(f"✅ {len(result['token_ids'])} 个含缺失发送者的代币与逐个分析一致")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
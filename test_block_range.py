@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+测试自适应区块窗口 - 失败减半、成功翻倍、上限恢复，以及追赶模式下按窗口分块不漏块
+"""
+
+import asyncio
+from unittest import mock
+
+from web3 import Web3
+from web3.eth import Eth
+
+from multichain_listener import AdaptiveBlockRange, AdvancedTokenAnalyzer, EVMChainListener
+
+print("="*80)
+print("测试自适应区块窗口")
+print("="*80)
+
+# 场景1: 窗口调整规则
+print("\n【场景1: AdaptiveBlockRange】")
+block_range = AdaptiveBlockRange(initial_size=100, min_size=10, max_size=800,
+                                 max_logs_per_query=1000, ceiling_reset_after=3)
+block_range.on_success(0)
+assert block_range.size == 200, "结果适中时窗口翻倍"
+block_range.on_success(1000)
+assert block_range.size == 100, "日志过多时窗口减半"
+
+assert block_range.on_error() and block_range.size == 50
+block_range.on_success(0)
+assert block_range.size == 50, "失败后以减半窗口作为上限"
+block_range.on_success(0)
+assert block_range.size == 50
+block_range.on_success(0)
+assert block_range.size == 100, "连续成功若干次后解除上限"
+
+for _ in range(10):
+    block_range.on_error()
+assert block_range.size == 10
+assert not block_range.on_error(), "最小窗口时报告无法继续缩小"
+print("✅ 翻倍、减半、上限与下限均符合预期")
+
+# 场景2: 追赶模式分块处理，区间过大时缩小窗口重试
+print("\n【场景2: 追赶模式】")
+with mock.patch.object(Web3, 'is_connected', return_value=True), \
+        mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+    listener = EVMChainListener('BSC', 'http://127.0.0.1:1', None, ['0x' + 'ab' * 20],
+                                AdvancedTokenAnalyzer(), max_block_range=400, reorg_window=0)
+processed = []
+
+
+async def node_limited_range(start_block, end_block, callback=None):
+    if end_block - start_block + 1 > 150:
+        return None  # 节点拒绝过大的区间
+    processed.append((start_block, end_block))
+    return 0
+
+
+listener._process_block_range = node_limited_range
+assert asyncio.run(listener._catch_up_to(1000, 1999)) == 2000
+covered = [n for start, end in processed for n in range(start, end + 1)]
+assert covered == list(range(1000, 2000)), "所有区块恰好处理一次"
+assert max(end - start + 1 for start, end in processed) <= 150
+assert not listener.is_catching_up, "追上链头后退出追赶模式"
+print(f"✅ {len(processed)} 个区间覆盖 1000 个区块，无遗漏无重复")
+
+# 场景3: 最小窗口仍失败时停在原处等待下一轮
+print("\n【场景3: 持续失败】")
+
+
+async def failing_range(start_block, end_block, callback=None):
+    return None
+
+
+listener._process_block_range = failing_range
+assert asyncio.run(listener._catch_up_to(2000, 2100)) == 2000
+assert listener.block_range.size == listener.block_range.min_size
+print("✅ 不跳过失败的区块")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
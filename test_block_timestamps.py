@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+测试区块时间戳缓存 - LRU 淘汰、插值估算，以及批量预取时每个区块只查询一次
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+from web3 import Web3
+from web3.eth import Eth
+
+from multichain_listener import AdvancedTokenAnalyzer, BlockTimestampCache, EVMChainListener
+
+print("="*80)
+print("测试区块时间戳缓存")
+print("="*80)
+
+# 场景1: LRU 与插值
+print("\n【场景1: BlockTimestampCache】")
+cache = BlockTimestampCache(max_size=3, default_block_time=3.0)
+assert cache.estimate(100) is None, "空缓存无法估算"
+cache.put(100, 1000)
+assert cache.estimate(110) == 1030, "只有一个区块时按默认出块时间估算"
+
+cache.put(120, 1040)
+cache.put(140, 1080)
+assert cache.estimate(130) == 1060, "按已缓存区块学习到的出块时间插值"
+
+cache.get(100)             # 刷新 100，淘汰最久未使用的 120
+cache.put(160, 1120)
+assert 120 not in cache and 100 in cache and len(cache) == 3
+print("✅ 淘汰与插值符合预期")
+
+# 场景2: 批量预取
+print("\n【场景2: 批量预取】")
+with mock.patch.object(Web3, 'is_connected', return_value=True), \
+        mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+    listener = EVMChainListener('BSC', 'http://127.0.0.1:1', None, ['0x' + 'ab' * 20], AdvancedTokenAnalyzer())
+batch_calls = []
+
+
+async def fetch_block_timestamps(block_numbers):
+    batch_calls.append(block_numbers)
+    return {n: 1700000000 + n * 3 for n in block_numbers if n != 13}  # 区块 13 查询失败
+
+
+listener._fetch_block_timestamps = fetch_block_timestamps
+logs = [
+    {'blockNumber': 10, 'blockTimestamp': 1700000030},
+    {'blockNumber': 11, 'blockTimestamp': hex(1700000033)},
+    {'blockNumber': 12}, {'blockNumber': 12}, {'blockNumber': 13}, {'blockNumber': 14},
+]
+asyncio.run(listener._prefetch_block_timestamps(logs))
+assert batch_calls == [[12, 13, 14]], "未携带 blockTimestamp 的区块合并为一次查询"
+assert listener.block_timestamps.get(11) == 1700000033, "十六进制 blockTimestamp 被解析"
+
+asyncio.run(listener._prefetch_block_timestamps(logs[:4]))
+assert len(batch_calls) == 1, "已缓存的区块不再查询"
+
+# 处理阶段不发起逐块 RPC：预取未返回的区块直接插值
+single_calls = []
+listener.w3 = SimpleNamespace(eth=SimpleNamespace(get_block=single_calls.append))
+assert listener.get_block_timestamp(12, fetch=False) == 1700000036
+assert listener.get_block_timestamp(13, fetch=False) == 1700000039
+assert not single_calls
+print("✅ 每个区块最多批量查询一次，失败区块按出块时间插值")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+测试监听进度存储 - 限频落盘、事件循环中后台写入、重启后从断点恢复
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from web3 import Web3
+from web3.eth import Eth
+
+from checkpoint_store import CheckpointStore
+from multichain_listener import AdvancedTokenAnalyzer, EVMChainListener
+
+print("="*80)
+print("测试监听进度存储")
+print("="*80)
+
+db_file = os.path.join(tempfile.mkdtemp(), 'listener_checkpoints.db')
+
+
+def stored(chain):
+    """绕过内存中未落盘的进度，直接读取数据库"""
+    return CheckpointStore(db_file).load(chain)
+
+
+# 场景1: 同步调用按 min_interval 限频落盘
+print("\n【场景1: 限频落盘】")
+store = CheckpointStore(db_file, min_interval=3600)
+store.update('BSC', {'next_block': 100})
+store.flush()
+assert stored('BSC') == {'next_block': 100}
+store.update('BSC', {'next_block': 101})
+assert stored('BSC') == {'next_block': 100}, "间隔内的更新只保存在内存"
+assert store.load('BSC') == {'next_block': 101}, "读取时内存中的最新进度优先"
+store.flush()
+assert stored('BSC') == {'next_block': 101}
+print("✅ 间隔内的多次更新合并为一次写入")
+
+# 场景2: 事件循环中只更新内存，由后台线程落盘
+print("\n【场景2: 后台落盘】")
+store = CheckpointStore(db_file, min_interval=0.05)
+
+
+async def update_in_loop():
+    for next_block in range(200, 210):
+        store.update('ETH', {'next_block': next_block})
+    assert stored('ETH') is None, "事件循环中不同步写库"
+    await asyncio.sleep(0.3)
+
+
+asyncio.run(update_in_loop())
+assert stored('ETH') == {'next_block': 209}, "后台落盘写入最新进度"
+store.update('ETH', {'next_block': 210})
+store.close()
+assert stored('ETH') == {'next_block': 210}, "关闭时写入未落盘的进度"
+print("✅ 后台写入最新进度，关闭前补写")
+
+# 场景3: 事件循环在定时落盘之前退出
+print("\n【场景3: 事件循环提前退出】")
+store = CheckpointStore(db_file, min_interval=0.2)
+store.flush()
+
+
+async def update_then_exit():
+    store.update('SOL', {'cursor': 'a'})   # 距上次落盘不足 min_interval，定时落盘
+
+
+asyncio.run(update_then_exit())
+assert stored('SOL') is None, "定时回调随事件循环关闭而丢失"
+time.sleep(0.25)
+store.update('SOL', {'cursor': 'b'})
+assert stored('SOL') == {'cursor': 'b'}, "原事件循环已关闭，之后的 update 重新安排落盘"
+print("✅ 事件循环关闭后落盘不会被永久跳过")
+
+# 场景4: 数据库写入期间 update 不被阻塞
+print("\n【场景4: 锁外写库】")
+store = CheckpointStore(db_file, min_interval=3600)
+store.flush()
+store.update('ETH', {'next_block': 300})
+writing, release = threading.Event(), threading.Event()
+
+
+class SlowConnection:
+    """executemany 卡住直到测试放行，模拟慢磁盘"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def executemany(self, sql, rows):
+        writing.set()
+        release.wait(5)
+        return self.conn.executemany(sql, rows)
+
+    def commit(self):
+        self.conn.commit()
+
+
+store._conn = SlowConnection(store._connect())
+flusher = threading.Thread(target=store.flush)
+flusher.start()
+assert writing.wait(5)
+started = time.monotonic()
+store.update('ETH', {'next_block': 301})
+assert store.load('ETH') == {'next_block': 301}, "写库期间新进度照常记录，读取内存中的最新值"
+assert time.monotonic() - started < 1, "update 不等待数据库写入"
+release.set()
+flusher.join()
+assert stored('ETH') == {'next_block': 300}
+store._conn = store._conn.conn
+store.close()
+assert stored('ETH') == {'next_block': 301}, "关闭时同步写入最新进度"
+print("✅ 写库在锁外进行，期间的更新在下一次落盘写入")
+
+# 场景5: 重启后从断点批量追赶
+print("\n【场景5: 断点恢复】")
+store = CheckpointStore(db_file, min_interval=0)
+store.update('BSC', {'next_block': 500})
+with mock.patch.object(Web3, 'is_connected', return_value=True), \
+        mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+    listener = EVMChainListener('BSC', 'http://127.0.0.1:1', None, ['0x' + 'ab' * 20], AdvancedTokenAnalyzer(),
+                                use_new_heads=False, checkpoint_store=store)
+ranges = []
+
+
+class FakeHttpEth:
+    @property
+    async def block_number(self):
+        raise AssertionError("有断点时不应从链头开始")
+
+
+async def one_new_head():
+    yield 520
+
+
+async def catch_up_to(current_block, latest_block, callback=None):
+    ranges.append((current_block, latest_block))
+    return latest_block + 1
+
+
+listener.async_http_w3 = SimpleNamespace(eth=FakeHttpEth())
+listener._iter_new_heads = one_new_head
+listener._catch_up_to = catch_up_to
+asyncio.run(listener.listen_async())
+store.close()
+assert ranges == [(500, 520)], "从断点追赶到链头"
+assert stored('BSC') == {'next_block': 521}
+print("✅ 从区块 500 恢复，处理后进度推进到 521")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
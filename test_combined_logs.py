@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+测试合并日志查询 - 所有监控钱包一次 eth_getLogs，并按 topics[2] 路由回钱包
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.eth import Eth
+
+from multichain_listener import TRANSFER_EVENT_SIGNATURE, AdvancedTokenAnalyzer, EVMChainListener
+
+print("="*80)
+print("测试合并日志查询")
+print("="*80)
+
+WALLETS = [Web3.to_checksum_address('0x' + f'{i:02x}' * 20) for i in (0xa1, 0xb2, 0xc3)]
+STRANGER = '0x' + 'ee' * 20
+
+
+def transfer_log(to_address, block_number):
+    """只带路由所需字段的 Transfer 日志"""
+    return {
+        'blockNumber': block_number,
+        'topics': [HexBytes(TRANSFER_EVENT_SIGNATURE), HexBytes('0x' + '00' * 32),
+                   HexBytes('0x' + to_address[2:].lower().zfill(64))],
+    }
+
+
+# 节点上的日志；不支持 OR 过滤的节点会把无关日志一起返回
+chain_logs = [
+    transfer_log(WALLETS[0], 100),
+    transfer_log(WALLETS[2], 101),
+    transfer_log(STRANGER, 101),
+    transfer_log(WALLETS[1], 102),
+]
+requests = []
+
+
+async def get_logs(params):
+    requests.append(params)
+    wanted = params['topics'][2]
+    if isinstance(wanted, list):
+        return list(chain_logs)
+    return [log for log in chain_logs if '0x' + log['topics'][2].hex()[-64:] == wanted.lower()]
+
+
+with mock.patch.object(Web3, 'is_connected', return_value=True), \
+        mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+    listener = EVMChainListener('BSC', 'http://127.0.0.1:1', None, [w.lower() for w in WALLETS],
+                                AdvancedTokenAnalyzer())
+listener.async_http_w3 = SimpleNamespace(eth=SimpleNamespace(get_logs=get_logs))
+handled = []
+
+
+async def handle_transfer_logs(logs, callback=None):
+    handled.extend(logs)
+
+
+listener._handle_transfer_logs = handle_transfer_logs
+
+# 场景1: 路由
+print("\n【场景1: 按 topics[2] 路由】")
+assert listener._route_log_to_wallet(chain_logs[1]) == WALLETS[2], "返回 checksum 钱包地址"
+assert listener._route_log_to_wallet(chain_logs[2]) is None
+assert listener._route_log_to_wallet({'topics': [TRANSFER_EVENT_SIGNATURE]}) is None, "缺少 topics[2] 的日志被忽略"
+text_log = {'topics': [TRANSFER_EVENT_SIGNATURE, None, '0x' + WALLETS[0][2:].upper().zfill(64)]}
+assert listener._route_log_to_wallet(text_log) == WALLETS[0], "兼容十六进制字符串 topic"
+print("✅ 日志路由到正确的钱包")
+
+# 场景2: 合并查询
+print("\n【场景2: 一次 eth_getLogs】")
+assert asyncio.run(listener._process_block_range(100, 102)) == 3
+assert len(requests) == 1, "所有钱包共用一次查询"
+assert requests[0]['topics'][:2] == [TRANSFER_EVENT_SIGNATURE, None]
+assert sorted(requests[0]['topics'][2]) == sorted('0x' + w[2:].lower().zfill(64) for w in WALLETS)
+assert [log['blockNumber'] for log in handled] == [100, 101, 102], "丢弃不属于监控钱包的日志"
+print(f"✅ {len(WALLETS)} 个钱包 1 次查询")
+
+# 场景3: 分钱包模式仍可用
+print("\n【场景3: 分钱包查询】")
+listener.combine_wallet_logs = False
+requests.clear()
+handled.clear()
+asyncio.run(listener._process_block_range(100, 102))
+assert len(requests) == len(WALLETS), "分钱包查询并发发出"
+assert sorted(log['blockNumber'] for log in handled) == [100, 101, 102]
+print("✅ 关闭合并后按钱包逐个查询，结果一致")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
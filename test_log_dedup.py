@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+测试日志去重 - 有界去重窗口，以及丢弃 / 取消的日志不会被永久标记为已处理
+"""
+
+import asyncio
+
+from unittest import mock
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.eth import Eth
+
+from multichain_listener import TRANSFER_EVENT_SIGNATURE, AdvancedTokenAnalyzer, AsyncEVMWebSocketListener, \
+    LogDeduplicator
+
+WALLET = '0x' + 'ab' * 20
+
+print("="*80)
+print("测试日志去重")
+print("="*80)
+
+# 场景1: 有界去重窗口
+print("\n【场景1: LogDeduplicator 去重与淘汰】")
+dedup = LogDeduplicator(window_blocks=10)
+assert dedup.add(100, ('tx1', 0))
+assert not dedup.add(100, ('tx1', 0)), "同一日志第二次出现应视为重复"
+assert dedup.add(100, ('tx1', 1))
+
+dedup.discard(100, ('tx1', 0))
+assert dedup.add(100, ('tx1', 0)), "discard 后应允许重新投递"
+
+assert dedup.add(200, ('tx2', 0))
+assert len(dedup) == 1, "窗口之外的区块应被整体淘汰"
+assert not dedup.add(150, ('tx3', 0)), "早于窗口的日志视为重复"
+
+dedup.discard_block(200)
+assert dedup.add(200, ('tx2', 0))
+print("✅ 去重、discard、窗口淘汰均符合预期")
+
+
+
+def transfer_log(block_number, log_index):
+    """发往监控钱包的 Transfer 日志"""
+    return {
+        'address': '0x' + 'cd' * 20,
+        'blockNumber': block_number,
+        'blockHash': HexBytes('0x' + f'{block_number:064x}'),
+        'logIndex': log_index,
+        'transactionHash': HexBytes('0x' + f'{block_number:032x}{log_index:032x}'),
+        'topics': [HexBytes(TRANSFER_EVENT_SIGNATURE), HexBytes('0x' + '00' * 31 + '01'),
+                   HexBytes('0x' + WALLET[2:].zfill(64))],
+        'data': HexBytes('0x' + f'{10**18:064x}'),
+        'removed': False,
+    }
+
+
+with mock.patch.object(Web3, 'is_connected', return_value=True), \
+        mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+    listener = AsyncEVMWebSocketListener('BSC', 'http://127.0.0.1:1', 'ws://127.0.0.1:1', [WALLET],
+                                         AdvancedTokenAnalyzer(), enqueue_timeout=0.05)
+
+
+def is_marked(log):
+    """日志是否仍带有去重标记（检查后恢复原状态）"""
+    key = listener._log_key(log)
+    if listener.seen_logs.add(log['blockNumber'], key):
+        listener.seen_logs.discard(log['blockNumber'], key)
+        return False
+    return True
+
+
+async def drop_when_queue_full():
+    listener.log_queue = asyncio.Queue(maxsize=1)
+    kept, dropped = transfer_log(100, 0), transfer_log(100, 1)
+    await listener._enqueue_log(kept)
+    await listener._enqueue_log(dropped)
+    return kept, dropped
+
+
+# 场景2: 队列满、等待超时被丢弃的日志
+print("\n【场景2: 队列满时丢弃的日志可被补齐重新送达】")
+kept, dropped = asyncio.run(drop_when_queue_full())
+assert listener.queue_stats['dropped'] == 1
+assert is_marked(kept), "已入队的日志应保持去重标记"
+assert not is_marked(dropped), "被丢弃的日志不应保留去重标记"
+assert listener._dedupe_logs([dropped]) == [dropped], "补齐路径应能重新接收被丢弃的日志"
+print("✅ 丢弃的日志已撤销去重标记")
+
+
+async def cancel_worker_mid_batch():
+    listener.log_queue = asyncio.Queue()
+    prefetch_started = asyncio.Event()
+
+    async def slow_prefetch(*_):
+        prefetch_started.set()
+        await asyncio.sleep(3600)
+
+    listener._prefetch_block_timestamps = slow_prefetch
+    logs = [transfer_log(101, index) for index in range(3)]
+    for log in logs:
+        await listener._enqueue_log(log)
+
+    worker = asyncio.create_task(listener._log_worker())
+    await prefetch_started.wait()
+    worker.cancel()
+    try:
+        await worker
+    except asyncio.CancelledError:
+        pass
+    return logs
+
+
+# 场景3: worker 在处理批次途中被取消（断线重连）
+print("\n【场景3: 处理途中被取消的批次可重新送达】")
+cancelled_logs = asyncio.run(cancel_worker_mid_batch())
+assert listener.stats['total_transfers'] == 0
+for log in cancelled_logs:
+    assert not is_marked(log), "被取消批次中的日志不应保留去重标记"
+print("✅ 取消的批次已撤销去重标记")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
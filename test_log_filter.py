@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+测试服务端日志过滤器模式 - 安装前缺口由区间查询补齐、按确认数延后处理、过滤器失效后重装
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.eth import Eth
+
+from multichain_listener import TRANSFER_EVENT_SIGNATURE, AdvancedTokenAnalyzer, EVMChainListener
+
+print("="*80)
+print("测试服务端日志过滤器模式")
+print("="*80)
+
+WALLET = '0x' + 'ab' * 20
+STRANGER = '0x' + 'ee' * 20
+with mock.patch.object(Web3, 'is_connected', return_value=True), \
+        mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+    listener = EVMChainListener('BSC', 'http://127.0.0.1:1', None, [WALLET], AdvancedTokenAnalyzer(),
+                                use_new_heads=False, use_log_filter=True, confirmations=2)
+
+
+def transfer_log(to_address, block_number, log_index):
+    """eth_getFilterChanges 返回的 Transfer 日志"""
+    return {
+        'address': '0x' + 'cd' * 20,
+        'blockNumber': block_number,
+        'blockHash': HexBytes('0x' + f'{block_number:064x}'),
+        'logIndex': log_index,
+        'transactionHash': HexBytes('0x' + f'{block_number:032x}{log_index:032x}'),
+        'topics': [HexBytes(TRANSFER_EVENT_SIGNATURE), HexBytes('0x' + '00' * 31 + '01'),
+                   HexBytes('0x' + to_address[2:].lower().zfill(64))],
+        'data': HexBytes('0x' + f'{10**18:064x}'),
+        'removed': False,
+    }
+
+
+
+class FakeFilterEth:
+    def __init__(self):
+        self.installed = []
+        self.uninstalled = []
+        self.changes = []          # 下一次 get_filter_changes 的返回值；异常表示过滤器失效
+
+    async def filter(self, params):
+        self.installed.append(params)
+        return SimpleNamespace(filter_id=f'0xf{len(self.installed)}')
+
+    async def get_filter_changes(self, filter_id):
+        changes, self.changes = self.changes, []
+        if isinstance(changes, Exception):
+            raise changes
+        return changes
+
+    async def uninstall_filter(self, filter_id):
+        self.uninstalled.append(filter_id)
+
+
+eth = FakeFilterEth()
+listener.async_http_w3 = SimpleNamespace(eth=eth)
+ranges = []
+handled = []
+
+
+async def catch_up_to(current_block, latest_block, callback=None):
+    if latest_block >= current_block:
+        ranges.append((current_block, latest_block))
+    return max(current_block, latest_block + 1)
+
+
+async def handle_transfer_logs(logs, callback=None, deduplicated=False):
+    handled.extend(log['blockNumber'] for log in logs)
+
+
+listener._catch_up_to = catch_up_to
+listener._handle_transfer_logs = handle_transfer_logs
+
+# 场景1: 首次安装，之前的区块用区间查询
+print("\n【场景1: 安装过滤器】")
+current = asyncio.run(listener._poll_log_filter(90, 100))
+assert len(eth.installed) == 1 and eth.installed[0]['topics'] == listener._transfer_log_topics()
+assert listener._log_filter_start == 101
+assert ranges == [(90, 98)] and current == 99, "区间查询只处理到 链头-确认数"
+print("✅ 过滤器覆盖区块 101 起，之前的区块按区间查询")
+
+# 场景2: 增量日志按确认数延后处理
+print("\n【场景2: 增量日志】")
+eth.changes = [transfer_log(WALLET, 101, 0), transfer_log(STRANGER, 101, 1)]
+current = asyncio.run(listener._poll_log_filter(current, 101))
+assert ranges[-1] == (99, 99) and current == 100
+assert not handled and len(listener._pending_filter_logs) == 1, "未确认的日志暂存，无关日志丢弃"
+
+eth.changes = [transfer_log(WALLET, 102, 0)]
+current = asyncio.run(listener._poll_log_filter(current, 103))
+assert ranges[-1] == (100, 100)
+assert handled == [101], "达到确认数后处理"
+assert current == 102, "进入过滤器覆盖范围后游标跟随确认高度"
+assert len(eth.installed) == 1, "过滤器只安装一次"
+print("✅ 日志在达到确认数后处理，游标连续前进")
+
+# 场景3: 过滤器失效后重装并补齐缺口
+print("\n【场景3: 过滤器失效】")
+eth.changes = ValueError("filter not found")
+current = asyncio.run(listener._poll_log_filter(current, 104))
+assert listener._log_filter_id is None and current == 102
+
+ranges.clear()
+current = asyncio.run(listener._poll_log_filter(current, 110))
+assert len(eth.installed) == 2 and listener._log_filter_start == 111
+assert ranges == [(102, 108)] and current == 109, "失效期间的区块由区间查询补齐"
+
+asyncio.run(listener._uninstall_log_filter())
+assert eth.uninstalled == ['0xf2'] and listener._log_filter_id is None
+print("✅ 重装后缺口补齐，停止时卸载过滤器")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+测试新区块驱动的轮询 - 出块时间学习、等待间隔，以及只在高度变化时触发查询
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+from web3 import Web3
+from web3.eth import Eth
+
+from multichain_listener import AdaptivePollInterval, AdvancedTokenAnalyzer, EVMChainListener
+
+print("="*80)
+print("测试新区块驱动的轮询")
+print("="*80)
+
+# 场景1: 出块时间学习与等待间隔
+print("\n【场景1: AdaptivePollInterval】")
+interval = AdaptivePollInterval(initial_block_time=12.0, min_interval=0.5, max_interval=60.0, smoothing=0.5)
+assert interval.next_delay(now=0.0) == 0.5, "未观测到区块时尽快探测"
+
+interval.on_head(100, now=0.0)
+assert interval.next_delay(now=1.0) == 11.0, "休眠到预计下一个区块出现"
+interval.on_head(101, now=4.0)
+assert interval.block_time == 8.0, "按滑动平均学习出块时间"
+interval.on_head(101, now=5.0)
+interval.on_head(99, now=5.0)
+assert interval.block_time == 8.0, "高度未前进的观测被忽略"
+
+interval.on_head(103, now=10.0)
+assert interval.block_time == 5.5, "跨多个区块时按平均出块时间计算"
+assert interval.next_delay(now=20.0) == 5.5 / 4, "超过预计时间后以较短间隔重试"
+
+slow = AdaptivePollInterval(initial_block_time=1000.0, max_interval=60.0)
+assert slow.block_time == 60.0, "出块时间限制在上限内"
+print("✅ 学习与等待间隔符合预期")
+
+# 场景2: 轮询 eth_blockNumber 只在高度变化时产出
+print("\n【场景2: 轮询新区块】")
+with mock.patch.object(Web3, 'is_connected', return_value=True), \
+        mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+    listener = EVMChainListener('BSC', 'http://127.0.0.1:1', None, ['0x' + 'ab' * 20], AdvancedTokenAnalyzer(),
+                                use_new_heads=False)
+observed_heads = iter([10, 10, 10, 11, 13, 13, 14])
+
+
+class FakeEth:
+    @property
+    async def block_number(self):
+        return next(observed_heads)
+
+
+listener.async_http_w3 = SimpleNamespace(eth=FakeEth())
+sleeps = []
+
+
+async def no_sleep(delay):
+    sleeps.append(delay)
+
+
+async def collect_heads(count):
+    heads = []
+    new_heads = listener._iter_new_heads()
+    async for head in new_heads:
+        heads.append(head)
+        if len(heads) == count:
+            break
+    await new_heads.aclose()
+    return heads
+
+
+with mock.patch.object(asyncio, 'sleep', no_sleep):
+    heads = asyncio.run(collect_heads(4))
+assert heads == [10, 11, 13, 14], "同一高度不重复触发查询"
+assert len(sleeps) == 6 and all(delay > 0 for delay in sleeps), "每次探测之间按学习到的间隔休眠"
+print("✅ 7 次探测产出 4 个新高度")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+测试批量处理转账 - 按合约分组、批内合并分析，以及单笔入口的分析不被遗漏
+"""
+
+from unittest import mock
+
+from web3 import Web3
+from web3.eth import Eth
+
+from multichain_listener import AdvancedTokenAnalyzer, EVMChainListener
+
+WALLET = Web3.to_checksum_address('0x' + 'ab' * 20)
+OTHER_WALLET = Web3.to_checksum_address('0x' + 'ef' * 20)
+CONTRACT_A = Web3.to_checksum_address('0x' + 'cd' * 20)
+CONTRACT_B = Web3.to_checksum_address('0x' + 'ce' * 20)
+
+print("="*80)
+print("测试批量处理转账")
+print("="*80)
+
+
+def new_listener():
+    with mock.patch.object(Web3, 'is_connected', return_value=True), \
+            mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+        listener = EVMChainListener('BSC', 'http://127.0.0.1:1', None, [WALLET], AdvancedTokenAnalyzer(),
+                                    use_new_heads=False)
+    # 元数据预先写入缓存，处理时无需 RPC
+    for contract, symbol in ((CONTRACT_A, 'AAA'), (CONTRACT_B, 'BBB')):
+        listener._cache_token_info(contract, {'name': symbol, 'symbol': symbol, 'decimals': 18,
+                                              'total_supply': 10**27}, persist=False)
+    listener.analysis_runs = []
+    run_full_analysis = listener._run_full_analysis
+
+    def counting_analysis(contract, buffer, token_info):
+        listener.analysis_runs.append((contract, len(buffer['transfers'])))
+        run_full_analysis(contract, buffer, token_info)
+
+    listener._run_full_analysis = counting_analysis
+    return listener
+
+
+def make_transfer(contract, block_number, index, to=WALLET, value=1_000 * 10**18):
+    return {
+        'block_number': block_number,
+        'tx_hash': f'0x{block_number:032x}{index:032x}',
+        'contract': contract,
+        'from': '0x' + f'{index + 1:040x}',
+        'to': to,
+        'value': value,
+        'timestamp': 1700000000 + block_number * 3,
+    }
+
+
+# 场景1: 一批转账按合约分组，每个代币只分析首笔与批末各一次
+print("\n【场景1: 批内合并分析】")
+listener = new_listener()
+batch = [make_transfer(CONTRACT_A, 100, i) for i in range(50)]
+batch += [make_transfer(CONTRACT_B, 100, 50 + i) for i in range(3)]
+batch.append(make_transfer(CONTRACT_A, 100, 99, to=OTHER_WALLET))
+listener.process_transfers(batch)
+
+assert listener.stats['total_transfers'] == 53, "非监控钱包的转账不计入"
+assert len(listener.new_tokens_buffer[CONTRACT_A]['transfers']) == 50
+assert len(listener.new_tokens_buffer[CONTRACT_B]['transfers']) == 3
+assert listener.analysis_runs == [(CONTRACT_A, 2), (CONTRACT_B, 2), (CONTRACT_A, 50), (CONTRACT_B, 3)], \
+    listener.analysis_runs
+assert not listener._pending_analyses
+print(f"✅ 53 笔转账只执行 {len(listener.analysis_runs)} 次分析，最终分析覆盖全部转账")
+
+# 场景2: flush=False 时合并分析留给调用方在批次边界执行
+print("\n【场景2: flush=False 延后执行】")
+listener = new_listener()
+listener.process_transfers([make_transfer(CONTRACT_A, 100, i) for i in range(5)], flush=False)
+assert listener.analysis_runs == [(CONTRACT_A, 2)]
+assert CONTRACT_A in listener._pending_analyses
+listener._flush_pending_analyses()
+assert listener.analysis_runs == [(CONTRACT_A, 2), (CONTRACT_A, 5)]
+print("✅ 批末合并分析由调用方触发")
+
+# 场景3: 外部调用方逐笔调用 process_transfer，最后一笔的分析不被遗漏
+print("\n【场景3: 逐笔调用 process_transfer】")
+listener = new_listener()
+for i in range(4):
+    listener.process_transfer(make_transfer(CONTRACT_A, 100, i))
+    assert not listener._pending_analyses, "单笔入口处理后不应留下待执行的分析"
+assert listener.analysis_runs[-1] == (CONTRACT_A, 4), listener.analysis_runs
+print(f"✅ 每笔转账后分析均已执行: {listener.analysis_runs}")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+测试链重组处理 - 哈希窗口、只校验链头的重组探测、撤回分叉点之后的转账，以及累加器的反向扣减
+"""
+
+import asyncio
+import math
+import random
+from unittest import mock
+
+from web3 import Web3
+from web3.eth import Eth
+
+from multichain_listener import AdvancedTokenAnalyzer, BlockHashWindow, EVMChainListener, MultiChainListener
+
+WALLET = Web3.to_checksum_address('0x' + 'ab' * 20)
+CONTRACT = Web3.to_checksum_address('0x' + 'cd' * 20)
+
+print("="*80)
+print("测试链重组处理")
+print("="*80)
+
+
+def random_transfers(rng, count):
+    """随机生成一个代币的转账（重复金额、同一发送者多笔、缺失时间戳）"""
+    senders = [f'0xSender{i}...' for i in range(rng.randint(1, 6))]
+    repeated_value = rng.choice([100, 5_000, 200_000]) * 10**18
+    return [{
+        'from': rng.choice(senders),
+        'value': repeated_value if rng.random() < 0.4 else rng.randint(1, 2_000_000) * 10**16,
+        'timestamp': 1700000000 + rng.choice([0, 10, 59, 600, 90000]) * rng.randint(0, 5)
+        if rng.random() > 0.1 else None,
+    } for _ in range(count)]
+
+
+# 场景1: 区块哈希窗口
+print("\n【场景1: BlockHashWindow】")
+window = BlockHashWindow(size=3)
+assert window.record(10, 'a') and window.record(10, 'a')
+assert not window.record(10, 'b'), "同一高度哈希变化应报告不一致"
+for block_number in range(11, 15):
+    window.record(block_number, f'h{block_number}')
+assert window.block_numbers() == [11, 12, 13, 14], "超出窗口的区块应被淘汰"
+assert window.highest_block == 14
+assert window.discard_from(13) == [13, 14]
+assert window.highest_block == 12
+print("✅ 记录、淘汰、截断均符合预期")
+
+# 场景2: 累加器反向扣减与重建结果一致
+print("\n【场景2: TransferAccumulator.remove】")
+analyzer = AdvancedTokenAnalyzer()
+rng = random.Random(20240701)
+checks = 0
+for decimals in (18, 6):
+    token_info = {'symbol': 'TEST', 'decimals': decimals}
+    for _ in range(60):
+        transfers = random_transfers(rng, rng.randint(2, 30))
+        accumulator = analyzer.create_accumulator(token_info, transfers)
+        while transfers:
+            removed = transfers.pop(rng.randrange(len(transfers)))
+            accumulator.remove(removed)
+            rebuilt = analyzer.create_accumulator(token_info, transfers)
+            senders = {tx['from'] for tx in transfers}
+
+            actual = analyzer.accumulated_features(accumulator, senders)
+            expected = analyzer.accumulated_features(rebuilt, senders)
+            for field, expected_value in expected._asdict().items():
+                actual_value = getattr(actual, field)
+                if isinstance(expected_value, float):
+                    assert math.isclose(actual_value, expected_value, rel_tol=1e-9, abs_tol=1e-6), \
+                        (field, actual_value, expected_value)
+                else:
+                    assert actual_value == expected_value, (field, actual_value, expected_value)
+            checks += 1
+print(f"✅ {checks} 次扣减后特征与重建一致")
+
+# 场景3: 平时只取链头附近的区块头，哈希不一致时才回溯
+print("\n【场景3: 重组探测】")
+with mock.patch.object(Web3, 'is_connected', return_value=True), \
+        mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+    listener = EVMChainListener('BSC', 'http://127.0.0.1:1', None, [WALLET], AdvancedTokenAnalyzer(),
+                                use_new_heads=False, reorg_window=64)
+chain = {block_number: f'{block_number:064x}' for block_number in range(0, 200)}
+requested = []
+
+
+async def fetch_headers(block_numbers):
+    requested.append(list(block_numbers))
+    return {block_number: {'hash': chain[block_number]} for block_number in block_numbers}
+
+
+listener._fetch_block_headers = fetch_headers
+
+
+async def follow_chain():
+    next_block = 100
+    for _ in range(60):
+        listener.block_hashes.record(next_block, chain[next_block])
+        next_block = await listener._rewind_on_reorg(next_block + 1)
+    return next_block
+
+
+next_block = asyncio.run(follow_chain())
+assert max(len(blocks) for blocks in requested) <= 2, "无重组时每轮最多取两个区块头"
+assert listener.stats['reorgs'] == 0
+
+# 区块 150 起被替换
+for block_number in range(150, 200):
+    chain[block_number] = f'{block_number + 10**6:064x}'
+requested.clear()
+fork = asyncio.run(listener._rewind_on_reorg(next_block))
+assert fork == 150, fork
+assert listener.stats['reorgs'] == 1
+assert len(requested) == 2 and len(requested[1]) > 2, "哈希不一致时应回溯整个窗口"
+print(f"✅ 无重组时每轮最多 2 个区块头，重组时回溯定位分叉点 {fork}")
+
+# 场景4: 分叉点之后的转账从缓冲区撤回
+print("\n【场景4: 重组撤回】")
+listener._cache_token_info(CONTRACT, {'name': 'TEST', 'symbol': 'TEST', 'decimals': 18, 'total_supply': 10**27},
+                           persist=False)
+listener.block_hashes = BlockHashWindow(size=64)
+chain = {block_number: f'{block_number:064x}' for block_number in range(140, 161)}
+for block_number, block_hash in chain.items():
+    listener.block_hashes.record(block_number, block_hash)
+
+for block_number in (145, 155):
+    transfer_data = {'contract': CONTRACT, 'to': WALLET, 'from': f'0xSender{block_number}', 'value': 10**18,
+                     'tx_hash': f'0x{block_number:064x}', 'block_number': block_number,
+                     'timestamp': 1700000000 + block_number * 3}
+    listener.process_transfer(transfer_data)
+    listener._track_block_transfer({'transactionHash': transfer_data['tx_hash'], 'logIndex': 0}, transfer_data)
+
+# 区块 150 起被替换
+for block_number in range(150, 161):
+    chain[block_number] = f'{block_number + 10**6:064x}'
+fork = asyncio.run(listener._rewind_on_reorg(161))
+assert fork == 150, fork
+assert listener.stats['reorgs'] == 2
+assert listener.stats['retracted_transfers'] == 1
+buffer = listener.new_tokens_buffer[CONTRACT]
+assert [tx['block_number'] for tx in buffer['transfers']] == [145], "只撤回分叉点之后的转账"
+assert buffer['senders'] == {'0xSender145'}
+assert listener.block_hashes.block_numbers()[-1] == 149
+print(f"✅ 分叉点 {fork}，撤回区块 155 的转账，区块 145 的转账保留")
+
+print("\n【场景5: MultiChainListener 透传 reorg_window】")
+with mock.patch.object(Web3, 'is_connected', return_value=True), \
+        mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+    multi = MultiChainListener(enable_filter=False)
+    eth = multi.add_eth_listener('http://127.0.0.1:1', reorg_window=0)
+    bsc = multi.add_bsc_listener('http://127.0.0.1:1', ws_url='ws://127.0.0.1:1', use_websocket=True,
+                                 reorg_window=200)
+assert eth.block_hashes.size == 0, "HTTP 监听器可关闭重组检测"
+assert bsc.block_hashes.size == 200, "WebSocket 监听器使用配置的窗口"
+print("✅ HTTP / WebSocket 监听器均使用传入的重组窗口")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+测试 Solana 余额差分 - 单次遍历得到监控钱包的代币新增与发送方
+"""
+
+from types import SimpleNamespace
+
+print("="*80)
+print("测试 Solana 余额差分")
+print("="*80)
+
+# solana-py 的同步 Client 为必需依赖（部分新版本已移除 solana.rpc.api）
+try:
+    from solana.rpc.api import Client  # noqa: F401
+    SOLANA_AVAILABLE = True
+except ImportError:
+    SOLANA_AVAILABLE = False
+
+WALLET = 'Wallet1111111111111111111111111111111111111'
+MINT_A, MINT_B = 'MintA111111111111111111111111111111111111111', 'MintB111111111111111111111111111111111111111'
+
+
+def balance(account_index, mint, owner, amount):
+    return SimpleNamespace(account_index=account_index, mint=mint, owner=owner,
+                           ui_token_amount=SimpleNamespace(amount=str(amount)))
+
+
+def meta(pre, post):
+    return SimpleNamespace(pre_token_balances=pre, post_token_balances=post)
+
+
+if not SOLANA_AVAILABLE:
+    print("\n⚠️  未安装 solana-py 同步客户端，跳过 Solana 余额差分测试")
+else:
+    from multichain_listener import AdvancedTokenAnalyzer, SolanaChainListener
+
+    listener = SolanaChainListener('http://127.0.0.1:1', [WALLET], AdvancedTokenAnalyzer())
+
+    print("\n【场景1: 普通转入】")
+    changes = listener._extract_balance_changes(meta(
+        pre=[balance(1, MINT_A, 'Sender', 1000), balance(2, MINT_A, WALLET, 50)],
+        post=[balance(1, MINT_A, 'Sender', 400), balance(2, MINT_A, WALLET, 650)],
+    ), WALLET)
+    assert changes == {MINT_A: (600, 'Sender')}
+    print("✅ 新增数量与发送方正确")
+
+    print("\n【场景2: 新建代币账户、多个 mint、多个流出方】")
+    changes = listener._extract_balance_changes(meta(
+        pre=[balance(1, MINT_A, 'Small', 100), balance(2, MINT_A, 'Large', 900),
+             balance(3, MINT_B, WALLET, 10)],
+        post=[balance(1, MINT_A, 'Small', 0), balance(2, MINT_A, 'Large', 200),
+              balance(4, MINT_A, WALLET, 800), balance(3, MINT_B, WALLET, 15)],
+    ), WALLET)
+    assert changes == {MINT_A: (800, 'Large'), MINT_B: (5, 'Unknown')}, changes
+    print("✅ 无前余额的账户计为 0，发送方取流出最多的 owner，无流出方记为 Unknown")
+
+    print("\n【场景3: 同一 mint 的多个账户与缺失 owner】")
+    changes = listener._extract_balance_changes(meta(
+        pre=[balance(1, MINT_A, WALLET, 100), balance(2, MINT_A, None, 0), balance(3, MINT_A, 'Sender', 500)],
+        post=[balance(1, MINT_A, WALLET, 0), balance(2, MINT_A, WALLET, 300), balance(3, MINT_A, 'Sender', 300)],
+    ), WALLET)
+    assert changes == {MINT_A: (200, 'Sender')}, "同一钱包的多个账户合并计算净新增"
+    print("✅ 前余额缺少 owner 时使用后余额的 owner，多个账户按净值合并")
+
+    print("\n【场景4: 无新增】")
+    assert listener._extract_balance_changes(meta(
+        pre=[balance(1, MINT_A, WALLET, 500), balance(2, MINT_A, 'Receiver', 0)],
+        post=[balance(1, MINT_A, WALLET, 100), balance(2, MINT_A, 'Receiver', 400)],
+    ), WALLET) == {}, "监控钱包转出不产生转账"
+    assert listener._extract_balance_changes(meta(pre=None, post=None), WALLET) == {}
+    print("✅ 转出与空交易被忽略")
+
+    print("\n【场景5: 构造转账】")
+    transaction = SimpleNamespace(slot=42, block_time=1700000000, transaction=SimpleNamespace(meta=meta(
+        pre=[balance(1, MINT_A, 'Sender', 1000)],
+        post=[balance(1, MINT_A, 'Sender', 0), balance(2, MINT_A, WALLET, 1000)],
+    )))
+    transfers = listener._parse_solana_transaction(transaction, WALLET, 'sig')
+    assert transfers == [{
+        'block_number': 42, 'tx_hash': 'sig', 'contract': MINT_A, 'from': 'Sender',
+        'to': WALLET, 'value': 1000, 'timestamp': 1700000000,
+    }]
+    print("✅ 转账结构与 EVM 链一致")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
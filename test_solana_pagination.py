@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+测试 Solana 签名分页 - 从游标向前翻页不漏签名，预算用尽时记录缺口并在下一轮补拉
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from multichain_listener import AdvancedTokenAnalyzer, SolanaChainListener
+
+print("="*80)
+print("测试 Solana 签名分页")
+print("="*80)
+
+# solana-py 的同步 Client 为必需依赖（部分新版本已移除 solana.rpc.api）
+try:
+    from solana.rpc.api import Client  # noqa: F401
+    from solders.pubkey import Pubkey
+    SOLANA_AVAILABLE = True
+except ImportError:
+    SOLANA_AVAILABLE = False
+
+if not SOLANA_AVAILABLE:
+    print("\n⚠️  未安装 solana-py 同步客户端，跳过 Solana 签名分页测试")
+else:
+    from solders.signature import Signature
+
+    class PagedSignatures:
+        """AsyncClient 替身：签名列表按 before / until / limit 分页返回（新 -> 旧）"""
+
+        def __init__(self):
+            self.signatures = []       # [(签名, slot, err)]，旧 -> 新
+            self.page_requests = []    # 每页请求的 (before, until, limit, commitment)
+
+        def add_signature(self, slot, err=None):
+            sig_str = str(Signature.new_unique())
+            self.signatures.append((sig_str, slot, err))
+            return sig_str
+
+        async def get_signatures_for_address(self, wallet, before=None, until=None, limit=None, commitment=None):
+            self.page_requests.append((before and str(before), until and str(until), limit, commitment))
+            newest_first = [SimpleNamespace(signature=sig_str, slot=slot, err=err)
+                            for sig_str, slot, err in reversed(self.signatures)]
+            if until is not None:
+                newest_first = newest_first[:[info.signature for info in newest_first].index(str(until))]
+            if before is not None:
+                newest_first = newest_first[[info.signature for info in newest_first].index(str(before)) + 1:]
+            return SimpleNamespace(value=newest_first[:limit])
+
+        async def get_transaction(self, signature, commitment=None, max_supported_transaction_version=None):
+            return SimpleNamespace(value=SimpleNamespace(signature=str(signature), transaction=None))
+
+    wallet = str(Pubkey.new_unique())
+    client = PagedSignatures()
+    listener = SolanaChainListener('http://127.0.0.1:1', [wallet], AdvancedTokenAnalyzer(), signature_page_size=3)
+    listener.async_client = client
+    listener.parsed = []
+
+    def record_parsed(transaction, wallet_address, signature, callback=None):
+        """只记录被解析的签名"""
+        listener.parsed.append(signature)
+        return []
+
+    listener._parse_solana_transaction = record_parsed
+
+    # 场景1: 首次轮询处理最新一页签名
+    print("\n【场景1: 首次轮询】")
+    history = [client.add_signature(slot) for slot in range(1, 5)]
+    asyncio.run(listener._poll_wallets(None))
+    assert listener.signature_cursors[wallet] == history[-1]
+    assert listener.parsed == history, "没有游标时按旧 -> 新处理最新的签名"
+    assert client.page_requests == [(None, None, 10, None)], "只拉一页，条数为 initial_signature_limit"
+
+    skipping = SolanaChainListener('http://127.0.0.1:1', [wallet], AdvancedTokenAnalyzer(), signature_page_size=3)
+    skipping.async_client = client
+    skipping.initial_signature_limit = 0
+    skipping._parse_solana_transaction = record_parsed
+    listener.parsed.clear()
+    asyncio.run(skipping._poll_wallets(None))
+    assert skipping.signature_cursors[wallet] == history[-1]
+    assert not listener.parsed, "initial_signature_limit=0 时跳过启动前的历史"
+    print("✅ 首次轮询处理最新签名后从这里开始监听，也可配置为跳过历史")
+
+    # 场景2: 新签名超过一页时连续翻页
+    print("\n【场景2: 多页新签名】")
+    burst = [client.add_signature(slot, err={'InstructionError': 1} if slot == 12 else None)
+             for slot in range(5, 15)]
+    client.page_requests.clear()
+    asyncio.run(listener._poll_wallets(None))
+    assert listener.parsed == [sig for sig in burst if sig != burst[7]], "按旧 -> 新处理，失败交易跳过"
+    assert len(client.page_requests) == 4, "10 个签名、每页 3 条，翻 4 页"
+    assert all(until == history[-1] for _, until, _, _ in client.page_requests), "翻页不越过游标"
+    assert listener.signature_cursors[wallet] == burst[-1]
+    print(f"✅ {len(burst)} 个新签名一轮拉完，无遗漏")
+
+    # 场景3: 预算用尽时记录缺口，下一轮补拉
+    print("\n【场景3: 预算用尽】")
+    listener.parsed.clear()
+    previous_cursor = listener.signature_cursors[wallet]
+    burst = [client.add_signature(slot) for slot in range(15, 23)]
+    listener.poll_time_budget = 0
+    asyncio.run(listener._poll_wallets(None))
+    assert listener.parsed == burst[-3:], "预算内只拉到最新一页"
+    assert listener.signature_cursors[wallet] == burst[-1], "游标前移到最新签名"
+    assert listener.signature_gaps[wallet] == [(burst[-3], previous_cursor)], "未拉完的区间记为缺口"
+
+    listener.poll_time_budget = 10.0
+    asyncio.run(listener._poll_wallets(None))
+    assert sorted(listener.parsed) == sorted(burst), "缺口内的签名在下一轮补拉"
+    assert not listener.signature_gaps[wallet]
+    print("✅ 缺口在下一轮补齐，突发期间不丢签名")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
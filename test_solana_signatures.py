@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+测试 Solana 交易拉取 - 多钱包共享的签名只拉一次、有界并发、按 slot 顺序解析，拉取失败的签名在游标越过后重试
+"""
+
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+
+from checkpoint_store import CheckpointStore
+from multichain_listener import AdvancedTokenAnalyzer, SolanaChainListener
+
+print("="*80)
+print("测试 Solana 交易拉取")
+print("="*80)
+
+# solana-py 的同步 Client 为必需依赖（部分新版本已移除 solana.rpc.api）
+try:
+    from solana.rpc.api import Client  # noqa: F401
+    from solders.pubkey import Pubkey
+    from solders.signature import Signature
+    SOLANA_AVAILABLE = True
+except ImportError:
+    SOLANA_AVAILABLE = False
+
+if not SOLANA_AVAILABLE:
+    print("\n⚠️  未安装 solana-py 同步客户端，跳过 Solana 交易拉取测试")
+else:
+    wallets = [str(Pubkey.new_unique()) for _ in range(2)]
+
+    class SlowTransactions:
+        """AsyncClient 替身：slot 越小的交易返回越慢，记录同时进行的请求数，可让指定签名先失败若干次"""
+
+        def __init__(self):
+            self.signatures = []       # [(签名, slot, 涉及的钱包)]，旧 -> 新
+            self.failures = {}         # 签名 -> 剩余失败次数
+            self.fetched = []
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+        def add_signature(self, slot, *mentioned, failures=0):
+            sig_str = str(Signature.new_unique())
+            self.signatures.append((sig_str, slot, set(mentioned)))
+            self.failures[sig_str] = failures
+            return sig_str
+
+        async def get_signatures_for_address(self, wallet, before=None, until=None, limit=None, commitment=None):
+            newest_first = [SimpleNamespace(signature=sig_str, slot=slot, err=None)
+                            for sig_str, slot, mentioned in reversed(self.signatures) if str(wallet) in mentioned]
+            if until is not None:
+                newest_first = newest_first[:[info.signature for info in newest_first].index(str(until))]
+            return SimpleNamespace(value=newest_first[:limit])
+
+        async def get_transaction(self, signature, commitment=None, max_supported_transaction_version=None):
+            sig_str = str(signature)
+            slot = next(slot for known, slot, _ in self.signatures if known == sig_str)
+            self.fetched.append(sig_str)
+            if self.failures[sig_str]:
+                self.failures[sig_str] -= 1
+                raise ConnectionError("模拟 RPC 超时")
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01 * (10 - slot))
+            self.in_flight -= 1
+            return SimpleNamespace(value=SimpleNamespace(signature=sig_str, transaction=None))
+
+    parsed = []
+
+    def make_listener(client, **kwargs):
+        listener = SolanaChainListener('http://127.0.0.1:1', wallets, AdvancedTokenAnalyzer(), **kwargs)
+        listener.async_client = client
+
+        def record_parsed(transaction, wallet_address, signature, callback=None):
+            parsed.append((signature, wallet_address))
+            return []
+
+        listener._parse_solana_transaction = record_parsed
+        return listener
+
+    client = SlowTransactions()
+    listener = make_listener(client, tx_fetch_concurrency=2)
+
+    for wallet in wallets:
+        listener.signature_cursors[wallet] = client.add_signature(0, wallet)
+    shared = client.add_signature(3, *wallets)
+    only_first = [client.add_signature(slot, wallets[0]) for slot in (1, 4)]
+    only_second = [client.add_signature(slot, wallets[1]) for slot in (2, 5)]
+
+    asyncio.run(listener._poll_wallets(None))
+
+    print("\n【场景1: 共享签名只拉取一次】")
+    assert sorted(client.fetched) == sorted([shared] + only_first + only_second)
+    assert sorted(wallet for sig, wallet in parsed if sig == shared) == sorted(wallets), "按每个涉及的钱包分别解析"
+    print(f"✅ {len(client.fetched)} 笔交易各拉取一次")
+
+    print("\n【场景2: 有界并发，按 slot 顺序解析】")
+    assert client.max_in_flight == 2, client.max_in_flight
+    assert [sig for sig, _ in parsed] == [only_first[0], only_second[0], shared, shared,
+                                          only_first[1], only_second[1]], "完成顺序不影响解析顺序"
+    print("✅ 同时最多 2 个 getTransaction，解析顺序与链上一致")
+
+    print("\n【场景3: 拉取失败的签名在下一轮重试】")
+    wallet = wallets[0]
+    store = CheckpointStore(os.path.join(tempfile.mkdtemp(), 'checkpoint.db'), min_interval=0)
+    listener = make_listener(client, checkpoint_store=store)
+    listener.signature_cursors = {wallets[0]: only_first[1], wallets[1]: only_second[1]}
+    flaky = client.add_signature(6, wallet, failures=1)
+    healthy = client.add_signature(7, wallet)
+    parsed.clear()
+
+    asyncio.run(listener._poll_wallets(None))
+    assert [sig for sig, _ in parsed] == [healthy]
+    assert listener.signature_cursors[wallet] == healthy, "游标照常前移"
+    assert flaky in listener.signature_retries[wallet]
+
+    # 进程重启：失败签名随进度一起恢复
+    store.flush()
+    listener = make_listener(client, checkpoint_store=store)
+    listener._restore_signature_cursors()
+    assert listener.signature_cursors[wallet] == healthy
+    assert flaky in listener.signature_retries[wallet]
+
+    parsed.clear()
+    asyncio.run(listener._poll_wallets(None))
+    assert [sig for sig, _ in parsed] == [flaky], parsed
+    assert not listener.signature_retries[wallet]
+    print("✅ 失败的签名在游标越过后重试成功，重启后仍保留")
+
+    print("\n【场景4: 超过重试次数后放弃】")
+    doomed = client.add_signature(8, wallet, failures=100)
+    parsed.clear()
+    for _ in range(listener.max_signature_retries):
+        asyncio.run(listener._poll_wallets(None))
+    assert doomed not in [sig for sig, _ in parsed]
+    assert not listener.signature_retries[wallet]
+    print(f"✅ 连续 {listener.max_signature_retries} 次失败后不再重试")
+
+    store.close()
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
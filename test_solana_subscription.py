@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+测试 Solana 推送监听 - logsSubscribe 通知只作为唤醒信号，按 confirmed 级别拉取被提及的钱包
+"""
+
+import asyncio
+import json
+
+from multichain_listener import AdvancedTokenAnalyzer, SolanaChainListener
+
+print("="*80)
+print("测试 Solana 推送监听")
+print("="*80)
+
+# solana-py 的同步 Client 为必需依赖（部分新版本已移除 solana.rpc.api）
+try:
+    from solana.rpc.api import Client  # noqa: F401
+    from solders.pubkey import Pubkey
+    from websockets.asyncio.server import serve
+    SOLANA_AVAILABLE = True
+except ImportError:
+    SOLANA_AVAILABLE = False
+
+if not SOLANA_AVAILABLE:
+    print("\n⚠️  未安装 solana-py 同步客户端，跳过 Solana 推送监听测试")
+else:
+    wallets = [str(Pubkey.new_unique()) for _ in range(2)]
+    subscribe_requests = []
+    polls = []
+    first_poll = asyncio.Event()
+
+    async def node(ws):
+        """本地 WebSocket 节点：确认订阅后推送通知，然后断开"""
+        for _ in wallets:
+            request = json.loads(await ws.recv())
+            subscribe_requests.append(request)
+            await ws.send(json.dumps({'jsonrpc': '2.0', 'id': request['id'], 'result': 100 + request['id']}))
+
+        await first_poll.wait()
+
+        def notification(subscription, err=None):
+            return json.dumps({
+                'jsonrpc': '2.0', 'method': 'logsNotification',
+                'params': {'subscription': subscription, 'result': {'value': {'signature': 'x', 'err': err}}},
+            })
+
+        await ws.send(notification(102, err={'InstructionError': 0}))   # 失败交易不触发拉取
+        await ws.send(json.dumps({'jsonrpc': '2.0', 'method': 'slotNotification', 'params': {}}))
+        await ws.send(notification(101))
+        await ws.send(notification(101))
+        await asyncio.sleep(0.2)
+
+    async def run_subscription():
+        async with serve(node, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            listener = SolanaChainListener('http://127.0.0.1:1', wallets, AdvancedTokenAnalyzer(),
+                                           ws_url=f'ws://127.0.0.1:{port}')
+
+            async def record_poll(callback, wallets=None, commitment=None):
+                polls.append((wallets, commitment))
+                first_poll.set()
+
+            listener._poll_wallets = record_poll
+            await listener._run_logs_subscription(None)
+            return listener
+
+    listener = asyncio.run(run_subscription())
+
+    print("\n【场景1: 订阅】")
+    assert [request['params'][0] for request in subscribe_requests] == [{'mentions': [w]} for w in wallets]
+    assert all(request['params'][1] == {'commitment': 'confirmed'} for request in subscribe_requests)
+    assert listener._ws_subscribed
+    print(f"✅ 一个连接上为 {len(wallets)} 个钱包建立 logsSubscribe(mentions)")
+
+    print("\n【场景2: 通知触发拉取】")
+    assert polls[0] == (wallets, 'confirmed'), "订阅建立后先补齐所有钱包"
+    assert 2 <= len(polls) <= 3 and all(poll == ([wallets[0]], 'confirmed') for poll in polls[1:]), polls
+    print(f"✅ 通知只拉取被提及的钱包，并使用与推送相同的 confirmed 级别（{len(polls) - 1} 次拉取）")
+
+    print("\n【场景3: 拉取失败与兜底轮询】")
+    recovery_polls = []
+    notified = asyncio.Event()
+
+    async def quiet_node(ws):
+        """确认订阅后只推送一条通知，之后长时间没有通知"""
+        for _ in wallets:
+            request = json.loads(await ws.recv())
+            await ws.send(json.dumps({'jsonrpc': '2.0', 'id': request['id'], 'result': 100 + request['id']}))
+        await notified.wait()
+        await ws.send(json.dumps({
+            'jsonrpc': '2.0', 'method': 'logsNotification',
+            'params': {'subscription': 102, 'result': {'value': {'signature': 'y', 'err': None}}},
+        }))
+        await asyncio.sleep(0.3)
+
+    async def run_recovery():
+        async with serve(quiet_node, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            listener = SolanaChainListener('http://127.0.0.1:1', wallets, AdvancedTokenAnalyzer(),
+                                           ws_url=f'ws://127.0.0.1:{port}')
+            listener.subscribed_poll_interval = 0.1
+
+            async def flaky_poll(callback, wallets=None, commitment=None):
+                recovery_polls.append(wallets)
+                notified.set()
+                if len(recovery_polls) == 1:
+                    raise ConnectionError("节点不可达")
+
+            listener._poll_wallets = flaky_poll
+            await listener._run_logs_subscription(None)
+
+    asyncio.run(run_recovery())
+    assert recovery_polls[0] == wallets
+    assert recovery_polls[1] == wallets, "失败的钱包随下一次通知重新拉取，处理协程未退出"
+    assert len(recovery_polls) >= 3 and all(poll == wallets for poll in recovery_polls[2:]), recovery_polls
+    print(f"✅ 拉取失败后继续处理，没有通知时每 0.1 秒兜底拉取全部钱包（共 {len(recovery_polls)} 次）")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
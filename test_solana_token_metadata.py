@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+测试 SPL 代币元数据批量查询 - mint 与 Metaplex 元数据账户一次 getMultipleAccounts，结果进入缓存
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+print("="*80)
+print("测试 SPL 代币元数据批量查询")
+print("="*80)
+
+# solana-py 的同步 Client 为必需依赖（部分新版本已移除 solana.rpc.api）
+try:
+    from solana.rpc.api import Client  # noqa: F401
+    from solders.pubkey import Pubkey
+    SOLANA_AVAILABLE = True
+except ImportError:
+    SOLANA_AVAILABLE = False
+
+
+def mint_account(supply, decimals, owner='TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA'):
+    """SPL Token mint 账户（82 字节: ... supply@36, decimals@44 ...）"""
+    data = bytes(36) + supply.to_bytes(8, 'little') + bytes([decimals]) + bytes(37)
+    return SimpleNamespace(owner=owner, data=data)
+
+
+def metadata_account(name, symbol):
+    """Metaplex Metadata 账户（name / symbol 为定长补零的 borsh 字符串）"""
+    def borsh_string(value, width):
+        raw = value.encode().ljust(width, b'\x00')
+        return len(raw).to_bytes(4, 'little') + raw
+    data = bytes(1 + 32 + 32) + borsh_string(name, 32) + borsh_string(symbol, 10) + bytes(200)
+    return SimpleNamespace(owner='metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s', data=data)
+
+
+if not SOLANA_AVAILABLE:
+    print("\n⚠️  未安装 solana-py 同步客户端，跳过 SPL 代币元数据测试")
+else:
+    from multichain_listener import AdvancedTokenAnalyzer, SolanaChainListener
+
+    listener = SolanaChainListener('http://127.0.0.1:1', [str(Pubkey.new_unique())], AdvancedTokenAnalyzer())
+    accounts = {}   # 账户地址 -> 账户
+
+    def add_mint(mint_info=None, metadata_info=None):
+        mint = str(Pubkey.new_unique())
+        mint_key, metadata_key = listener._token_account_keys([mint])
+        accounts[str(mint_key)] = mint_info
+        accounts[str(metadata_key)] = metadata_info
+        return mint
+
+    class FakeAccountsClient:
+        def __init__(self):
+            self.requests = []
+            self.offline = False
+
+        async def get_multiple_accounts(self, keys):
+            self.requests.append(len(keys))
+            if self.offline:
+                raise ConnectionError("节点不可达")
+            return SimpleNamespace(value=[accounts.get(str(key)) for key in keys])
+
+    client = listener.async_client = FakeAccountsClient()
+
+    print("\n【场景1: 解码 mint 与 Metaplex 元数据】")
+    usdc = add_mint(mint_account(5 * 10**15, 6), metadata_account('USD Coin', 'USDC'))
+    bare = add_mint(mint_account(10**9, 9))
+    not_a_mint = add_mint(SimpleNamespace(owner='11111111111111111111111111111111', data=bytes(82)))
+    missing = add_mint()
+    asyncio.run(listener._prefetch_token_infos([usdc, bare, not_a_mint, missing, usdc]))
+
+    assert client.requests == [8], "4 个 mint（去重后）的 mint + 元数据账户一次查询"
+    assert listener.known_tokens[usdc] == {
+        'address': usdc, 'name': 'USD Coin', 'symbol': 'USDC', 'decimals': 6, 'total_supply': 5 * 10**15,
+    }
+    assert listener.known_tokens[bare]['symbol'] == f'TK-{bare[:4]}', "无 Metaplex 元数据时使用占位名称"
+    assert listener.get_token_info(not_a_mint) is None and listener.get_token_info(missing) is None
+    assert client.requests == [8], "负缓存命中，get_token_info 不再查询"
+    print("✅ 名称、精度、总量正确解析，非 mint 账户写入负缓存")
+
+    print("\n【场景2: 分批】")
+    client.requests.clear()
+    mints = [add_mint(mint_account(1, 0)) for _ in range(60)]
+    asyncio.run(listener._prefetch_token_infos(mints))
+    assert client.requests == [100, 20], "每次最多 50 个 mint（100 个账户）"
+    assert all(mint in listener.known_tokens for mint in mints)
+    print("✅ 60 个 mint 两次 getMultipleAccounts")
+
+    print("\n【场景3: 网络错误】")
+    client.requests.clear()
+    client.offline = True
+    later = add_mint(mint_account(1, 0))
+    asyncio.run(listener._prefetch_token_infos([later]))
+    asyncio.run(listener._prefetch_token_infos([later]))
+    assert client.requests == [2], "短时间内不重复查询"
+    assert later not in listener.known_tokens
+    assert listener.get_token_info(later)['symbol'] == 'UNKNOWN', "未取到元数据时返回默认信息"
+    assert client.requests == [2] and later not in listener.known_tokens, "get_token_info 不发起查询，默认信息不缓存"
+
+    client.offline = False
+    listener._token_retry_at[later] = 0   # 重试等待结束
+    asyncio.run(listener._prefetch_token_infos([later]))
+    assert later in listener.known_tokens, "网络恢复后重新查询"
+    print("✅ 网络错误不写持久负缓存，稍后重试")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
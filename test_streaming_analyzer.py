@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+测试流式分析 - 验证累加器结果与批量分析完全一致
+"""
+
+import random
+
+from multichain_listener import AdvancedTokenAnalyzer
+
+# 创建分析器
+analyzer = AdvancedTokenAnalyzer()
+
+print("="*80)
+print("测试流式分析 - 与 analyze_transfers 逐笔对比")
+print("="*80)
+
+
+def make_transfers(rng, count):
+    """随机生成转账（覆盖大额、小额重复、密集时间、缺失时间戳等情况）"""
+    senders = [f'0xSender{i}...' for i in range(rng.randint(1, 6))]
+    base_time = 1700000000
+    repeated_value = rng.choice([100, 5_000, 200_000]) * 10**18
+    transfers = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            value = repeated_value
+        elif kind < 0.9:
+            value = rng.randint(1, 50_000) * 10**16
+        else:
+            value = rng.randint(1, 2_000_000) * 10**18
+        timestamp = base_time + rng.choice([0, 10, 30, 59, 60, 600, 7200, 90000]) * rng.randint(0, 5)
+        transfers.append({
+            'from': rng.choice(senders),
+            'value': value,
+            'timestamp': timestamp if rng.random() > 0.1 else None,
+        })
+    return transfers
+
+
+rng = random.Random(20240601)
+scenarios = 0
+
+for decimals in (18, 9, 6):
+    token_info = {'symbol': 'TEST', 'decimals': decimals}
+    for _ in range(40):
+        transfers = make_transfers(rng, rng.randint(1, 40))
+        accumulator = analyzer.create_accumulator(token_info)
+        senders = set()
+
+        # 逐笔累加，每一步都与批量分析结果对比
+        for index, tx in enumerate(transfers):
+            accumulator.add(tx)
+            if tx['from']:
+                senders.add(tx['from'])
+
+            expected = analyzer.analyze_transfers(transfers[:index + 1], senders, token_info)
+            actual = analyzer.analyze_accumulated(accumulator, senders, token_info)
+
+            assert actual['scores'] == expected['scores'], (expected['scores'], actual['scores'])
+            assert actual['confidence'] == expected['confidence']
+            assert actual['risk_level'] == expected['risk_level']
+            assert actual['recommendation'] == expected['recommendation']
+            assert actual['warnings'] == expected['warnings']
+            assert actual['patterns'] == expected['patterns']
+            scenarios += 1
+
+print(f"\n✅ {scenarios} 次对比全部一致")
+
+# 与改造前的 analyze_transfers（statistics.mean）输出对比：均值恰好落在 .5 附近，
+# 浮点累加后再除会舍入到另一侧
+print("\n【基线对比: 平均金额】")
+values = [
+    131578074478001006096154256781, 615744712114867074702153933679, 897756482191539462350993235636,
+    339415866719805472343740152164, 749452732317240380120575766957, 369746372677546961499218345065,
+]
+transfers = [{'from': f'0xSender{i % 3}...', 'value': value, 'timestamp': 1700000000 + 600 * i}
+             for i, value in enumerate(values)]
+token_info = {'symbol': 'TEST', 'decimals': 18}
+senders = {tx['from'] for tx in transfers}
+baseline_patterns = [
+    '发现 6 笔转账', '3 个独立发送者', '✅ 大额转账检测通过（加 30% 置信度）', '所有转账在 50 分钟内完成',
+    '总金额: 3,103,694,240,499 TEST', '平均金额: 517,282,373,417 TEST', '💰 大额转账豁免女巫检测',
+]
+accumulator = analyzer.create_accumulator(token_info, transfers)
+assert analyzer.analyze_accumulated(accumulator, senders, token_info)['patterns'] == baseline_patterns
+assert analyzer.analyze_transfers(transfers, senders, token_info)['patterns'] == baseline_patterns
+
+# 撤回一笔后均值仍与重新批量计算一致
+accumulator.remove(transfers[0])
+expected = analyzer.analyze_transfers(transfers[1:], senders, token_info)
+assert analyzer.analyze_accumulated(accumulator, senders, token_info)['patterns'] == expected['patterns']
+print("✅ 平均金额与改造前逐位一致（含撤回后）")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
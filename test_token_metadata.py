@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+测试代币元数据批量查询 - Multicall 分批、返回值解码、非标准合约负缓存与逐个查询回退
+"""
+
+from unittest import mock
+
+from eth_abi import encode
+from web3 import Web3
+from web3.eth import Eth
+
+from multichain_listener import AdvancedTokenAnalyzer, EVMChainListener
+
+print("="*80)
+print("测试代币元数据批量查询")
+print("="*80)
+
+
+def token_results(name, symbol, decimals, total_supply, symbol_bytes32=False):
+    """一个合约的 name/symbol/decimals/totalSupply 返回值"""
+    symbol_data = symbol.encode().ljust(32, b'\x00') if symbol_bytes32 else encode(['string'], [symbol])
+    return [
+        (True, encode(['string'], [name])),
+        (True, symbol_data),
+        (True, encode(['uint256'], [decimals])),
+        (True, encode(['uint256'], [total_supply])),
+    ]
+
+
+NON_STANDARD = [(False, b''), (False, b''), (False, b''), (True, encode(['uint256'], [1]))]
+
+contracts = [Web3.to_checksum_address('0x' + f'{i:02x}' * 20) for i in range(1, 6)]
+chain_tokens = {
+    contracts[0]: token_results('Token A', 'AAA', 18, 10**27),
+    contracts[1]: token_results('Maker', 'MKR', 18, 10**24, symbol_bytes32=True),
+    contracts[2]: NON_STANDARD,
+    contracts[3]: token_results('Token D', 'DDD', 6, 10**15),
+    contracts[4]: token_results('Token E', 'EEE', 9, 10**18),
+}
+
+with mock.patch.object(Web3, 'is_connected', return_value=True), \
+        mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+    listener = EVMChainListener('BSC', 'http://127.0.0.1:1', None, ['0x' + 'ab' * 20], AdvancedTokenAnalyzer())
+listener.multicall_batch_size = 2
+multicall_batches = []
+
+
+def multicall(addresses):
+    multicall_batches.append(list(addresses))
+    return {address: chain_tokens[address] for address in addresses}
+
+
+listener._fetch_token_metadata_multicall = multicall
+
+# 场景1: 分批 Multicall 与解码
+print("\n【场景1: Multicall 分批查询】")
+infos = listener.get_token_infos([c.lower() for c in contracts] + [contracts[0]])
+assert multicall_batches == [contracts[0:2], contracts[2:4], contracts[4:5]], "按 multicall_batch_size 分批，重复地址只查一次"
+assert infos[contracts[0]]['symbol'] == 'AAA' and infos[contracts[0]]['total_supply'] == 10**27
+assert infos[contracts[1]]['symbol'] == 'MKR', "兼容 bytes32 编码的 symbol"
+assert infos[contracts[3]]['decimals'] == 6
+assert infos[contracts[2]] is None, "name/symbol/decimals 失败视为非标准合约"
+print("✅ 5 个合约 3 次 Multicall，返回值按合约正确切分解码")
+
+# 场景2: 缓存与负缓存
+print("\n【场景2: 缓存】")
+multicall_batches.clear()
+assert listener.get_token_info(contracts[2]) is None
+assert listener.get_token_info(contracts[4])['symbol'] == 'EEE'
+assert not multicall_batches, "正负缓存命中时不再查询"
+print("✅ 已解析与非标准合约都不重复查询")
+
+# 场景3: Multicall 不可用时逐个查询；网络错误不写负缓存
+print("\n【场景3: 回退与网络错误】")
+fresh = Web3.to_checksum_address('0x' + '66' * 20)
+single_calls = []
+
+
+def broken_multicall(addresses):
+    raise ValueError("execution reverted")
+
+
+def single(address):
+    single_calls.append(address)
+    return token_results('Token F', 'FFF', 18, 10**20)
+
+
+listener._fetch_token_metadata_multicall = broken_multicall
+listener._fetch_token_metadata_single = single
+assert listener.get_token_info(fresh)['symbol'] == 'FFF'
+assert single_calls == [fresh]
+
+offline = Web3.to_checksum_address('0x' + '77' * 20)
+
+
+def offline_single(address):
+    raise ConnectionError("节点不可达")
+
+
+listener._fetch_token_metadata_single = offline_single
+assert listener.get_token_info(offline) is None
+assert listener._lookup_cached_token(offline) == (False, None), "网络错误不写负缓存"
+print("✅ Multicall 失败回退逐个查询，网络错误下次仍会重试")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+测试代币元数据持久化缓存 - 正/负缓存 TTL 过期，以及重启后监听器直接命中缓存
+"""
+
+import os
+import tempfile
+from unittest import mock
+
+import token_metadata_store
+from multichain_listener import AdvancedTokenAnalyzer, BaseChainListener
+from token_metadata_store import TokenMetadataStore
+
+print("="*80)
+print("测试代币元数据持久化缓存")
+print("="*80)
+
+db_file = os.path.join(tempfile.mkdtemp(), 'token_metadata_cache.db')
+info = {'name': 'Token A', 'symbol': 'AAA', 'decimals': 18}
+now = 1700000000.0
+
+# 场景1: TTL 过期
+print("\n【场景1: TTL】")
+store = TokenMetadataStore(db_file, negative_ttl=600, positive_ttl=3600)
+with mock.patch.object(token_metadata_store.time, 'time', return_value=now):
+    assert store.get('BSC', '0xA') == (False, None)
+    store.put('BSC', '0xA', info)
+    store.put_negative('BSC', '0xB')
+
+with mock.patch.object(token_metadata_store.time, 'time', return_value=now + 600):
+    assert store.get('BSC', '0xA') == (True, info)
+    assert store.get('BSC', '0xB') == (True, None), "负缓存有效期内命中"
+    assert store.get('ETH', '0xA') == (False, None), "不同链互不影响"
+
+with mock.patch.object(token_metadata_store.time, 'time', return_value=now + 601):
+    assert store.get('BSC', '0xB') == (False, None), "负缓存过期后允许重新查询"
+    assert store.get('BSC', '0xA') == (True, info)
+
+with mock.patch.object(token_metadata_store.time, 'time', return_value=now + 3601):
+    assert store.get('BSC', '0xA') == (False, None), "正缓存过期"
+    store.put('BSC', '0xB', info)
+    assert store.get('BSC', '0xB') == (True, info), "重新查询成功后覆盖负缓存"
+
+assert store.get_stats()['positive_entries'] == 2
+store.close()
+print("✅ 正/负缓存按各自 TTL 过期")
+
+# 场景2: 重启后共享缓存
+print("\n【场景2: 重启】")
+
+
+class OfflineListener(BaseChainListener):
+    """不连接节点的监听器，只用于读写元数据缓存"""
+
+    def get_token_info(self, contract_address):
+        raise AssertionError(f"不应发起 RPC 查询: {contract_address}")
+
+    def listen(self, callback=None):
+        pass
+
+
+store = TokenMetadataStore(db_file, negative_ttl=600)
+first = OfflineListener('BSC', ['wallet'], AdvancedTokenAnalyzer(), token_store=store)
+first._cache_token_info('0xC', info)
+first._cache_token_info('0xD', None)
+store.close()
+
+store = TokenMetadataStore(db_file, negative_ttl=600)
+restarted = OfflineListener('BSC', ['wallet'], AdvancedTokenAnalyzer(), token_store=store)
+assert restarted._lookup_cached_token('0xC') == (True, info)
+assert restarted._lookup_cached_token('0xD') == (True, None)
+assert restarted.known_tokens['0xC'] == info, "命中后写入内存缓存"
+assert '0xD' in restarted._negative_tokens
+store.close()
+print("✅ 重启后无需 RPC 即可得到已知代币与非标准合约")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+测试 WebSocket 监听进度 - 只记录已处理 / 已补齐的高度，恢复补齐不受推送去重窗口影响
+"""
+
+import asyncio
+import os
+import tempfile
+from unittest import mock
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.eth import Eth
+
+from checkpoint_store import CheckpointStore
+from multichain_listener import TRANSFER_EVENT_SIGNATURE, AdvancedTokenAnalyzer, AsyncEVMWebSocketListener
+
+WALLET = '0x' + 'ab' * 20
+CONTRACT = Web3.to_checksum_address('0x' + 'cd' * 20)
+
+print("="*80)
+print("测试 WebSocket 监听进度")
+print("="*80)
+
+db_file = os.path.join(tempfile.mkdtemp(), 'checkpoint.db')
+store = CheckpointStore(db_file, min_interval=0)
+
+
+def saved_block():
+    store.flush()
+    state = CheckpointStore(db_file).load('BSC')
+    return state and state['next_block']
+
+
+class FakeHttpEth:
+    """只提供 block_number 的异步 eth 接口"""
+
+    def __init__(self, head):
+        self.head = head
+
+    @property
+    async def block_number(self):
+        return self.head
+
+
+class FakeHttpWeb3:
+    def __init__(self, head):
+        self.eth = FakeHttpEth(head)
+
+
+def transfer_log(block_number):
+    """区块内唯一一条转入监控钱包的 Transfer 日志"""
+    return {
+        'address': CONTRACT,
+        'blockNumber': block_number,
+        'blockHash': HexBytes('0x' + f'{block_number:064x}'),
+        'blockTimestamp': 1700000000 + block_number * 3,
+        'logIndex': 0,
+        'transactionHash': HexBytes('0x' + f'{block_number:064x}'),
+        'topics': [HexBytes(TRANSFER_EVENT_SIGNATURE), HexBytes('0x' + '00' * 31 + '01'),
+                   HexBytes('0x' + WALLET[2:].zfill(64))],
+        'data': HexBytes('0x' + f'{10**18:064x}'),
+        'removed': False,
+    }
+
+
+def new_listener():
+    with mock.patch.object(Web3, 'is_connected', return_value=True), \
+            mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+        listener = AsyncEVMWebSocketListener('BSC', 'http://127.0.0.1:1', 'ws://127.0.0.1:1', [WALLET],
+                                             AdvancedTokenAnalyzer(), checkpoint_store=store, num_workers=1,
+                                             enqueue_timeout=0.05)
+    # 元数据预先写入缓存，处理时无需 RPC
+    listener._cache_token_info(CONTRACT, {'name': 'TEST', 'symbol': 'TEST', 'decimals': 18,
+                                          'total_supply': 10**27}, persist=False)
+    return listener
+
+
+async def drain(listener):
+    """运行 worker 直到队列清空"""
+    worker = asyncio.create_task(listener._log_worker())
+    await listener.log_queue.join()
+    worker.cancel()
+    try:
+        await worker
+    except asyncio.CancelledError:
+        pass
+
+
+# 场景1: 推送到达不推进进度，处理完成后才推进
+print("\n【场景1: 推送日志处理完成后才记录进度】")
+listener = new_listener()
+
+
+async def push_then_process():
+    listener.log_queue = asyncio.Queue()
+    await listener._enqueue_log(transfer_log(100))
+    assert saved_block() is None, "日志仅入队时不应记录进度"
+    await drain(listener)
+
+
+asyncio.run(push_then_process())
+assert listener.stats['total_transfers'] == 1
+assert saved_block() == 100
+print("✅ 进度在处理完成后推进到区块 100")
+
+# 场景2: 从进度恢复，补齐与推送并行
+print("\n【场景2: 恢复补齐期间推送不推进进度，缺口日志不被去重窗口淘汰】")
+store.update('BSC', {'next_block': 1000})
+listener = new_listener()
+listener.last_ws_block = listener._load_checkpoint()['next_block']
+head = 1000 + 3 * listener.seen_logs.window_blocks
+listener._get_async_http_w3 = lambda: FakeHttpWeb3(head)
+
+
+async def catch_up_with_push(from_block, latest_block, callback=None, block_range=None):
+    # 补齐期间推送送达链头附近的日志，去重窗口被推高到链头
+    await listener._enqueue_log(transfer_log(head + 1))
+    await drain(listener)
+    assert saved_block() == from_block, "补齐完成前进度应停在缺口起点"
+
+    # 补齐拉到缺口起点附近的日志，早于去重窗口但仍应被处理
+    await listener._handle_transfer_logs([transfer_log(from_block)])
+    return latest_block + 1
+
+
+async def resume():
+    listener.log_queue = asyncio.Queue()
+    listener._catch_up_to = catch_up_with_push
+    await listener._on_subscribed()
+    await listener._backfill_task
+
+
+asyncio.run(resume())
+assert listener.queue_stats['http_recovered'] == 1, "缺口内的日志应被接收"
+assert listener.stats['total_transfers'] == 2
+assert saved_block() == head + 1
+print(f"✅ 缺口日志已处理，补齐完成后进度推进到区块 {head + 1}")
+
+# 场景3: 补齐只完成一部分
+print("\n【场景3: 补齐未完成时进度停在未补齐的位置】")
+store.update('BSC', {'next_block': 1000})
+listener = new_listener()
+listener.last_ws_block = 1000
+listener._get_async_http_w3 = lambda: FakeHttpWeb3(5000)
+
+
+async def partial_catch_up(from_block, latest_block, callback=None, block_range=None):
+    return 3000
+
+
+listener._catch_up_to = partial_catch_up
+asyncio.run(listener._backfill_gap())
+assert saved_block() == 3000
+listener._on_logs_processed([transfer_log(5001)])
+assert saved_block() == 3000, "缺口未补齐前推送不应推进进度"
+print("✅ 进度停在区块 3000")
+
+# 场景4: 队列满丢弃的日志
+print("\n【场景4: 丢弃日志所在区块限制进度，下次补齐重新拉取】")
+listener = new_listener()
+
+
+async def drop_one():
+    listener.log_queue = asyncio.Queue(maxsize=1)
+    await listener._enqueue_log(transfer_log(200))
+    await listener._enqueue_log(transfer_log(201))
+    await drain(listener)
+    await listener._enqueue_log(transfer_log(202))
+    await drain(listener)
+
+
+asyncio.run(drop_one())
+assert listener.queue_stats['dropped'] == 1
+assert saved_block() == 201, "进度不应越过被丢弃日志所在区块"
+
+backfill_ranges = []
+
+
+async def record_catch_up(from_block, latest_block, callback=None, block_range=None):
+    backfill_ranges.append((from_block, latest_block))
+    return latest_block + 1
+
+
+listener._get_async_http_w3 = lambda: FakeHttpWeb3(210)
+listener._catch_up_to = record_catch_up
+asyncio.run(listener._backfill_gap())
+assert backfill_ranges == [(201, 210)], backfill_ranges
+assert saved_block() == 210
+print("✅ 补齐从被丢弃日志所在区块开始，完成后进度恢复推进")
+
+store.close()
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+测试 WebSocket 处理队列 - 多个 worker 并发预取，转账仍按出队顺序落账；队列满时背压与丢弃计数
+"""
+
+import asyncio
+from unittest import mock
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.eth import Eth
+
+from multichain_listener import TRANSFER_EVENT_SIGNATURE, AdvancedTokenAnalyzer, AsyncEVMWebSocketListener
+
+WALLET = '0x' + 'ab' * 20
+CONTRACT = Web3.to_checksum_address('0x' + 'cd' * 20)
+
+print("="*80)
+print("测试 WebSocket 处理队列")
+print("="*80)
+
+
+
+def transfer_log(block_number):
+    """区块内唯一一条转入监控钱包的 Transfer 日志"""
+    return {
+        'address': CONTRACT,
+        'blockNumber': block_number,
+        'blockHash': HexBytes('0x' + f'{block_number:064x}'),
+        'logIndex': 0,
+        'transactionHash': HexBytes('0x' + f'{block_number:064x}'),
+        'topics': [HexBytes(TRANSFER_EVENT_SIGNATURE), HexBytes('0x' + '00' * 31 + '01'),
+                   HexBytes('0x' + WALLET[2:].zfill(64))],
+        'data': HexBytes('0x' + f'{10**18:064x}'),
+        'removed': False,
+    }
+
+
+with mock.patch.object(Web3, 'is_connected', return_value=True), \
+        mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+    listener = AsyncEVMWebSocketListener('BSC', 'http://127.0.0.1:1', 'ws://127.0.0.1:1', [WALLET],
+                                         AdvancedTokenAnalyzer(), num_workers=3, queue_maxsize=2,
+                                         enqueue_timeout=0.05)
+# 元数据预先写入缓存，处理时无需 RPC
+listener._cache_token_info(CONTRACT, {'name': 'TEST', 'symbol': 'TEST', 'decimals': 18, 'total_supply': 10**27},
+                           persist=False)
+listener.worker_batch_size = 1
+
+# 越早出队的批次预取越慢，worker 完成预取的顺序与出队顺序相反
+prefetch_delays = {100: 0.15, 101: 0.1, 102: 0.05, 103: 0.0}
+
+
+async def uneven_prefetch(logs):
+    await asyncio.sleep(max(prefetch_delays[log['blockNumber']] for log in logs))
+
+
+listener._prefetch_block_timestamps = uneven_prefetch
+committed = []
+
+
+async def run_workers():
+    listener.log_queue = asyncio.Queue(maxsize=listener.queue_maxsize)
+    listener._ws_callback = lambda transfer_data, _: committed.append(transfer_data['block_number'])
+    workers = [asyncio.create_task(listener._log_worker()) for _ in range(listener.num_workers)]
+    for block_number in prefetch_delays:
+        await listener._enqueue_log(transfer_log(block_number))
+    await listener.log_queue.join()
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+
+
+print("\n【场景1: 预取乱序完成，落账保持顺序】")
+asyncio.run(run_workers())
+assert committed == [100, 101, 102, 103], committed
+assert listener.queue_stats['processed'] == 4
+assert listener.queue_stats['dropped'] == 0
+assert listener.new_tokens_buffer
+buffer = next(iter(listener.new_tokens_buffer.values()))
+assert [tx['block_number'] for tx in buffer['transfers']] == [100, 101, 102, 103]
+print(f"✅ 落账顺序: {committed}")
+
+print("\n【场景2: 中间批次失败不阻塞后续批次】")
+committed.clear()
+listener.new_tokens_buffer.clear()
+prefetch_delays = {200: 0.1, 201: 0.05, 202: 0.0}
+original_prepare = listener._prepare_transfer_logs
+
+
+async def failing_prepare(logs, deduplicated=False):
+    if logs[0]['blockNumber'] == 201:
+        raise RuntimeError("模拟预取失败")
+    return await original_prepare(logs, deduplicated)
+
+
+listener._prepare_transfer_logs = failing_prepare
+asyncio.run(run_workers())
+assert committed == [200, 202], committed
+print(f"✅ 落账顺序: {committed}")
+
+print("\n【场景3: 队列满时背压】")
+
+
+async def fill_queue():
+    listener.log_queue = asyncio.Queue(maxsize=listener.queue_maxsize)
+    # 没有 worker 消费：第 3 条日志等待 enqueue_timeout 后被丢弃
+    for block_number in (300, 301, 302):
+        await listener._enqueue_log(transfer_log(block_number))
+
+
+before = listener.get_queue_stats()
+asyncio.run(fill_queue())
+stats = listener.get_queue_stats()
+assert stats['queue_depth'] == 2 and stats['max_queue_depth'] == 2
+assert stats['dropped'] - before['dropped'] == 1, stats
+assert stats['backpressure_waits'] - before['backpressure_waits'] == 1, stats
+print(f"✅ 队列统计: {stats}")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
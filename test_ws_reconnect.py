@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+测试 WebSocket 断线重连 - 指数退避、订阅成功后重置退避，以及每次断线后先用 HTTP 补齐缺口
+"""
+
+import asyncio
+import random
+from types import SimpleNamespace
+from unittest import mock
+
+from web3 import Web3
+from web3.eth import Eth
+
+from multichain_listener import AdvancedTokenAnalyzer, AsyncEVMWebSocketListener
+
+print("="*80)
+print("测试 WebSocket 断线重连")
+print("="*80)
+
+
+def make_listener(**kwargs):
+    """不连接节点创建 WebSocket 监听器"""
+    with mock.patch.object(Web3, 'is_connected', return_value=True), \
+            mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+        return AsyncEVMWebSocketListener('BSC', 'http://127.0.0.1:1', 'ws://127.0.0.1:1', ['0x' + 'ab' * 20],
+                                         AdvancedTokenAnalyzer(), **kwargs)
+
+
+listener = make_listener(reconnect_base_delay=1.0, reconnect_max_delay=8.0)
+
+# 场景1: 退避时间
+print("\n【场景1: 指数退避 + 抖动】")
+random.seed(20240801)
+for attempt, base in [(1, 1.0), (2, 2.0), (3, 4.0), (4, 8.0), (10, 8.0)]:
+    for _ in range(20):
+        delay = listener._reconnect_delay(attempt)
+        assert 0.5 * base <= delay <= 1.5 * base, (attempt, delay)
+print("✅ 退避时间翻倍并受上限约束")
+
+# 场景2: 重连循环
+print("\n【场景2: 重连循环】")
+# 每次运行的结果: 连接失败 / 订阅成功后断开 / 停止
+outcomes = [ConnectionError("拒绝连接"), ConnectionError("拒绝连接"), 'subscribed', asyncio.CancelledError()]
+events = []
+
+
+async def run_ws(callback=None):
+    outcome = outcomes.pop(0)
+    if outcome == 'subscribed':
+        listener._ws_subscribed = True
+        events.append('run')
+        return
+    listener._ws_subscribed = False
+    events.append('run')
+    raise outcome
+
+
+async def backfill_gap(callback=None, from_block=None):
+    events.append('backfill')
+
+
+async def no_sleep(delay):
+    events.append(('sleep', delay))
+
+
+def new_ws_connection():
+    events.append('reconnect')
+    return listener.async_w3
+
+
+listener._run_ws = run_ws
+listener._backfill_gap = backfill_gap
+listener._new_ws_connection = new_ws_connection
+listener._reconnect_delay = lambda attempt: float(attempt)
+
+with mock.patch.object(asyncio, 'sleep', no_sleep):
+    try:
+        asyncio.run(listener._ws_reconnect_loop())
+        raise AssertionError("停止信号应向上传递")
+    except asyncio.CancelledError:
+        pass
+
+assert events == [
+    'run', 'backfill', ('sleep', 1.0), 'reconnect',
+    'run', 'backfill', ('sleep', 2.0), 'reconnect',
+    'run', 'backfill', ('sleep', 1.0), 'reconnect',
+    'run',
+], events
+assert listener.queue_stats['reconnects'] == 3
+print("✅ 每次断线先补齐再重连，订阅成功过的连接断开后从第 1 次退避重新开始")
+
+# 场景3: 缺口补齐范围
+print("\n【场景3: 补齐断线期间的区块】")
+
+
+class FakeHttpEth:
+    @property
+    async def block_number(self):
+        return 120
+
+
+listener = make_listener(confirmations=2)
+listener.async_http_w3 = SimpleNamespace(eth=FakeHttpEth())
+listener.last_ws_block = 100
+ranges = []
+
+
+async def catch_up_to(current_block, latest_block, callback=None, block_range=None):
+    ranges.append((current_block, latest_block))
+    return latest_block + 1
+
+
+listener._catch_up_to = catch_up_to
+asyncio.run(listener._backfill_gap())
+assert ranges == [(100, 118)], "从最后收到的区块补齐到 链头-确认数"
+assert listener.last_ws_block == 118
+
+asyncio.run(listener._backfill_gap())
+assert ranges[-1] == (118, 118), "再次断线只补齐新的缺口（边界区块由去重保证不重复处理）"
+print("✅ 断线期间的区块由 eth_getLogs 补齐")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
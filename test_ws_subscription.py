@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+测试 WebSocket 多路复用订阅 - 每条链一个 logs 订阅覆盖所有钱包，推送按钱包路由并去重
+"""
+
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from unittest import mock
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.eth import Eth
+
+from multichain_listener import TRANSFER_EVENT_SIGNATURE, AdvancedTokenAnalyzer, AsyncEVMWebSocketListener
+
+print("="*80)
+print("测试 WebSocket 多路复用订阅")
+print("="*80)
+
+
+def transfer_log(to_address, block_number, log_index):
+    """订阅推送的 Transfer 日志"""
+    return {
+        'address': '0x' + 'cd' * 20,
+        'blockNumber': block_number,
+        'blockHash': HexBytes('0x' + f'{block_number:064x}'),
+        'logIndex': log_index,
+        'transactionHash': HexBytes('0x' + f'{block_number:032x}{log_index:032x}'),
+        'topics': [HexBytes(TRANSFER_EVENT_SIGNATURE), HexBytes('0x' + '00' * 31 + '01'),
+                   HexBytes('0x' + to_address[2:].lower().zfill(64))],
+        'data': HexBytes('0x' + f'{10**18:064x}'),
+    }
+
+
+wallets = [Web3.to_checksum_address('0x' + f'{i:02x}' * 20) for i in (0xa1, 0xb2, 0xc3)]
+pushed_logs = [
+    transfer_log(wallets[0], 100, 0),
+    transfer_log(wallets[1], 100, 1),
+    transfer_log('0x' + 'ee' * 20, 100, 2),    # 非监控钱包
+    transfer_log(wallets[2], 101, 0),
+    transfer_log(wallets[1], 100, 1),          # 重复推送
+]
+
+
+class FakeSubscriptionManager:
+    def __init__(self):
+        self.subscribe_calls = []
+        self.total_handler_calls = 0
+        self.logger = logging.getLogger(__name__)
+
+    async def subscribe(self, subscriptions):
+        for subscription in subscriptions:
+            subscription.manager = self
+        self.subscribe_calls.append(subscriptions)
+
+    async def handle_subscriptions(self):
+        (subscription,) = self.subscribe_calls[-1]
+        for log in pushed_logs:
+            await subscription._handler(SimpleNamespace(subscription=subscription, result=log))
+
+
+with mock.patch.object(Web3, 'is_connected', return_value=True), \
+        mock.patch.object(Eth, 'block_number', new_callable=mock.PropertyMock, return_value=0):
+    listener = AsyncEVMWebSocketListener('BSC', 'http://127.0.0.1:1', 'ws://127.0.0.1:1',
+                                         [w.lower() for w in wallets], AdvancedTokenAnalyzer())
+manager = FakeSubscriptionManager()
+listener.async_w3 = SimpleNamespace(
+    provider=SimpleNamespace(has_persistent_connection=True),
+    subscription_manager=manager,
+)
+
+
+async def receive():
+    listener.log_queue = asyncio.Queue()
+    await listener._subscribe_and_receive()
+    return [listener.log_queue.get_nowait() for _ in range(listener.log_queue.qsize())]
+
+
+queued = asyncio.run(receive())
+
+print("\n【场景1: 单一订阅】")
+assert len(manager.subscribe_calls) == 1 and len(manager.subscribe_calls[0]) == 1, "每条链只建立一个订阅"
+topics = manager.subscribe_calls[0][0].topics
+assert topics[0] == TRANSFER_EVENT_SIGNATURE and topics[1] is None
+assert sorted(topics[2]) == sorted('0x' + w[2:].lower().zfill(64) for w in wallets), "topics[2] 为所有钱包的 OR 列表"
+print(f"✅ 1 个订阅覆盖 {len(wallets)} 个钱包")
+
+print("\n【场景2: 推送路由与去重】")
+assert [listener._route_log_to_wallet(log) for log in queued] == [wallets[0], wallets[1], wallets[2]]
+assert listener.queue_stats['duplicates'] == 1
+assert listener.last_ws_block == 101
+print("✅ 非监控钱包的日志被忽略，重复推送只入队一次")
+
+
+class FakeHttpEth:
+    @property
+    async def block_number(self):
+        return 400
+
+    async def get_block(self, block_number):
+        # 与推送日志的 blockHash 一致，没有重组
+        return {'number': block_number, 'hash': HexBytes('0x' + f'{block_number:064x}')}
+
+
+listener.async_http_w3 = SimpleNamespace(eth=FakeHttpEth())
+active, overlapped, queried = [0], [], []
+
+
+async def process_block_range(start_block, end_block, callback=None):
+    active[0] += 1
+    overlapped.append(active[0] > 1)
+    queried.append((start_block, end_block))
+    await asyncio.sleep(0.01)
+    active[0] -= 1
+    return 0
+
+
+print("\n【场景3: 缺口补齐与安全轮询串行执行】")
+listener._process_block_range = process_block_range
+
+
+async def backfill_while_polling():
+    poller = asyncio.create_task(listener._safety_poll('latest', 10))
+    await listener._backfill_gap(from_block=101)
+    while len(queried) < 3 or active[0]:
+        await asyncio.sleep(0.01)
+    poller.cancel()
+    await asyncio.gather(poller, return_exceptions=True)
+
+
+asyncio.run(backfill_while_polling())
+assert queried == [(101, 200), (201, 400), (400, 400)], queried
+assert not any(overlapped), "同一时刻只有一路 HTTP 区间查询"
+assert listener.backfill_range.size == 400 and listener.safety_poll_range.size == 200
+assert listener.block_range.size == 100, "补齐与安全轮询不改动主查询窗口"
+print("✅ 补齐与安全轮询逐个执行，各自调整窗口")
+
+print("\n【场景4: HTTP 送达的日志按领取顺序落账】")
+contract = Web3.to_checksum_address('0x' + 'cd' * 20)
+listener._cache_token_info(contract, {'name': 'TEST', 'symbol': 'TEST', 'decimals': 18, 'total_supply': 10**27},
+                           persist=False)
+
+
+async def no_timestamp_rpc(logs):
+    pass
+
+
+listener._prefetch_block_timestamps = no_timestamp_rpc
+committed = []
+
+
+async def http_after_worker_batch():
+    worker_turn = listener._take_commit_turn()    # 先出队、仍在预取的推送批次
+    http_batch = asyncio.create_task(listener._handle_transfer_logs(
+        [transfer_log(wallets[0], 300, 0)],
+        callback=lambda transfer_data, _: committed.append(transfer_data['block_number'])
+    ))
+    await asyncio.sleep(0.05)
+    assert committed == [], "推送批次落账之前 HTTP 批次等待"
+    listener._finish_commit_turn(worker_turn)
+    await http_batch
+
+
+asyncio.run(http_after_worker_batch())
+assert committed == [300]
+assert listener.queue_stats['http_recovered'] == 1
+print("✅ HTTP 批次排在先出队的推送批次之后落账")
+
+print("\n" + "="*80)
+print("测试完成！")
+print("="*80)
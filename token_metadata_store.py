@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+代币元数据持久化缓存
+
+功能：
+1. 以 (链, 合约地址) 为键，将代币元数据保存到本地 SQLite
+2. 支持负缓存：查询失败的合约单独记录，按独立 TTL 过期后再重试
+3. 懒加载：首次查询时才打开数据库，按键读取，不整体加载
+4. 多链监听线程共享同一个实例（内部加锁）
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+class TokenMetadataStore:
+    """
+    代币元数据缓存（SQLite）
+    """
+
+    def __init__(self, db_file='token_metadata_cache.db', negative_ttl=6 * 3600, positive_ttl=None):
+        """
+        初始化缓存
+
+        参数:
+            db_file: SQLite 文件路径
+            negative_ttl: 负缓存有效期（秒），过期后允许重新查询
+            positive_ttl: 正缓存有效期（秒），None 表示永不过期
+        """
+        self.db_file = Path(db_file)
+        self.negative_ttl = negative_ttl
+        self.positive_ttl = positive_ttl
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """懒加载数据库连接"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS token_metadata (
+                    chain TEXT NOT NULL,
+                    address TEXT NOT NULL,
+                    info TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (chain, address)
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def get(self, chain: str, address: str) -> Tuple[bool, Optional[Dict]]:
+        """
+        查询缓存
+
+        返回:
+            (hit, info): 未命中或已过期为 (False, None)；
+                         负缓存命中为 (True, None)；正缓存命中为 (True, info)
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT info, updated_at FROM token_metadata WHERE chain = ? AND address = ?",
+                (chain, address)
+            ).fetchone()
+
+        if row is None:
+            return False, None
+
+        info_json, updated_at = row
+        age = time.time() - updated_at
+
+        if info_json is None:
+            if age > self.negative_ttl:
+                return False, None
+            return True, None
+
+        if self.positive_ttl is not None and age > self.positive_ttl:
+            return False, None
+        return True, json.loads(info_json)
+
+    def put(self, chain: str, address: str, info: Dict):
+        """写入正缓存"""
+        self._write(chain, address, json.dumps(info, ensure_ascii=False))
+
+    def put_negative(self, chain: str, address: str):
+        """写入负缓存（查询失败 / 非标准合约）"""
+        self._write(chain, address, None)
+
+    def _write(self, chain: str, address: str, info_json: Optional[str]):
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO token_metadata (chain, address, info, updated_at) VALUES (?, ?, ?, ?)",
+                    (chain, address, info_json, time.time())
+                )
+                conn.commit()
+        except Exception as e:
+            print(f"❌ 保存代币元数据缓存失败: {e}")
+
+    def get_stats(self):
+        """
+        获取统计信息
+
+        返回:
+            统计信息字典
+        """
+        with self._lock:
+            positive, negative = self._connect().execute(
+                "SELECT COUNT(info), COUNT(*) - COUNT(info) FROM token_metadata"
+            ).fetchone()
+
+        return {
+            'positive_entries': positive,
+            'negative_entries': negative,
+            'db_file': str(self.db_file),
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None